@@ -0,0 +1,86 @@
+import gc
+import tracemalloc
+from array import array
+
+ALLOC_PHASES = ("hub", "level")
+ALLOC_WARMUP_FRAMES = 180
+ALLOC_MEASURE_FRAMES = 300
+# Steady-state budgets per frame: bytes a frame leaves allocated on average, and the high-water mark of
+# short-lived allocations inside one frame (90th percentile, so a rare event frame doesn't fail the run).
+# A level frame sits around 3.3 KB, nearly all of it NumPy array headers in the particle and hazard passes.
+ALLOC_RETAINED_BUDGET = 64
+ALLOC_TRANSIENT_BUDGET = 4096
+
+
+class AllocationProbe:
+    # Called once at the top of every frame, so each call closes the frame before it (loop iterations that
+    # `continue` early are still counted). Per-frame numbers go into preallocated arrays so the probe
+    # doesn't show up in its own measurements.
+    def __init__(self, phases=ALLOC_PHASES, warmup=ALLOC_WARMUP_FRAMES, frames=ALLOC_MEASURE_FRAMES):
+        self.phases = phases
+        self.warmup = warmup
+        self.frames = frames
+        self.retained = {phase: array("q", bytes(8 * frames)) for phase in phases}
+        self.transient = {phase: array("q", bytes(8 * frames)) for phase in phases}
+        self.collections = dict.fromkeys(phases, 0)
+        self.phase_index = 0
+        self.frame_index = -1
+        self.baseline = 0
+        self.gc_before = 0
+        tracemalloc.start()
+
+    @property
+    def phase(self):
+        return self.phases[self.phase_index] if self.phase_index < len(self.phases) else None
+
+    def frame(self):
+        # Returns the phase the coming frame belongs to, or None once every phase is measured.
+        current, peak = tracemalloc.get_traced_memory()
+        phase = self.phase
+        measured = self.frame_index - self.warmup
+        if 0 <= measured < self.frames:
+            self.retained[phase][measured] = current - self.baseline
+            self.transient[phase][measured] = peak - self.baseline
+        self.frame_index += 1
+        if self.frame_index == self.warmup:
+            self.gc_before = gc.get_stats()[0]["collections"]
+        elif self.frame_index == self.warmup + self.frames:
+            self.collections[phase] = gc.get_stats()[0]["collections"] - self.gc_before
+            self.phase_index += 1
+            self.frame_index = 0
+        # The two ints above would otherwise sit in the baseline and read as a free on every frame.
+        del current, peak
+        tracemalloc.reset_peak()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        return self.phase
+
+    def results(self):
+        rows = []
+        for phase in self.phases:
+            transient = sorted(self.transient[phase])
+            rows.append(
+                {
+                    "phase": phase,
+                    "retained_mean": sum(self.retained[phase]) / self.frames,
+                    "transient_p50": transient[len(transient) // 2],
+                    "transient_p90": transient[int(len(transient) * 0.9)],
+                    "transient_max": transient[-1],
+                    "gc_collections": self.collections[phase],
+                }
+            )
+        return rows
+
+    def report(self):
+        # Returns (lines, passed).
+        lines = []
+        passed = True
+        for row in self.results():
+            ok = row["retained_mean"] <= ALLOC_RETAINED_BUDGET and row["transient_p90"] <= ALLOC_TRANSIENT_BUDGET
+            passed = passed and ok
+            lines.append(
+                f"alloc-check {row['phase']:<6} retained {row['retained_mean']:+.0f} B/frame  transient "
+                f"p50 {row['transient_p50']} B  p90 {row['transient_p90']} B  max {row['transient_max']} B  "
+                f"gen0 collections {row['gc_collections']}  {'ok' if ok else 'OVER BUDGET'}"
+            )
+        tracemalloc.stop()
+        return lines, passed
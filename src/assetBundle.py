@@ -0,0 +1,145 @@
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+BUNDLE_MAGIC = b"MUPSPAK\0"
+BUNDLE_VERSION = 1
+# magic, version, byte length of the JSON index that follows
+BUNDLE_HEADER = struct.Struct("<8sII")
+# Blobs start on cache-line boundaries so surfaces built over them stay aligned.
+BUNDLE_ALIGN = 64
+# Matches the 32-bit ARGB layout pygame uses for SRCALPHA and display surfaces, so no convert is needed.
+BUNDLE_PIXEL_FORMAT = "BGRA"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tga")
+
+
+class BundleError(Exception):
+    pass
+
+
+def _asset_files(assets_dir):
+    files = []
+    for root, _, names in os.walk(assets_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            files.append((os.path.relpath(path, assets_dir).replace(os.sep, "/"), path))
+    return sorted(files)
+
+
+def _tree_digest(files):
+    # Sizes and mtimes only: checking freshness must not read the assets the bundle exists to avoid decoding.
+    digest = hashlib.sha1(f"mups-assets-{BUNDLE_VERSION}".encode("utf-8"))
+    for name, path in files:
+        stat = os.stat(path)
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _pad(length):
+    return -length % BUNDLE_ALIGN
+
+
+def build_bundle(assets_dir, output_path):
+    entries = []
+    blobs = []
+    offset = 0
+    for name, path in _asset_files(assets_dir):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            try:
+                image = pygame.image.load(path)
+            except pygame.error as exc:
+                raise BundleError(f"Could not decode {path}: {exc}") from None
+            blob = pygame.image.tobytes(image, BUNDLE_PIXEL_FORMAT)
+            entry = {"name": name, "kind": "image", "format": BUNDLE_PIXEL_FORMAT, "size": list(image.get_size())}
+        else:
+            with open(path, "rb") as handle:
+                blob = handle.read()
+            entry = {"name": name, "kind": "raw"}
+        entry["offset"] = offset
+        entry["length"] = len(blob)
+        entries.append(entry)
+        blobs.append(blob)
+        offset += len(blob) + _pad(len(blob))
+    index = json.dumps(entries, separators=(",", ":")).encode("utf-8")
+    data_start = BUNDLE_HEADER.size + len(index)
+    data_start += _pad(data_start)
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, "wb") as handle:
+        handle.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index)))
+        handle.write(index)
+        handle.write(b"\0" * (data_start - BUNDLE_HEADER.size - len(index)))
+        for blob in blobs:
+            handle.write(blob)
+            handle.write(b"\0" * _pad(len(blob)))
+    os.replace(temp_path, output_path)
+    return len(entries), data_start + offset
+
+
+class AssetBundle:
+    # Read-only view over a packed bundle. Surfaces and byte views point straight into the mapping,
+    # so the bundle has to stay open for as long as anything built from it is in use.
+    def __init__(self, path):
+        self.path = path
+        self.handle = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.handle.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_length = BUNDLE_HEADER.unpack_from(self.map)
+            if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+                raise BundleError(f"{path} is not a version {BUNDLE_VERSION} asset bundle")
+            index_end = BUNDLE_HEADER.size + index_length
+            entries = json.loads(bytes(self.map[BUNDLE_HEADER.size : index_end]))
+        except (OSError, ValueError, struct.error) as exc:
+            self.handle.close()
+            raise BundleError(f"Could not read asset bundle {path}: {exc}") from None
+        except BundleError:
+            self.handle.close()
+            raise
+        self.data_start = index_end + _pad(index_end)
+        self.view = memoryview(self.map)
+        self.entries = {entry["name"]: entry for entry in entries}
+        self.surfaces = {}
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def names(self):
+        return list(self.entries)
+
+    def data(self, name):
+        entry = self.entries[name]
+        start = self.data_start + entry["offset"]
+        return self.view[start : start + entry["length"]]
+
+    def surface(self, name):
+        surface = self.surfaces.get(name)
+        if surface is None:
+            entry = self.entries[name]
+            if entry["kind"] != "image":
+                raise BundleError(f"{name} is not an image")
+            surface = self.surfaces[name] = pygame.image.frombuffer(self.data(name), tuple(entry["size"]), entry["format"])
+        return surface
+
+    def close(self):
+        self.surfaces.clear()
+        self.view.release()
+        self.map.close()
+        self.handle.close()
+
+
+def load_bundle(assets_dir, cache_dir):
+    # Opens the bundle for the current assets/ tree, packing a fresh one first when files changed.
+    files = _asset_files(assets_dir)
+    if not files:
+        return None
+    path = os.path.join(cache_dir, f"assets-{_tree_digest(files)[:16]}.pak")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(cache_dir, "assets-*.pak")):
+            os.remove(stale)
+        build_bundle(assets_dir, path)
+    return AssetBundle(path)
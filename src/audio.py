@@ -0,0 +1,280 @@
+import io
+import os
+import queue
+import threading
+import time
+import wave
+
+import numpy as np
+import pygame
+
+from rng import fnv1a32
+
+AUDIO_FREQUENCY = 44100
+# Mixer buffer in sample frames; this is the output latency floor (512 / 44100 is about 11.6 ms).
+AUDIO_BUFFER = 512
+AUDIO_CHANNELS = 8
+# Higher priority effects may steal a channel from lower or equal ones; the oldest candidate goes first.
+SFX_PRIORITIES = {"land": 0, "jump": 1, "toast": 1, "purchase": 2, "beacon": 2, "door": 3}
+SFX_VOLUME = {"land": 0.45, "jump": 0.5, "toast": 0.4, "purchase": 0.6, "beacon": 0.6, "door": 0.7}
+MUSIC_DIR_NAMES = ("music",)
+MUSIC_EXTENSIONS = (".ogg", ".wav", ".mp3")
+# Generated ambient loops when a theme has no track on disk; themes hash onto one of these.
+AMBIENT_VARIANTS = 4
+AMBIENT_SECONDS = 8
+AMBIENT_VOLUME = 0.35
+MUSIC_FADE_MS = 800
+# How often the music thread checks that the looping stream is still playing.
+MUSIC_POLL_S = 0.5
+
+
+def _tone(rate, seconds, start_hz, end_hz=None, decay=6.0, harmonics=((1, 1.0),), noise=0.0, seed=0):
+    count = int(rate * seconds)
+    t = np.arange(count) / rate
+    end_hz = start_hz if end_hz is None else end_hz
+    # Integrate the swept frequency so the phase stays continuous.
+    phase = 2 * np.pi * np.cumsum(np.linspace(start_hz, end_hz, count)) / rate
+    wave_data = sum(weight * np.sin(phase * multiple) for multiple, weight in harmonics)
+    if noise:
+        wave_data = wave_data + noise * np.random.default_rng(seed).uniform(-1, 1, count)
+    attack = np.minimum(1.0, t / 0.004)
+    return wave_data * attack * np.exp(-decay * t)
+
+
+def _sequence(rate, notes, note_seconds, decay=9.0):
+    return np.concatenate([_tone(rate, note_seconds, hz, decay=decay, harmonics=((1, 1.0), (2, 0.25))) for hz in notes])
+
+
+def synthesize_sfx(rate):
+    return {
+        "jump": _tone(rate, 0.14, 320, 720, decay=14.0, harmonics=((1, 1.0), (2, 0.2))),
+        "land": _tone(rate, 0.1, 130, 55, decay=30.0, noise=0.35, seed=7),
+        "beacon": _tone(rate, 0.45, 880, decay=7.0, harmonics=((1, 1.0), (1.5, 0.6), (3, 0.15))),
+        "door": _sequence(rate, (523.25, 659.25, 783.99, 1046.5), 0.11),
+        "purchase": _sequence(rate, (987.77, 1318.5), 0.09, decay=14.0),
+        "toast": _tone(rate, 0.12, 660, 700, decay=18.0),
+    }
+
+
+def _to_pcm(samples, channels, volume=1.0):
+    pcm = np.clip(samples / max(1e-6, np.abs(samples).max()) * volume * 32767, -32768, 32767).astype(np.int16)
+    return np.repeat(pcm[:, None], channels, axis=1).tobytes()
+
+
+def render_ambient_loop(path, variant, rate=AUDIO_FREQUENCY):
+    # Every partial completes whole cycles over the loop, so the file repeats without a click.
+    count = rate * AMBIENT_SECONDS
+    t = np.arange(count) / rate
+    base = (55.0, 61.74, 65.41, 73.42)[variant % 4] * AMBIENT_SECONDS
+    left = np.zeros(count)
+    right = np.zeros(count)
+    for index, (multiple, weight) in enumerate(((1, 1.0), (1.5, 0.5), (2, 0.45), (3, 0.2), (4.5, 0.12))):
+        cycles = round(base * multiple) / AMBIENT_SECONDS
+        swell = 0.6 + 0.4 * np.sin(2 * np.pi * t * (index + 1) / AMBIENT_SECONDS + index)
+        left += weight * swell * np.sin(2 * np.pi * cycles * t)
+        right += weight * swell * np.sin(2 * np.pi * (cycles + 1 / AMBIENT_SECONDS) * t + index)
+    stereo = np.stack([left, right], axis=1)
+    pcm = (stereo / np.abs(stereo).max() * AMBIENT_VOLUME * 32767).astype(np.int16)
+    temp_path = f"{path}.tmp"
+    with wave.open(temp_path, "wb") as handle:
+        handle.setnchannels(2)
+        handle.setsampwidth(2)
+        handle.setframerate(rate)
+        handle.writeframes(pcm.tobytes())
+    os.replace(temp_path, path)
+
+
+class AudioSystem:
+    # Effects are decoded or synthesized once on a background thread into a fixed channel pool; music is
+    # streamed by pygame.mixer.music from a file. Until loading finishes, play() drops effects rather than
+    # waiting. Music tracks are found during preload and loaded by a music thread that play_music() only
+    # queues requests for, so nothing on the frame path decodes, allocates buffers or touches the disk.
+    def __init__(self, assets_dir, cache_dir, bundle=None, channels=AUDIO_CHANNELS, volume=1.0, enabled=True):
+        self.assets_dir = assets_dir
+        self.music_cache = os.path.join(cache_dir, "music")
+        self.bundle = bundle
+        self.volume = volume
+        self.sounds = {}
+        self.ready = threading.Event()
+        # music_restarts counts the looping stream found stopped and restarted. pygame exposes no mixer
+        # callback, so true buffer underruns can't be observed from here.
+        self.stats = {"played": 0, "stolen": 0, "dropped": 0, "max_call_ms": 0.0, "music_restarts": 0}
+        self.music_files = {}
+        self.ambient_paths = [None] * AMBIENT_VARIANTS
+        self.music_path = None
+        self.music_wanted = False
+        self.music_requests = queue.Queue()
+        self.stopping = False
+        self.latency_ms = 0.0
+        self.enabled = False
+        self.error = None
+        if not enabled:
+            return
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init(AUDIO_FREQUENCY, -16, 2, AUDIO_BUFFER)
+        except pygame.error as exc:
+            self.error = str(exc)
+            return
+        self.rate, _, self.channel_count = pygame.mixer.get_init()
+        self.latency_ms = AUDIO_BUFFER / self.rate * 1000
+        pygame.mixer.set_num_channels(channels)
+        self.channels = [pygame.mixer.Channel(index) for index in range(channels)]
+        self.channel_priority = [0] * channels
+        self.channel_started = [0.0] * channels
+        self.enabled = True
+        self.thread = threading.Thread(target=self._preload, name="audio-preload", daemon=True)
+        self.thread.start()
+        self.music_thread = threading.Thread(target=self._run_music, name="audio-music", daemon=True)
+        self.music_thread.start()
+
+    def _asset_sound(self, name):
+        # A file under assets/sfx/ overrides the synthesized effect; the bundle serves it without touching disk.
+        for extension in (".ogg", ".wav"):
+            asset = f"sfx/{name}{extension}"
+            if self.bundle is not None and asset in self.bundle:
+                return pygame.mixer.Sound(file=io.BytesIO(self.bundle.data(asset)))
+            path = os.path.join(self.assets_dir, "sfx", name + extension)
+            if os.path.exists(path):
+                return pygame.mixer.Sound(path)
+        return None
+
+    def _preload(self):
+        try:
+            synthesized = synthesize_sfx(self.rate)
+            for name in SFX_PRIORITIES:
+                sound = self._asset_sound(name)
+                if sound is None:
+                    sound = pygame.mixer.Sound(buffer=_to_pcm(synthesized[name], self.channel_count))
+                sound.set_volume(SFX_VOLUME[name] * self.volume)
+                self.sounds[name] = sound
+            self.music_files = self._scan_music()
+            os.makedirs(self.music_cache, exist_ok=True)
+            for variant in range(AMBIENT_VARIANTS):
+                path = self._ambient_path(variant)
+                if not os.path.exists(path):
+                    render_ambient_loop(path, variant, self.rate)
+                self.ambient_paths[variant] = path
+        except (OSError, pygame.error) as exc:
+            self.error = str(exc)
+        self.ready.set()
+
+    def _scan_music(self):
+        # theme key -> track, preferring extensions in MUSIC_EXTENSIONS order.
+        found = {}
+        for folder in MUSIC_DIR_NAMES:
+            directory = os.path.join(self.assets_dir, folder)
+            if not os.path.isdir(directory):
+                continue
+            names = sorted(os.listdir(directory))
+            for extension in MUSIC_EXTENSIONS:
+                for name in names:
+                    if name.endswith(extension):
+                        found.setdefault(name[: -len(extension)], os.path.join(directory, name))
+        return found
+
+    def _ambient_path(self, variant):
+        return os.path.join(self.music_cache, f"ambient-{variant}-{self.rate}.wav")
+
+    def play(self, name):
+        if not self.enabled or not self.ready.is_set():
+            self.stats["dropped"] += 1
+            return None
+        started = time.perf_counter()
+        sound = self.sounds.get(name)
+        if sound is None:
+            self.stats["dropped"] += 1
+            return None
+        priority = SFX_PRIORITIES.get(name, 0)
+        slot = None
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                slot = index
+                break
+        if slot is None:
+            # Steal the oldest channel playing something no more important than this effect.
+            candidates = [index for index in range(len(self.channels)) if self.channel_priority[index] <= priority]
+            if candidates:
+                slot = min(candidates, key=self.channel_started.__getitem__)
+                self.stats["stolen"] += 1
+        if slot is None:
+            self.stats["dropped"] += 1
+            return None
+        self.channels[slot].play(sound)
+        self.channel_priority[slot] = priority
+        self.channel_started[slot] = started
+        self.stats["played"] += 1
+        self.stats["max_call_ms"] = max(self.stats["max_call_ms"], (time.perf_counter() - started) * 1000)
+        return slot
+
+    def music_for(self, theme_key):
+        # Only valid once preload is done; the lookups are in memory.
+        path = self.music_files.get(theme_key)
+        if path is None:
+            path = self.ambient_paths[fnv1a32(theme_key or "hub") % AMBIENT_VARIANTS]
+        return path
+
+    def play_music(self, theme_key):
+        # Requests made before preload finishes wait in the queue; only the latest one is acted on.
+        if self.enabled:
+            self.music_requests.put(("play", theme_key))
+
+    def stop_music(self):
+        if self.enabled:
+            self.music_requests.put(("stop", None))
+
+    def _run_music(self):
+        self.ready.wait()
+        while not self.stopping:
+            try:
+                request = self.music_requests.get(timeout=MUSIC_POLL_S)
+            except queue.Empty:
+                request = None
+            while True:
+                try:
+                    request = self.music_requests.get_nowait()
+                except queue.Empty:
+                    break
+            if self.stopping:
+                return
+            try:
+                if request is not None:
+                    self._apply_music(*request)
+                elif self.music_wanted and not pygame.mixer.music.get_busy():
+                    # A looping stream that stopped on its own; count it and start it again.
+                    self.stats["music_restarts"] += 1
+                    pygame.mixer.music.play(-1)
+            except pygame.error as exc:
+                self.error = str(exc)
+                self.music_wanted = False
+
+    def _apply_music(self, command, theme_key):
+        if command == "stop":
+            self.music_wanted = False
+            self.music_path = None
+            pygame.mixer.music.fadeout(MUSIC_FADE_MS)
+            return
+        path = self.music_for(theme_key)
+        if path is None or path == self.music_path and pygame.mixer.music.get_busy():
+            return
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(self.volume)
+        pygame.mixer.music.play(-1, fade_ms=MUSIC_FADE_MS)
+        self.music_path = path
+        self.music_wanted = True
+
+    def summary(self):
+        stats = self.stats
+        return (
+            f"audio {self.latency_ms:.1f} ms  play {stats['played']}  stolen {stats['stolen']}  "
+            f"dropped {stats['dropped']}  music restarts {stats['music_restarts']}  worst call {stats['max_call_ms']:.2f} ms"
+        )
+
+    def close(self):
+        if self.enabled:
+            self.stopping = True
+            self.music_requests.put(("stop", None))
+            self.music_thread.join(MUSIC_POLL_S * 2)
+            pygame.mixer.music.stop()
+            pygame.mixer.quit()
+            self.enabled = False
@@ -0,0 +1,584 @@
+import argparse
+import heapq
+import math
+from bisect import bisect_left
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+
+import content
+from contracts import build_contract_from_archetype
+from hazards import HAZARD_RESPAWN_GRACE_MS, HazardField, populate_hazards
+from physics import FRAME_MS, PLAYER_SIZE, PLAYER_SPEED, PLAYER_SPRINT_MULTIPLIER, new_body_state, spawn_rect, step_body
+from platforms import MOVE_MAX_AMP_X, MOVE_MAX_AMP_Y, PLATFORM_VIEW_HALF, PlatformSet, plan_platform_behaviours
+from rng import Rng
+from worldGen import LEVEL_BOUNDS, contract_tuning, generate_layout
+
+MAX_LEVEL_SECONDS = 120
+TAKEOFF_MARGIN = 4
+LANDING_MARGIN = 10
+RUN_STEP = int(PLAYER_SPEED * PLAYER_SPRINT_MULTIPLIER)
+# Skill 1.0 plays the planned route exactly; lower skill widens these towards a sloppy human.
+SKILL_TAKEOFF_SPREAD = 56
+SKILL_AIR_LAPSE = 0.35
+# Hazard dodging: how far past a move (or a landing) it is checked, the miss distance the bot insists on,
+# how far ahead one check weighs later starts and how many frames apart they are, and how long it waits
+# for a gap before gambling on the move.
+HAZARD_LOOKAHEAD_FRAMES = 14
+HAZARD_MARGIN = 1
+HAZARD_DELAY_FRAMES = 48
+HAZARD_DELAY_STRIDE = 3
+HAZARD_MAX_WAIT_FRAMES = 240
+# When standing still is about to be hit too: the short steps (frames of running) and the hop in place
+# the bot weighs to get out of the way before looking again.
+HAZARD_ESCAPE_STEPS = (3, 6, 10, 16)
+# A phasing or crumbling target has to stay solid from touchdown until the bot has run across it.
+LANDING_DWELL_FRAMES = 8
+# Leg hazard and moving pad positions are tabulated per frame this far past what a check asks for, so the
+# checks over the next few seconds of a leg read rows instead of redoing the trigonometry.
+PATH_TABLE_FRAMES = 180
+HOLD = (False, False, False, False)
+
+
+def jump_profile(gravity, jump_strength, floor_drop=LEVEL_BOUNDS["floor_y"]):
+    # Height above the takeoff point after each airborne frame, using the main loop's int truncation.
+    heights = []
+    vel_y = -jump_strength
+    height = 0
+    while height > -floor_drop:
+        vel_y += gravity
+        height -= int(vel_y)
+        heights.append(height)
+    return heights
+
+
+def _descent(profile):
+    # The arc is concave (int truncation never makes a frame climb more than the one before), so the
+    # frames at or above any height are one run that ends on the way down: the apex frame and the falling
+    # heights, lowest first, are enough to find its end.
+    apex = profile.index(max(profile))
+    return apex, profile[apex:][::-1]
+
+
+def _landing_frames(descent, rise):
+    # Last frame at which the courier is still at or above the target height.
+    apex, falling = descent
+    above = len(falling) - bisect_left(falling, rise)
+    return apex + above if above else None
+
+
+def _settle(left, aim_left):
+    # Where _steer() comes to rest when closing in on aim_left at sprint steps: the last step short of it
+    # is a walking one, and it stops within half a step.
+    offset = aim_left - left
+    sign = 1 if offset > 0 else -1
+    if abs(offset) > RUN_STEP:
+        offset -= sign * ((abs(offset) - 1) // RUN_STEP * RUN_STEP)
+    if abs(offset) > RUN_STEP // 2:
+        offset -= sign * PLAYER_SPEED
+    return aim_left - offset
+
+
+def _direction(source, target):
+    return 1 if target.centerx >= source.centerx else -1
+
+
+def _gap(source, target, direction):
+    if direction > 0:
+        return target.left - source.right
+    return source.left - target.right
+
+
+def build_transition_graph(platforms, profile):
+    max_rise = max(profile)
+    descent = _descent(profile)
+    edges = defaultdict(list)
+    for i, source in enumerate(platforms):
+        for j, target in enumerate(platforms):
+            if i == j:
+                continue
+            rise = source.top - target.top
+            if rise > max_rise - 2:
+                continue
+            direction = _direction(source, target)
+            gap = max(0, _gap(source, target, direction))
+            frames = _landing_frames(descent, rise)
+            if frames is None or frames * RUN_STEP < gap + LANDING_MARGIN:
+                continue
+            walk = abs(target.centerx - source.centerx) / RUN_STEP
+            edges[i].append((j, walk + frames))
+    return edges
+
+
+def plan_route(platforms, edges, start, goal):
+    goal_x = platforms[goal].centerx
+
+    def heuristic(idx):
+        return abs(goal_x - platforms[idx].centerx) / RUN_STEP
+
+    frontier = [(heuristic(start), 0.0, start)]
+    came_from = {start: None}
+    cost_so_far = {start: 0.0}
+    while frontier:
+        _, cost, node = heapq.heappop(frontier)
+        if node == goal:
+            route = []
+            while node is not None:
+                route.append(node)
+                node = came_from[node]
+            return route[::-1]
+        if cost > cost_so_far[node]:
+            continue
+        for neighbour, step_cost in edges.get(node, ()):
+            new_cost = cost + step_cost
+            if new_cost < cost_so_far.get(neighbour, float("inf")):
+                cost_so_far[neighbour] = new_cost
+                came_from[neighbour] = node
+                heapq.heappush(frontier, (new_cost + heuristic(neighbour), new_cost, neighbour))
+    return None
+
+
+class Autopilot:
+    def __init__(self, layout, gravity, jump_strength, skill=1.0, rng=None, hazards=None, platform_set=None):
+        self.platforms = layout["platforms"]
+        self.door = layout["door"]
+        self.goal = len(self.platforms) - 1
+        self.profile = jump_profile(gravity, jump_strength)
+        self.descent = _descent(self.profile)
+        self.edges = build_transition_graph(self.platforms, self.profile)
+        self.route = plan_route(self.platforms, self.edges, 0, self.goal)
+        self.replans = 0
+        self.current = 0
+        self.target = None
+        self.skill = skill
+        self.rng = rng or Rng(0)
+        self.takeoff_error = 0.0
+        self.hazards = hazards
+        self.platform_set = platform_set
+        self.landings = {}
+        self.leg_hazards = {}
+        self.slots = ()
+        self.paths = {}
+        self.waited = 0
+        self.clear_until = self.hold_until = self.escape_until = 0
+        self.escape = HOLD
+        # Long enough for a run across the widest pad, the whole jump arc and the lookahead after it.
+        steps = max(plat.width for plat in self.platforms) // RUN_STEP + 2 + len(self.profile) + 1 + HAZARD_LOOKAHEAD_FRAMES
+        self._offsets = np.arange(1, steps + HAZARD_DELAY_FRAMES + 1, dtype=np.float64)
+        self._heights = np.array(self.profile, dtype=np.float64)
+        # Row r, column k: which step of a move the bot is on at frame k if it holds still for _starts[r] frames first,
+        # and where that step sits in a move padded with HAZARD_DELAY_FRAMES of standing before it and none after.
+        self._starts = np.arange(0, HAZARD_DELAY_FRAMES, HAZARD_DELAY_STRIDE)
+        self._delays = np.arange(steps + HAZARD_DELAY_FRAMES)[None, :] - self._starts[:, None]
+        self._padded = self._delays + HAZARD_DELAY_FRAMES
+
+    def standing_on(self, rect):
+        for idx, plat in enumerate(self.platforms):
+            if rect.bottom == plat.top and rect.right > plat.left and rect.left < plat.right:
+                return idx
+        return None
+
+    def _retarget(self, current):
+        if self.route is None or current not in self.route:
+            self.route = plan_route(self.platforms, self.edges, current, self.goal)
+            self.replans += 1
+        if self.route is None:
+            self.target = None
+            return
+        self.clear_until = self.hold_until = 0
+        position = self.route.index(current)
+        self.target = self.route[position + 1] if position + 1 < len(self.route) else None
+        if self.hazards is not None and self.target is not None:
+            self.slots = self._leg_slots(current, self.target)
+            self.paths.pop("hazards", None)
+        if self.skill < 1.0:
+            spread = (1.0 - self.skill) * SKILL_TAKEOFF_SPREAD
+            self.takeoff_error = self.rng.uniform(-spread, spread)
+
+    def decide(self, rect, state, now=0):
+        # Returns (left, right, sprint, jump_pressed) in the same terms as the keyboard handler.
+        if now < self.escape_until:
+            return self.escape
+        if state["on_ground"]:
+            current = self.standing_on(rect)
+            if current is not None and (current != self.current or self.target is None):
+                self.current = current
+                self._retarget(current)
+        if self.target is None:
+            aim = self.door.centerx if self.current == self.goal else rect.centerx
+            return self._steer(rect, aim, sprint=True) + (False,)
+        source = self.platforms[self.current]
+        target = self.platforms[self.target]
+        direction = _direction(source, target)
+        # on_ground drops every other frame while walking (vel_y truncates to 0), so resting on the
+        # source pad counts as grounded; otherwise a hold would creep forward on the airborne frames.
+        resting = state["vel_y"] >= 0 and rect.bottom == source.top and rect.right > source.left and rect.left < source.right
+        if not state["on_ground"] and not resting:
+            if self.skill < 1.0 and self.rng.random() < (1.0 - self.skill) * SKILL_AIR_LAPSE:
+                return (False, False, False, False)
+            over_target = rect.right > target.left + 2 and rect.left < target.right - 2
+            if over_target and rect.bottom <= target.top:
+                return self._steer(rect, target.centerx, sprint=True) + (False,)
+            return (direction < 0, direction > 0, True, False)
+        # Only _dodge() holds, and it has already timed this wait against the hazards and the source pad.
+        if now < self.hold_until:
+            return HOLD
+        if direction > 0:
+            lead = min(source.right, target.left) if target.top < source.top else source.right
+            at_takeoff = rect.right + RUN_STEP >= lead - TAKEOFF_MARGIN + self.takeoff_error
+        else:
+            lead = max(source.left, target.right) if target.top < source.top else source.left
+            at_takeoff = rect.left - RUN_STEP <= lead + TAKEOFF_MARGIN - self.takeoff_error
+        action = (direction < 0, direction > 0, True, at_takeoff)
+        # Frames the bot can still stand on the source before it crumbles or phases out.
+        stay = math.inf
+        if self.platform_set is not None:
+            stay = (self.platform_set.solid_until(self.current, now) - now) / FRAME_MS
+            if at_takeoff and stay > 1:
+                # Time the jump so a phasing or crumbled target is there at touchdown and stays while it is crossed.
+                touchdown = now + self._landing(source.top - target.top) * FRAME_MS
+                crossing = (target.width // RUN_STEP + LANDING_DWELL_FRAMES) * FRAME_MS
+                if self.platform_set.solid_until(self.target, touchdown) <= touchdown + crossing:
+                    return HOLD
+        if self.hazards is None or not len(self.slots):
+            return action
+        return self._dodge(rect, now, source, target, direction, lead, action, stay)
+
+    def _leg_slots(self, current, target):
+        # Hazards that can reach anywhere the bot goes on this leg: across both pads (wherever a shuttle
+        # swings them) and up to the jump's apex.
+        slots = self.leg_hazards.get((current, target))
+        if slots is None:
+            source, target_plat = self.platforms[current], self.platforms[target]
+            sway_x, sway_y = (MOVE_MAX_AMP_X, MOVE_MAX_AMP_Y) if self.platform_set is not None else (0, 0)
+            reach = PLAYER_SIZE[0] + HAZARD_MARGIN + sway_x
+            found = self.hazards.sweeping(
+                min(source.left, target_plat.left) - reach,
+                max(source.right, target_plat.right) + reach,
+                min(source.top, target_plat.top) - PLAYER_SIZE[1] - max(self.profile) - HAZARD_MARGIN - sway_y,
+                max(source.top, target_plat.top) + HAZARD_MARGIN + sway_y,
+            )
+            slots = self.leg_hazards[(current, target)] = np.array(found, dtype=np.intp)
+        return slots
+
+    def _landing(self, rise):
+        frames = self.landings.get(rise)
+        if frames is None:
+            frames = self.landings[rise] = _landing_frames(self.descent, rise) or len(self.profile)
+        return frames
+
+    def _ahead(self, rect, step, stop_left, walk, landing, rise):
+        # Predicted rect corners from this frame on: a run at `step` px/frame, halted at the target's centre,
+        # with the jump pressed after `walk` frames and `landing` frames of arc that start the frame after
+        # the press and end at the target's height.
+        frames = walk + landing + 1 + HAZARD_LOOKAHEAD_FRAMES
+        lefts = rect.left + step * self._offsets[:frames]
+        if step > 0:
+            lefts = np.minimum(lefts, max(stop_left, rect.left))
+        else:
+            lefts = np.maximum(lefts, min(stop_left, rect.left))
+        tops = np.full(frames, rect.top - rise, dtype=np.float64)
+        tops[: walk + 1] = rect.top
+        tops[walk + 1 : walk + landing + 1] = rect.top - self._heights[:landing]
+        return lefts, tops
+
+    def _tabulated(self, key, now, count, positions):
+        # Rows for the `count` frames from `now` of a per-frame (xs, ys) table, kept under `key` and rebuilt
+        # once a check runs past its end. positions(ms) fills it at the frame times the game loop truncates
+        # to, so the predictions see exactly what update() and touching() will.
+        frame = round(now / FRAME_MS)
+        table = self.paths.get(key)
+        if table is None or frame < table[0] or frame + count > table[0] + len(table[1]):
+            ms = np.floor(np.arange(frame, frame + count + PATH_TABLE_FRAMES) * FRAME_MS)
+            table = self.paths[key] = (frame, *positions(ms))
+        start = frame - table[0]
+        return table[1][start : start + count], table[2][start : start + count]
+
+    def _hazard_paths(self, now, count):
+        return self._tabulated("hazards", now, count, lambda ms: self.hazards.paths(self.slots, ms / 1000.0))
+
+    def _pad_drift(self, idx, now, count):
+        # How far a moving pad will have carried its rider over the next `count` frames, in update()'s terms;
+        # None for a pad that holds still.
+        spec = self.platform_set.behaviours.get(idx) if self.platform_set is not None else None
+        if spec is None or spec["kind"] != "moving":
+            return None
+        base_x, base_y = self.platform_set.base[idx]
+
+        def positions(ms):
+            swing = np.sin(spec["omega"] * ms + spec["phase"])
+            return base_x + np.rint(spec["amp_x"] * swing), base_y + np.rint(spec["amp_y"] * swing)
+
+        xs, ys = self._tabulated(idx, now, count, positions)
+        plat = self.platforms[idx]
+        return xs - plat.x, ys - plat.y
+
+    def _first_hits(self, rect, now, lefts, tops, within=1, walk=None, touchdown=None):
+        # First hazard contact for the move started after each of the _starts below `within` frames, -1 where
+        # it stays clear. Frames before the start are spent standing still; frames after the move ends aren't
+        # checked. lefts and tops may also stack several moves (moves x steps), giving one row of starts per move.
+        # On moving pads the bot rides the source until the takeoff `walk` frames into the move (for the whole
+        # move if None) and the target from `touchdown` frames in.
+        steps = lefts.shape[-1]
+        source = self._pad_drift(self.current, now, steps + HAZARD_DELAY_FRAMES)
+        target = None if touchdown is None else self._pad_drift(self.target, now, steps + HAZARD_DELAY_FRAMES)
+        if within == 1 and lefts.ndim == 1 and source is None and target is None:
+            paths = self._hazard_paths(now, steps)
+            hits = self.hazards.first_hit(lefts, tops, rect.width, rect.height, None, HAZARD_MARGIN, self.slots, paths)
+            return hits[None]
+        rows = int(np.searchsorted(self._starts, within))
+        columns = steps + self._starts[rows - 1]
+        take = self._padded[:rows, :columns]
+        edge = lefts.shape[:-1] + (HAZARD_DELAY_FRAMES,)
+        plan_lefts = np.concatenate((np.full(edge, float(rect.left)), lefts, np.full(edge, np.inf)), axis=-1)[..., take]
+        plan_tops = np.concatenate((np.full(edge, float(rect.top)), tops, np.full(edge, np.inf)), axis=-1)[..., take]
+        if source is not None:
+            # Carried frame by frame until the takeoff, then the jump keeps the offset it left with.
+            ride = np.arange(columns) if walk is None else np.minimum(np.arange(columns), (self._starts[:rows] + walk)[:, None])
+            plan_lefts += source[0][ride]
+            plan_tops += source[1][ride]
+        if target is not None:
+            landed = self._delays[:rows, :columns] > touchdown
+            plan_lefts += np.where(landed, target[0][:columns], 0.0)
+            plan_tops += np.where(landed, target[1][:columns], 0.0)
+        hits = self.hazards.first_hit(
+            plan_lefts.reshape(-1, columns),
+            plan_tops.reshape(-1, columns),
+            rect.width,
+            rect.height,
+            None,
+            HAZARD_MARGIN,
+            self.slots,
+            self._hazard_paths(now, columns),
+        )
+        return hits.reshape(plan_lefts.shape[:-1])
+
+    def _dodge(self, rect, now, source, target, direction, lead, action, stay):
+        # Times the planned move (the run to the takeoff point and the jump) against the hazards' closed-form
+        # paths: one check weighs starting now or every few frames over the next HAZARD_DELAY_FRAMES, and the
+        # bot holds still until the first start that stays clear. Only starts that still take off before the
+        # source crumbles or phases out (`stay` frames from now) are weighed; with none, it goes now.
+        # A clear run is kept to, and its jump taken unchecked when the takeoff comes on the frame it was planned for.
+        if now < self.clear_until and (not action[3] or now > self.clear_until - FRAME_MS):
+            return action
+        if self.waited >= HAZARD_MAX_WAIT_FRAMES:
+            self.waited = 0
+            return action
+        step = direction * RUN_STEP
+        # Frames of running before decide() sees the takeoff point.
+        if direction > 0:
+            short = lead - TAKEOFF_MARGIN + self.takeoff_error - rect.right - RUN_STEP
+        else:
+            short = rect.left - RUN_STEP - lead - TAKEOFF_MARGIN + self.takeoff_error
+        walk = 0 if action[3] else max(0, math.ceil(short / RUN_STEP))
+        rise = source.top - target.top
+        stop = _settle(rect.left, target.centerx - rect.width // 2)
+        lefts, tops = self._ahead(rect, step, stop, walk, self._landing(rise), rise)
+        # Going now is the common case and needs a single path; the other starts are only weighed when it is blocked.
+        touchdown = walk + self._landing(rise)
+        if self._first_hits(rect, now, lefts, tops, 1, walk, touchdown)[0] < 0:
+            self.waited = 0
+            self.clear_until = now + (walk + 0.5) * FRAME_MS
+            return action
+        window = min(HAZARD_DELAY_FRAMES, stay - walk - 1)
+        if window <= 1:
+            return action
+        hits = self._first_hits(rect, now, lefts, tops, window, walk, touchdown)
+        clear = np.flatnonzero(hits < 0)
+        if len(clear):
+            return self._hold(now, int(self._starts[clear[0]]))
+        # No start in the window stays clear. Standing here is safe until the earliest hit that lands while
+        # a plan is still waiting; if that is past the last start, hold until then and look again.
+        starts = self._starts[: len(hits)]
+        standing_hits = hits[hits < starts]
+        if not len(standing_hits):
+            return self._hold(now, int(starts[-1]))
+        return self._escape(rect, now, source, direction, action, min(int(standing_hits.min()), window), stay)
+
+    def _escape(self, rect, now, source, direction, action, safe, stay):
+        # Something will hit the bot where it stands after `safe` frames. Weighs short runs either way along
+        # the source pad and a hop in place (if the pad is still there to land on), each followed by standing
+        # still and started after any of those frames, and holds until the earliest start that stays clear.
+        # With none, it takes the run hit last if that beats staying put.
+        hop = self._landing(0)
+        frames = max(HAZARD_ESCAPE_STEPS[-1], hop) + 1 + HAZARD_LOOKAHEAD_FRAMES
+        offsets = self._offsets[:frames]
+        low, high = source.left, source.right - rect.width
+        moves = []
+        lefts = []
+        for heading in (-direction, direction):
+            for run in HAZARD_ESCAPE_STEPS:
+                stop = min(max(rect.left + heading * RUN_STEP * run, low), high)
+                if stop != rect.left:
+                    moves.append((heading < 0, heading > 0, True, False, -(-abs(stop - rect.left) // RUN_STEP)))
+                    path = rect.left + heading * RUN_STEP * offsets
+                    lefts.append(np.minimum(path, stop) if heading > 0 else np.maximum(path, stop))
+        tops = np.full((len(lefts) + 1, frames), rect.top, dtype=np.float64)
+        if hop + safe < stay:
+            lefts.append(np.full(frames, rect.left, dtype=np.float64))
+            tops[-1, 1 : hop + 1] = rect.top - self._heights[:hop]
+            moves.append((False, False, False, True, hop + 1))
+        else:
+            tops = tops[:-1]
+        if not moves:
+            self.waited += 1
+            return action
+        hits = self._first_hits(rect, now, np.array(lefts), tops, max(1, safe))
+        starts = np.flatnonzero((hits < 0).any(axis=0))
+        if len(starts):
+            delay = int(self._starts[starts[0]])
+            if delay:
+                return self._hold(now, delay)
+            pick = int(np.flatnonzero(hits[:, 0] < 0)[0])
+        else:
+            # A hop can't be cut short, so only the runs are worth taking when every move gets hit.
+            runs = hits[: len(hits) - moves[-1][3], 0]
+            pick = int(runs.argmax()) if len(runs) else 0
+            if not len(runs) or runs[pick] <= safe:
+                self.waited += 1
+                return action
+        *keys, length = moves[pick]
+        self.waited += length
+        # The press is only needed on the first frame; the rest of a hop is spent holding still.
+        self.escape = tuple(keys[:3]) + (False,)
+        self.escape_until = now + (length - 0.5) * FRAME_MS
+        return tuple(keys)
+
+    def _hold(self, now, frames):
+        self.waited += frames
+        # Half a frame short, since frame times are truncated to whole milliseconds.
+        self.hold_until = now + (frames - 0.5) * FRAME_MS
+        return HOLD
+
+    @staticmethod
+    def _steer(rect, aim_x, sprint):
+        offset = aim_x - rect.centerx
+        if abs(offset) <= RUN_STEP // 2:
+            return (False, False, False)
+        return (offset < 0, offset > 0, sprint and abs(offset) > RUN_STEP)
+
+
+def run_level(
+    layout,
+    gravity,
+    jump_strength,
+    wall_jump=False,
+    max_seconds=MAX_LEVEL_SECONDS,
+    bounds=LEVEL_BOUNDS,
+    skill=1.0,
+    rng=None,
+    lives=None,
+    hazards=None,
+    platform_set=None,
+):
+    # lives=None keeps respawning until the clock runs out; otherwise the run fails once they are spent.
+    # hazards is a populated HazardField; the bot times its jumps against it and pays for any contact it misjudges.
+    # platform_set moves, crumbles and phases layout["platforms"] in place; the route is planned on the base layout.
+    bot = Autopilot(layout, gravity, jump_strength, skill, rng, hazards, platform_set)
+    result = {"solvable": bot.route is not None, "completed": False, "frames": 0, "deaths": 0, "replans": 0}
+    if bot.route is None:
+        return result
+    start = layout["start"]
+    rect = spawn_rect(start)
+    state = new_body_state()
+    solids = layout["platforms"]
+    door = layout["door"]
+    floor_y = bounds["floor_y"]
+    max_frames = int(max_seconds * 1000 / FRAME_MS)
+    grace_until = HAZARD_RESPAWN_GRACE_MS
+    # Bound once: these run every frame of every level.
+    decide = bot.decide
+    update = platform_set.update if platform_set is not None else None
+    touching = hazards.touching if hazards is not None and hazards.count else None
+    for frame in range(1, max_frames + 1):
+        now = int(frame * FRAME_MS)
+        left, right, sprint, jump = decide(rect, state, now)
+        if update is not None:
+            solids = update(now, rect.left - PLATFORM_VIEW_HALF, rect.right + PLATFORM_VIEW_HALF, rect, state["vel_y"] + gravity)
+        alive = step_body(rect, state, solids, floor_y, now, left, right, sprint, jump, gravity, jump_strength, wall_jump)
+        if alive and touching is not None and now >= grace_until:
+            alive = not touching(rect, now / 1000.0)
+        if not alive:
+            grace_until = now + HAZARD_RESPAWN_GRACE_MS
+            result["deaths"] += 1
+            if lives is not None and result["deaths"] >= lives:
+                break
+            rect = spawn_rect(start)
+            state = new_body_state(now)
+            bot.current, bot.target, bot.waited = 0, None, 0
+            bot.clear_until = bot.hold_until = bot.escape_until = 0
+            continue
+        if rect.colliderect(door):
+            result["completed"] = True
+            result["frames"] = frame
+            break
+    result["replans"] = bot.replans
+    return result
+
+
+def run_contract(contract, bounds=LEVEL_BOUNDS, skill=1.0, rng=None, lives=None, hazards=None):
+    layout = generate_layout(contract["seed"], contract_tuning(contract), bounds)
+    behaviours = plan_platform_behaviours(layout, contract.get("platform_mix"), bounds)
+    platform_set = PlatformSet(layout["platforms"], behaviours) if behaviours else None
+    if contract.get("hazard_kind"):
+        hazards = hazards or HazardField()
+        populate_hazards(hazards, layout, contract["hazard_kind"], contract.get("difficulty_raw", 1.0), bounds)
+    return run_level(
+        layout,
+        contract["gravity"],
+        contract["jump"],
+        contract.get("wall_jump", False),
+        bounds=bounds,
+        skill=skill,
+        rng=rng,
+        lives=lives,
+        hazards=hazards,
+        platform_set=platform_set,
+    )
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play generated levels headlessly and report completion baselines.")
+    parser.add_argument("--levels", type=int, default=200, help="levels per archetype")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    tables = content.load_content(os.path.join(base_dir, "data"), os.path.join(base_dir, ".cache"))
+    seeds = Rng(args.seed)
+    started = time.perf_counter()
+    total = 0
+    print(f"{'archetype':<18}{'solvable':>9}{'cleared':>9}{'median s':>10}{'p90 s':>8}{'deaths':>8}")
+    for archetype in tables["archetypes"]:
+        solvable = cleared = deaths = 0
+        times = []
+        for _ in range(args.levels):
+            contract = build_contract_from_archetype(archetype, seeds.next_u32(), tables["themes"])
+            result = run_contract(contract)
+            total += 1
+            solvable += result["solvable"]
+            deaths += result["deaths"]
+            if result["completed"]:
+                cleared += 1
+                times.append(result["frames"] * FRAME_MS / 1000)
+        median = _percentile(times, 0.5)
+        p90 = _percentile(times, 0.9)
+        print(
+            f"{archetype['key']:<18}{solvable / args.levels:>9.0%}{cleared / args.levels:>9.0%}"
+            f"{median if median is not None else float('nan'):>10.1f}{p90 if p90 is not None else float('nan'):>8.1f}"
+            f"{deaths / args.levels:>8.2f}"
+        )
+    elapsed = time.perf_counter() - started
+    print(f"{total} levels in {elapsed:.2f}s ({total / elapsed:.0f} levels/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+import math
+
+import numpy as np
+
+from hazards import HAZARD_RESPAWN_GRACE_MS
+from physics import (
+    ACTION_JUMP,
+    ACTION_LEFT,
+    ACTION_RIGHT,
+    ACTION_SPRINT,
+    COYOTE_TIME_MS,
+    FRAME_MS,
+    JUMP_BUFFER_MS,
+    NO_PRESS_MS,
+    PLAYER_SIZE,
+    PLAYER_SPEED,
+    PLAYER_SPRINT_MULTIPLIER,
+    WALL_JUMP_COOLDOWN_MS,
+    WALL_JUMP_PUSH,
+    spawn_rect,
+)
+from platforms import CRUMBLE_DELAY_MS, CRUMBLE_RESPAWN_MS
+from worldGen import LEVEL_BOUNDS
+
+# Wider than one frame of sprinting plus a wall-jump push, so the broad phase never drops a contact.
+BROAD_PHASE_SLACK = 32
+
+
+class BatchCourierSim:
+    # Steps N couriers through one level with the same rules as physics.step_body. Platforms are
+    # visited in list order (as the scalar loops do); the work inside each visit is vectorised over couriers.
+    # hazards is a populated HazardField; contact with one kills like the floor does, outside the respawn grace.
+    # behaviours (from plan_platform_behaviours) move, crumble and phase the platforms as PlatformSet.update
+    # does; shuttles and phases are shared, while each courier starts its own crumble timers.
+    def __init__(
+        self, layout, gravity, jump_strength, count, wall_jump=False, bounds=LEVEL_BOUNDS, hazards=None, behaviours=None
+    ):
+        platforms = layout["platforms"]
+        self.base_left = np.array([p.left for p in platforms], dtype=np.int64)
+        self.base_top = np.array([p.top for p in platforms], dtype=np.int64)
+        self.plat_width = np.array([p.width for p in platforms], dtype=np.int64)
+        self.plat_height = np.array([p.height for p in platforms], dtype=np.int64)
+        self.behaviours = behaviours or {}
+        kinds = {kind: [] for kind in ("moving", "crumbling", "phasing")}
+        for idx, spec in sorted(self.behaviours.items()):
+            kinds[spec["kind"]].append(idx)
+        self.moving = sorted(kinds["moving"], key=lambda idx: (platforms[idx].centerx, idx))
+        self.crumbling = kinds["crumbling"]
+        self.crumble_slot = {idx: slot for slot, idx in enumerate(self.crumbling)}
+        self.phasing = kinds["phasing"]
+        # Only riders of shuttles and crumbling pads matter, but PlatformSet.standing_on picks the first pad in
+        # list order, so each of those keeps the lower-index pads that could be under the same courier.
+        sway = [self.behaviours.get(idx, {}).get("amp_x", 0) for idx in range(len(platforms))]
+        self.blockers = {
+            idx: [
+                other
+                for other in range(idx)
+                if platforms[other].left - sway[other] < platforms[idx].right + sway[idx] + PLAYER_SIZE[0]
+                and platforms[other].right + sway[other] > platforms[idx].left - sway[idx] - PLAYER_SIZE[0]
+            ]
+            for idx in self.moving + self.crumbling
+        }
+        door = layout["door"]
+        self.door = (door.left, door.top, door.right, door.bottom)
+        spawn = spawn_rect(layout["start"])
+        self.spawn = (spawn.x, spawn.y)
+        self.width, self.height = PLAYER_SIZE
+        self.floor_y = bounds["floor_y"]
+        self.gravity = float(gravity)
+        self.jump_strength = float(jump_strength)
+        self.wall_jump = bool(wall_jump)
+        self.hazards = hazards if hazards is not None and hazards.count else None
+        self.count = count
+        self.reset()
+
+    def reset(self):
+        n = self.count
+        self.frame = 0
+        self.now = 0
+        self.x = np.full(n, self.spawn[0], dtype=np.int64)
+        self.y = np.full(n, self.spawn[1], dtype=np.int64)
+        self.vel_x = np.zeros(n)
+        self.vel_y = np.zeros(n)
+        self.on_ground = np.ones(n, dtype=bool)
+        self.wall_dir = np.zeros(n, dtype=np.int64)
+        self.last_grounded_ms = np.zeros(n, dtype=np.int64)
+        self.last_jump_press_ms = np.full(n, NO_PRESS_MS, dtype=np.int64)
+        self.last_wall_jump_ms = np.full(n, NO_PRESS_MS, dtype=np.int64)
+        self.deaths = np.zeros(n, dtype=np.int64)
+        self.grace_until = np.full(n, HAZARD_RESPAWN_GRACE_MS, dtype=np.int64)
+        self.finished_frame = np.full(n, -1, dtype=np.int64)
+        self.plat_left = self.base_left.copy()
+        self.plat_top = self.base_top.copy()
+        self.plat_right = self.plat_left + self.plat_width
+        self.plat_bottom = self.plat_top + self.plat_height
+        self.crumble_at = np.full((n, len(self.crumbling)), -1, dtype=np.int64)
+        self.respawn_at = np.full((n, len(self.crumbling)), -1, dtype=np.int64)
+        self.nobody = np.zeros(n, dtype=bool)
+
+    def _overlaps(self, k):
+        return (
+            (self.x < self.plat_right[k])
+            & (self.x + self.width > self.plat_left[k])
+            & (self.y < self.plat_bottom[k])
+            & (self.y + self.height > self.plat_top[k])
+        )
+
+    def _nearby_platforms(self):
+        low = self.x.min() - BROAD_PHASE_SLACK
+        high = self.x.max() + self.width + BROAD_PHASE_SLACK
+        return np.flatnonzero((self.plat_right >= low) & (self.plat_left <= high))
+
+    def _hits(self, k, solid):
+        hit = self._overlaps(k)
+        mask = solid.get(k)
+        return hit if mask is None else hit & mask
+
+    def _standing(self, k, falling, crumble_solid, phased_out, standing):
+        # PlatformSet.standing_on's test for one pad, memoised for the frame.
+        mask = standing.get(k)
+        if mask is None:
+            if k in phased_out:
+                mask = self.nobody
+            else:
+                mask = (
+                    falling
+                    & (self.y + self.height == self.plat_top[k])
+                    & (self.x + self.width > self.plat_left[k])
+                    & (self.x < self.plat_right[k])
+                )
+                slot = self.crumble_slot.get(k)
+                if slot is not None:
+                    mask &= crumble_solid[:, slot]
+            standing[k] = mask
+        return mask
+
+    def _advance_platforms(self, now):
+        # PlatformSet.update for every courier at once: riders are found first, then the shuttles move (carrying
+        # their riders and shoving anyone else out of the way) and riders start crumble timers. Returns the
+        # platforms near the couriers and, for those not solid to everyone, the mask of couriers they block.
+        crumble_solid = (self.crumble_at < 0) | (now < self.crumble_at) | (now >= self.respawn_at)
+        phased_out = {
+            idx
+            for idx in self.phasing
+            if (now + self.behaviours[idx]["offset"]) % self.behaviours[idx]["period"] >= self.behaviours[idx]["solid_ms"]
+        }
+        falling = self.vel_y >= 0
+        standing = {}
+        riding = {}
+        for k in self.blockers:
+            mask = self._standing(k, falling, crumble_solid, phased_out, standing)
+            if not mask.any():
+                continue
+            for other in self.blockers[k]:
+                mask = mask & ~self._standing(other, falling, crumble_solid, phased_out, standing)
+            riding[k] = mask
+        for k in self.moving:
+            spec = self.behaviours[k]
+            swing = math.sin(spec["omega"] * now + spec["phase"])
+            left = int(self.base_left[k]) + int(round(spec["amp_x"] * swing))
+            top = int(self.base_top[k]) + int(round(spec["amp_y"] * swing))
+            dx, dy = left - int(self.plat_left[k]), top - int(self.plat_top[k])
+            if not dx and not dy:
+                continue
+            self.plat_left[k], self.plat_top[k] = left, top
+            self.plat_right[k], self.plat_bottom[k] = left + self.plat_width[k], top + self.plat_height[k]
+            riders = riding.get(k, self.nobody)
+            self.x[riders] += dx
+            self.y[riders] = top - self.height
+            shoved = self._overlaps(k) & ~riders
+            if shoved.any():
+                if dx > 0:
+                    self.x[shoved] = self.plat_right[k]
+                elif dx < 0:
+                    self.x[shoved] = left - self.width
+                elif dy < 0:
+                    self.y[shoved] = top - self.height
+                else:
+                    self.y[shoved] = self.plat_bottom[k]
+        for k in self.crumbling:
+            riders = riding.get(k)
+            if riders is None:
+                continue
+            slot = self.crumble_slot[k]
+            starting = riders & ((self.crumble_at[:, slot] < 0) | (now >= self.respawn_at[:, slot]))
+            self.crumble_at[starting, slot] = now + CRUMBLE_DELAY_MS
+            self.respawn_at[starting, slot] = now + CRUMBLE_DELAY_MS + CRUMBLE_RESPAWN_MS
+        nearby = self._nearby_platforms()
+        solid = {}
+        for k in nearby:
+            if k in phased_out:
+                solid[k] = self.nobody
+            elif k in self.behaviours and self.behaviours[k]["kind"] != "moving":
+                # As in solids_near: a pad that phases or respawns back in around a courier stays open to it.
+                mask = ~self._overlaps(k)
+                slot = self.crumble_slot.get(k)
+                solid[k] = mask if slot is None else mask & crumble_solid[:, slot]
+        return nearby, solid
+
+    def step(self, actions):
+        # actions: int array of ACTION_* bitmasks, one per courier. Returns the mask of couriers that died.
+        actions = np.asarray(actions)
+        self.frame += 1
+        self.now = now = int(self.frame * FRAME_MS)
+        left = (actions & ACTION_LEFT) != 0
+        right = (actions & ACTION_RIGHT) != 0
+        sprint = (actions & ACTION_SPRINT) != 0
+        jump_pressed = (actions & ACTION_JUMP) != 0
+        self.last_jump_press_ms[jump_pressed] = now
+
+        speed = np.where(sprint, PLAYER_SPEED * PLAYER_SPRINT_MULTIPLIER, PLAYER_SPEED)
+        self.vel_x = np.where(left & ~right, -speed, np.where(right & ~left, speed, 0.0))
+        self.vel_y += self.gravity
+        if self.behaviours:
+            nearby, solid = self._advance_platforms(now)
+        else:
+            nearby, solid = self._nearby_platforms(), {}
+
+        self.x += np.trunc(self.vel_x).astype(np.int64)
+        moving_right = self.vel_x > 0
+        moving_left = self.vel_x < 0
+        wall_dir = np.zeros(self.count, dtype=np.int64)
+        collided = np.zeros(self.count, dtype=bool)
+        for k in nearby:
+            hit = self._hits(k, solid)
+            hit_right = hit & moving_right
+            hit_left = hit & moving_left
+            self.x[hit_right] = self.plat_left[k] - self.width
+            self.x[hit_left] = self.plat_right[k]
+            wall_dir[hit_right] = 1
+            wall_dir[hit_left] = -1
+            collided |= hit_right | hit_left
+        searching = ~collided
+        for k in nearby:
+            beside = searching & (self.plat_top[k] < self.y + self.height) & (self.plat_bottom[k] > self.y)
+            if k in solid:
+                beside &= solid[k]
+            touch_right = beside & (self.x + self.width == self.plat_left[k])
+            touch_left = beside & ~touch_right & (self.x == self.plat_right[k])
+            wall_dir[touch_right] = 1
+            wall_dir[touch_left] = -1
+            searching &= ~(touch_right | touch_left)
+        self.wall_dir = wall_dir
+
+        self.y += np.trunc(self.vel_y).astype(np.int64)
+        grounded = np.zeros(self.count, dtype=bool)
+        for k in nearby:
+            hit = self._hits(k, solid)
+            landing = hit & (self.vel_y > 0)
+            bumping = hit & (self.vel_y < 0)
+            self.y[landing] = self.plat_top[k] - self.height
+            self.y[bumping] = self.plat_bottom[k]
+            self.vel_y[landing | bumping] = 0.0
+            grounded |= landing
+
+        died = self.y + self.height >= self.floor_y
+        self.last_grounded_ms[grounded] = now
+        self.on_ground = grounded
+
+        wants_jump = jump_pressed | ((now - self.last_jump_press_ms) <= JUMP_BUFFER_MS)
+        wall_jumping = (
+            wants_jump
+            & self.wall_jump
+            & (self.wall_dir != 0)
+            & ~self.on_ground
+            & ((now - self.last_wall_jump_ms) >= WALL_JUMP_COOLDOWN_MS)
+        )
+        ground_jumping = wants_jump & ~wall_jumping & (self.on_ground | ((now - self.last_grounded_ms) <= COYOTE_TIME_MS))
+        jumping = (wall_jumping | ground_jumping) & ~died
+        wall_jumping &= ~died
+        self.vel_y[jumping] = -self.jump_strength
+        self.on_ground[jumping] = False
+        self.last_jump_press_ms[jumping] = NO_PRESS_MS
+        if wall_jumping.any():
+            push = -self.wall_dir * WALL_JUMP_PUSH
+            self.x[wall_jumping] += push[wall_jumping]
+            for k in nearby:
+                hit = wall_jumping & self._hits(k, solid)
+                self.x[hit & (push > 0)] = self.plat_left[k] - self.width
+                self.x[hit & (push < 0)] = self.plat_right[k]
+            self.last_wall_jump_ms[wall_jumping] = now
+            self.wall_dir[wall_jumping] = 0
+            self.last_grounded_ms[wall_jumping] = now - COYOTE_TIME_MS - 5
+
+        if self.hazards is not None:
+            exposed = np.flatnonzero(~died & (now >= self.grace_until))
+            if len(exposed):
+                # One-step paths at the shared time; first_hit's broad phase keeps to the couriers' span.
+                hit = self.hazards.first_hit(
+                    self.x[exposed, None].astype(np.float64),
+                    self.y[exposed, None].astype(np.float64),
+                    self.width,
+                    self.height,
+                    np.array([now / 1000.0]),
+                )
+                died[exposed[hit >= 0]] = True
+        if died.any():
+            self.grace_until[died] = now + HAZARD_RESPAWN_GRACE_MS
+            self.x[died] = self.spawn[0]
+            self.y[died] = self.spawn[1]
+            self.vel_x[died] = 0.0
+            self.vel_y[died] = 0.0
+            self.on_ground[died] = True
+            self.wall_dir[died] = 0
+            self.last_grounded_ms[died] = now
+            self.last_jump_press_ms[died] = NO_PRESS_MS
+            self.last_wall_jump_ms[died] = NO_PRESS_MS
+            self.deaths += died
+
+        door_left, door_top, door_right, door_bottom = self.door
+        at_door = (
+            (self.x < door_right)
+            & (self.x + self.width > door_left)
+            & (self.y < door_bottom)
+            & (self.y + self.height > door_top)
+        )
+        self.finished_frame[at_door & (self.finished_frame < 0)] = self.frame
+        return died
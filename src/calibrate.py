@@ -0,0 +1,169 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+
+import content
+from autopilot import run_contract
+from contracts import GOLDEN_PATH, build_contract_from_archetype, write_golden
+from hazards import HazardField
+from physics import FRAME_MS
+from rng import Rng, derive_seed
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CALIBRATION_PATH = os.path.join(BASE_DIR, "data", "calibration.json")
+# The simulated player population: each contract is flown once per skill level. Below about 0.85 the bot
+# misses routine jumps on every archetype alike, which flattens the table instead of separating it.
+SKILL_LEVELS = (0.85, 0.9, 0.95)
+# Formula scores are split per archetype into bins holding equal numbers of contracts, fewer when the runs
+# would not fill MIN_BIN_SAMPLES per bin.
+BINS_PER_ARCHETYPE = 4
+MIN_BIN_SAMPLES = 90
+# How much of the calibrated difficulty comes from failing versus from how long a clear takes. A failure
+# rate of FAILURE_CEIL or worse is the whole failure share; medians run from FAST (none) to SLOW (all).
+FAILURE_WEIGHT = 0.85
+TIME_WEIGHT = 0.15
+FAILURE_CEIL = 0.75
+FAST_CLEAR_SECONDS = 8.0
+SLOW_CLEAR_SECONDS = 30.0
+DIFFICULTY_FLOOR = 0.35
+DIFFICULTY_CEIL = 1.6
+
+_tables = None
+_hazards = None
+
+
+def _init_worker(data_dir, cache_dir):
+    global _tables, _hazards
+    _tables = content.load_content(data_dir, cache_dir)
+    _hazards = HazardField()
+
+
+def _play(job):
+    archetype_index, seed = job
+    archetype = _tables["archetypes"][archetype_index]
+    # Uncalibrated on purpose: the table maps the raw formula score onto what players actually hit.
+    contract = build_contract_from_archetype(archetype, seed, _tables["themes"])
+    runs = []
+    for skill in SKILL_LEVELS:
+        bot_rng = Rng(derive_seed(seed, f"skill-{skill}"))
+        result = run_contract(contract, skill=skill, rng=bot_rng, lives=contract["lives"], hazards=_hazards)
+        seconds = result["frames"] * FRAME_MS / 1000 if result["completed"] else None
+        runs.append((result["completed"], seconds))
+    return archetype["key"], contract["difficulty_score"], runs
+
+
+def _quantile_bins(samples):
+    # samples of one archetype, sorted by score, cut into runs of equal size.
+    runs = sum(len(sample[2]) for sample in samples)
+    count = max(1, min(BINS_PER_ARCHETYPE, runs // MIN_BIN_SAMPLES, len(samples)))
+    return [samples[idx * len(samples) // count : (idx + 1) * len(samples) // count] for idx in range(count)]
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _difficulty(clear_rate, median_seconds):
+    seconds = SLOW_CLEAR_SECONDS if median_seconds is None else median_seconds
+    failing = min(1.0, (1.0 - clear_rate) / FAILURE_CEIL)
+    slow = min(1.0, max(0.0, (seconds - FAST_CLEAR_SECONDS) / (SLOW_CLEAR_SECONDS - FAST_CLEAR_SECONDS)))
+    return DIFFICULTY_FLOOR + (FAILURE_WEIGHT * failing + TIME_WEIGHT * slow) * (DIFFICULTY_CEIL - DIFFICULTY_FLOOR)
+
+
+def _pool_adjacent(rows):
+    # Weighted isotonic fit over one archetype's rows in score order: neighbouring bins whose measured
+    # difficulty goes down as the score goes up are pooled, so the table never rates a harder roll easier.
+    blocks = []
+    for row in rows:
+        blocks.append([row["difficulty"] * row["samples"], row["samples"], [row]])
+        while len(blocks) > 1 and blocks[-2][0] / blocks[-2][1] > blocks[-1][0] / blocks[-1][1]:
+            total, weight, members = blocks.pop()
+            blocks[-1][0] += total
+            blocks[-1][1] += weight
+            blocks[-1][2].extend(members)
+    for total, weight, members in blocks:
+        for row in members:
+            row["difficulty"] = round(total / weight, 3)
+
+
+def fit_table(samples):
+    # samples: (archetype_key, formula_score, [(completed, seconds), ...]) per contract.
+    by_archetype = defaultdict(list)
+    for sample in samples:
+        by_archetype[sample[0]].append(sample)
+    rows = []
+    for key in sorted(by_archetype):
+        fitted = []
+        for members in _quantile_bins(sorted(by_archetype[key], key=lambda sample: sample[1])):
+            outcomes = [run for _, _, runs in members for run in runs]
+            times = [seconds for completed, seconds in outcomes if completed]
+            row = {
+                "archetype": key,
+                "score": round(sum(score for _, score, _ in members) / len(members), 3),
+                "samples": len(outcomes),
+                "clear_rate": round(len(times) / len(outcomes), 3),
+                "median_seconds": round(_percentile(times, 0.5), 2) if times else None,
+                "p90_seconds": round(_percentile(times, 0.9), 2) if times else None,
+            }
+            row["difficulty"] = _difficulty(row["clear_rate"], row["median_seconds"])
+            if row["median_seconds"] is None:
+                del row["median_seconds"], row["p90_seconds"]
+            fitted.append(row)
+        _pool_adjacent(fitted)
+        rows.extend(fitted)
+    return rows
+
+
+def calibrate(contracts_per_archetype, seed=1, workers=None, data_dir=None, cache_dir=None):
+    data_dir = data_dir or os.path.join(BASE_DIR, "data")
+    cache_dir = cache_dir or os.path.join(BASE_DIR, ".cache")
+    tables = content.load_content(data_dir, cache_dir)
+    seeds = Rng(seed)
+    jobs = [
+        (archetype_index, seeds.next_u32())
+        for archetype_index in range(len(tables["archetypes"]))
+        for _ in range(contracts_per_archetype)
+    ]
+    workers = max(1, workers or os.cpu_count() or 1)
+    chunk = max(1, len(jobs) // (workers * 8))
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(data_dir, cache_dir)) as pool:
+        samples = list(pool.imap_unordered(_play, jobs, chunksize=chunk))
+    return fit_table(samples), len(jobs) * len(SKILL_LEVELS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit contract difficulty to simulated runs and write data/calibration.json.")
+    parser.add_argument("--contracts", type=int, default=400, help="contracts per archetype")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: CPU count)")
+    parser.add_argument("--output", default=CALIBRATION_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="print the table without writing it")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    rows, runs = calibrate(args.contracts, args.seed, args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"{'archetype':<20}{'score':>6}{'runs':>6}{'clear':>7}{'median s':>10}{'calibrated':>12}")
+    for row in rows:
+        median = row.get("median_seconds")
+        print(
+            f"{row['archetype']:<20}{row['score']:>6.2f}{row['samples']:>6}{row['clear_rate']:>7.0%}"
+            f"{median if median is not None else float('nan'):>10.1f}{row['difficulty']:>12.2f}"
+        )
+    print(f"{runs} runs in {elapsed:.1f}s ({runs / elapsed:.0f} runs/s)")
+    if not args.dry_run:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(rows, handle, indent=2)
+            handle.write("\n")
+        print(f"wrote {len(rows)} rows to {args.output}")
+        if os.path.abspath(args.output) == os.path.abspath(CALIBRATION_PATH):
+            # The golden contract boards record calibrated payouts, so they move with the table.
+            write_golden(content.load_content(os.path.join(BASE_DIR, "data"), os.path.join(BASE_DIR, ".cache")))
+            print(f"rewrote {GOLDEN_PATH}")
+
+
+if __name__ == "__main__":
+    main()
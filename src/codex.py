@@ -0,0 +1,124 @@
+from bisect import bisect_left, insort
+
+CODEX_SORT_MODES = [
+    ("name", "Name"),
+    ("best_time", "Best Time"),
+    ("completions", "Completions"),
+    ("failures", "Failures"),
+]
+CODEX_FILTERS = [
+    ("all", "All"),
+    ("cleared", "Cleared"),
+    ("uncleared", "Uncleared"),
+]
+
+
+def _sort_key(mode, entry):
+    name = entry["name"].lower()
+    if mode == "best_time":
+        best = entry.get("best_time_ms")
+        return (best is None, best or 0, name, entry["key"])
+    if mode == "completions":
+        return (-entry["completions"], name, entry["key"])
+    if mode == "failures":
+        return (-entry["failures"], name, entry["key"])
+    return (name, entry["key"])
+
+
+def _passes_filter(filter_key, entry):
+    if filter_key == "cleared":
+        return entry["completions"] > 0
+    if filter_key == "uncleared":
+        return entry["completions"] == 0
+    return True
+
+
+class CodexStore:
+    def __init__(self):
+        self.entries = {}
+        # One sorted list of sort keys per (mode, filter) view. The entry key is the
+        # last element of every sort key, so rows can be resolved without a scan.
+        self.indexes = {
+            (mode, filter_key): [] for mode, _ in CODEX_SORT_MODES for filter_key, _ in CODEX_FILTERS
+        }
+        self._index_keys = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def _index_state(self, entry):
+        state = {}
+        for mode, _ in CODEX_SORT_MODES:
+            sort_key = _sort_key(mode, entry)
+            for filter_key, _ in CODEX_FILTERS:
+                state[(mode, filter_key)] = sort_key if _passes_filter(filter_key, entry) else None
+        return state
+
+    def _reindex(self, entry):
+        old_state = self._index_keys.get(entry["key"], {})
+        new_state = self._index_state(entry)
+        for view, new_key in new_state.items():
+            old_key = old_state.get(view)
+            if old_key == new_key:
+                continue
+            index = self.indexes[view]
+            if old_key is not None:
+                del index[bisect_left(index, old_key)]
+            if new_key is not None:
+                insort(index, new_key)
+        self._index_keys[entry["key"]] = new_state
+
+    def ensure(self, theme):
+        key = theme["key"]
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = {
+                "key": key,
+                "name": theme.get("name", "Unknown"),
+                "description": theme.get("description", ""),
+                "hazard": theme.get("hazard_name", "Hazard"),
+                "times_seen": 0,
+                "completions": 0,
+                "failures": 0,
+                "best_time_ms": None,
+                "best_beacons": 0,
+            }
+            self.entries[key] = entry
+            self._reindex(entry)
+        return entry
+
+    def record_sighting(self, theme):
+        entry = self.ensure(theme)
+        entry["times_seen"] += 1
+        return entry
+
+    def record_run(self, key, mission_time_ms, beacons_found, success=True):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if success:
+            entry["completions"] += 1
+            if mission_time_ms is not None:
+                best = entry.get("best_time_ms")
+                if best is None or mission_time_ms < best:
+                    entry["best_time_ms"] = mission_time_ms
+            if beacons_found:
+                entry["best_beacons"] = max(entry.get("best_beacons", 0), beacons_found)
+        else:
+            entry["failures"] += 1
+        self._reindex(entry)
+        return entry
+
+    def count(self, mode="name", filter_key="all"):
+        return len(self.indexes[(mode, filter_key)])
+
+    def rows(self, mode, filter_key, start, stop):
+        index = self.indexes[(mode, filter_key)]
+        entries = self.entries
+        return [entries[sort_key[-1]] for sort_key in index[start:stop]]
@@ -0,0 +1,142 @@
+import argparse
+import configparser
+import os
+
+from surfaceRegistry import parse_budgets
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+# Every tunable with its default; the default's type is the type a file, env var or flag is parsed as.
+CONFIG_DEFAULTS = {
+    "fps": 60,
+    "present_mode": "scaled",
+    "fullscreen": False,
+    "window": "800x600",
+    "quality": "auto",
+    "sprite_scale": 0.7,
+    "sprite_url": (
+        "https://hc-cdn.hel1.your-objectstorage.com/s/v3/"
+        "7c71df3b1e06cbc3381153d807734c44a07b9a91_postman_walk_pixel_sheet.png"
+    ),
+    "orb_scale": 1.0,
+    "orb_min": 12,
+    "audio": True,
+    "volume": 1.0,
+    "telemetry": True,
+    # Per-category surface memory budgets in MB, e.g. "text=4,gradients=16"; see surfaceRegistry.py.
+    "surface_budgets": "",
+}
+CONFIG_CHOICES = {
+    "present_mode": ("scaled", "window"),
+    "quality": ("auto", "low", "medium", "high"),
+}
+# Presets only name the keys they change; anything else keeps its default.
+CONFIG_PRESETS = {
+    "potato": {"fps": 30, "quality": "low", "sprite_scale": 0.6, "orb_scale": 0.5, "orb_min": 4},
+    "default": {},
+    "ultra": {"quality": "high", "orb_scale": 1.5, "orb_min": 18},
+    # Uncapped and fixed at full detail so frame times compare across machines; never downloads the sprite sheet.
+    "benchmark-uncapped": {"fps": 0, "quality": "high", "present_mode": "window", "sprite_url": ""},
+}
+CONFIG_FILE_NAMES = ("mups.toml", "mups.ini")
+CONFIG_ENV_PREFIX = "MUPS_"
+CONFIG_SECTION = "mups"
+
+
+def _coerce(key, value):
+    default = CONFIG_DEFAULTS[key]
+    if isinstance(value, str):
+        value = value.strip()
+        if isinstance(default, bool):
+            lowered = value.lower()
+            if lowered not in ("1", "0", "true", "false", "yes", "no", "on", "off"):
+                raise ValueError(f"{key}: expected a boolean, got {value!r}")
+            value = lowered in ("1", "true", "yes", "on")
+        elif isinstance(default, (int, float)):
+            try:
+                value = type(default)(value)
+            except ValueError:
+                raise ValueError(f"{key}: expected a number, got {value!r}") from None
+    elif isinstance(default, float) and isinstance(value, int) and not isinstance(value, bool):
+        value = float(value)
+    if not isinstance(value, type(default)):
+        raise ValueError(f"{key}: expected {type(default).__name__}, got {value!r}")
+    choices = CONFIG_CHOICES.get(key)
+    if choices and value not in choices:
+        raise ValueError(f"{key}: expected one of {', '.join(choices)}, got {value!r}")
+    return value
+
+
+def read_config_file(path):
+    # Returns (preset or None, {key: value}); a TOML or INI file keeps its settings under [mups].
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError(f"{path}: TOML config needs Python 3.11+, use an .ini file instead")
+        with open(path, "rb") as handle:
+            section = tomllib.load(handle).get(CONFIG_SECTION, {})
+    else:
+        parser = configparser.ConfigParser()
+        parser.read(path, encoding="utf-8")
+        section = dict(parser[CONFIG_SECTION]) if parser.has_section(CONFIG_SECTION) else {}
+    section = {key.replace("-", "_"): value for key, value in section.items()}
+    preset = section.pop("preset", None)
+    unknown = sorted(set(section) - set(CONFIG_DEFAULTS))
+    if unknown:
+        raise ValueError(f"{path}: unknown settings {', '.join(unknown)}")
+    return preset, {key: _coerce(key, value) for key, value in section.items()}
+
+
+def _env_values(environ):
+    preset = environ.get(f"{CONFIG_ENV_PREFIX}PRESET")
+    values = {}
+    for key in CONFIG_DEFAULTS:
+        raw = environ.get(CONFIG_ENV_PREFIX + key.upper())
+        if raw is not None:
+            values[key] = _coerce(key, raw)
+    return preset, values
+
+
+def add_config_arguments(parser):
+    parser.add_argument("--config", help="TOML or INI file (default: mups.toml / mups.ini in the project folder)")
+    parser.add_argument("--preset", choices=tuple(CONFIG_PRESETS))
+    parser.add_argument("--print-config", action="store_true", help="print the resolved settings and exit")
+    for key, default in CONFIG_DEFAULTS.items():
+        flag = "--" + key.replace("_", "-")
+        if isinstance(default, bool):
+            parser.add_argument(flag, dest=key, action=argparse.BooleanOptionalAction, default=None)
+        else:
+            parser.add_argument(flag, dest=key, default=None, choices=CONFIG_CHOICES.get(key), metavar=key.upper())
+    return parser
+
+
+def load_config(args, base_dir, environ=None):
+    # Precedence, lowest first: defaults, preset, config file, MUPS_* environment, command line.
+    # The preset itself is taken from the highest layer that names one.
+    environ = os.environ if environ is None else environ
+    path = args.config
+    if path is None:
+        path = next((os.path.join(base_dir, name) for name in CONFIG_FILE_NAMES if os.path.exists(os.path.join(base_dir, name))), None)
+    file_preset, file_values = read_config_file(path) if path else (None, {})
+    env_preset, env_values = _env_values(environ)
+    cli_values = {key: _coerce(key, getattr(args, key)) for key in CONFIG_DEFAULTS if getattr(args, key) is not None}
+    preset = args.preset or env_preset or file_preset or "default"
+    if preset not in CONFIG_PRESETS:
+        raise ValueError(f"unknown preset {preset!r}; expected one of {', '.join(CONFIG_PRESETS)}")
+    config = dict(CONFIG_DEFAULTS)
+    for layer in (CONFIG_PRESETS[preset], file_values, env_values, cli_values):
+        config.update(layer)
+    window_size(config)
+    parse_budgets(config["surface_budgets"])
+    config["preset"] = preset
+    config["source"] = path
+    return config
+
+
+def window_size(config):
+    width, _, height = config["window"].lower().partition("x")
+    if not (width.isdigit() and height.isdigit()):
+        raise ValueError(f"window: expected WIDTHxHEIGHT, got {config['window']!r}")
+    return int(width), int(height)
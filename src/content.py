@@ -0,0 +1,244 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+
+CONTENT_CACHE_VERSION = 1
+CONTENT_MANIFEST = "index.json"
+
+# field -> (kind, required)
+CONTENT_SCHEMAS = {
+    "themes": {
+        "key": ("str", True),
+        "name": ("str", True),
+        "description": ("str", False),
+        "sky_top": ("color", True),
+        "sky_bottom": ("color", True),
+        "ceiling_color": ("color", False),
+        "platform_color": ("color", False),
+        "hazard_name": ("str", False),
+        "hazard_color": ("color", False),
+        "glow_color": ("color", False),
+        "orb_palette": ("palette", False),
+        "orb_count": ("int", False),
+    },
+    "archetypes": {
+        "key": ("str", True),
+        "tier": ("str", True),
+        "tagline": ("str", True),
+        "summary": ("str", False),
+        "difficulty_range": ("range", True),
+        "gap_mul": ("range", False),
+        "width_mul": ("range", False),
+        "vertical_bias": ("range", False),
+        "horizontal_bias": ("range", False),
+        "life_bonus": ("int", False),
+        "gravity_offset": ("number", False),
+        "payout_bonus": ("number", False),
+        "xp_bonus": ("number", False),
+        "wall_jump": ("bool", False),
+        "moving_platforms": ("number", False),
+        "crumbling_platforms": ("number", False),
+        "phasing_platforms": ("number", False),
+        "traits": ("str_list", False),
+    },
+    "shop_items": {
+        "key": ("str", True),
+        "name": ("str", True),
+        "description": ("str", False),
+        "cost": ("int", True),
+        "type": ("str", True),
+        "value": ("any", True),
+        "max_stacks": ("int", False),
+    },
+    "ranks": {
+        "deliveries": ("int", True),
+        "title": ("str", True),
+    },
+    "milestones": {
+        "deliveries": ("int", True),
+        "type": ("str", True),
+        "value": ("any", False),
+        "text": ("str", False),
+    },
+    "calibration": {
+        "archetype": ("str", True),
+        "score": ("number", True),
+        "samples": ("int", True),
+        "clear_rate": ("number", True),
+        "median_seconds": ("number", False),
+        "p90_seconds": ("number", False),
+        "difficulty": ("number", True),
+    },
+}
+KEYED_TABLES = ("themes", "archetypes", "shop_items")
+COLOR_VALUE_TYPES = ("player_color", "color_unlock")
+
+
+class ContentError(ValueError):
+    pass
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _to_color(value):
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise ValueError("expected an [r, g, b] triple")
+    if not all(isinstance(channel, int) and 0 <= channel <= 255 for channel in value):
+        raise ValueError("color channels must be integers in 0-255")
+    return tuple(value)
+
+
+def _convert(kind, value):
+    if kind == "str":
+        if not isinstance(value, str):
+            raise ValueError("expected a string")
+        return value
+    if kind == "int":
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError("expected an integer")
+        return value
+    if kind == "number":
+        if not _is_number(value):
+            raise ValueError("expected a number")
+        return float(value)
+    if kind == "bool":
+        if not isinstance(value, bool):
+            raise ValueError("expected true/false")
+        return value
+    if kind == "color":
+        return _to_color(value)
+    if kind == "palette":
+        if not isinstance(value, list) or not value:
+            raise ValueError("expected a non-empty list of colors")
+        return [_to_color(color) for color in value]
+    if kind == "range":
+        if _is_number(value):
+            return float(value)
+        if isinstance(value, (list, tuple)) and len(value) == 2 and all(_is_number(v) for v in value):
+            low, high = float(value[0]), float(value[1])
+            if low > high:
+                raise ValueError("range minimum is larger than its maximum")
+            return (low, high)
+        raise ValueError("expected a number or a [min, max] pair")
+    if kind == "str_list":
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ValueError("expected a list of strings")
+        return list(value)
+    return value
+
+
+def validate_table(table, records, source="content"):
+    schema = CONTENT_SCHEMAS[table]
+    if not isinstance(records, list):
+        raise ContentError(f"{source}: '{table}' must be a list of records")
+    validated = []
+    for idx, record in enumerate(records):
+        label = f"{source}: {table}[{idx}]"
+        if not isinstance(record, dict):
+            raise ContentError(f"{label} must be an object")
+        if "key" in record:
+            label += f" ({record['key']})"
+        unknown = set(record) - set(schema)
+        if unknown:
+            raise ContentError(f"{label} has unknown fields: {', '.join(sorted(unknown))}")
+        clean = {}
+        for field, (kind, required) in schema.items():
+            if field not in record:
+                if required:
+                    raise ContentError(f"{label} is missing '{field}'")
+                continue
+            try:
+                clean[field] = _convert(kind, record[field])
+            except ValueError as exc:
+                raise ContentError(f"{label} field '{field}': {exc}") from None
+        if clean.get("type") in COLOR_VALUE_TYPES and "value" in clean:
+            try:
+                clean["value"] = _to_color(clean["value"])
+            except ValueError as exc:
+                raise ContentError(f"{label} field 'value': {exc}") from None
+        validated.append(clean)
+    return validated
+
+
+def _manifest_files(data_dir):
+    manifest_path = os.path.join(data_dir, CONTENT_MANIFEST)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError) as exc:
+        raise ContentError(f"Could not read content manifest {manifest_path}: {exc}") from None
+    files = {}
+    for table in CONTENT_SCHEMAS:
+        names = manifest.get(table)
+        if not isinstance(names, list) or not names:
+            raise ContentError(f"{CONTENT_MANIFEST}: '{table}' must list at least one data file")
+        files[table] = [os.path.join(data_dir, name) for name in names]
+    return files
+
+
+def _content_digest(files):
+    digest = hashlib.sha1(f"mups-content-{CONTENT_CACHE_VERSION}".encode("utf-8"))
+    for table in CONTENT_SCHEMAS:
+        for path in files[table]:
+            digest.update(f"{table}:{os.path.basename(path)}".encode("utf-8"))
+            try:
+                with open(path, "rb") as handle:
+                    digest.update(handle.read())
+            except OSError as exc:
+                raise ContentError(f"Could not read content file {path}: {exc}") from None
+    return digest.hexdigest()
+
+
+def compile_content(files):
+    content = {}
+    for table in CONTENT_SCHEMAS:
+        records = []
+        for path in files[table]:
+            try:
+                with open(path, "r", encoding="utf-8") as handle:
+                    data = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise ContentError(f"Could not parse {path}: {exc}") from None
+            records.extend(validate_table(table, data, os.path.basename(path)))
+        content[table] = records
+    for table in KEYED_TABLES:
+        seen_keys = set()
+        for record in content[table]:
+            if record["key"] in seen_keys:
+                raise ContentError(f"'{table}' defines key '{record['key']}' more than once")
+            seen_keys.add(record["key"])
+    for table in ("themes", "archetypes", "ranks"):
+        if not content[table]:
+            raise ContentError(f"'{table}' needs at least one record")
+    content["ranks"].sort(key=lambda rank: rank["deliveries"])
+    content["milestones"].sort(key=lambda milestone: milestone["deliveries"])
+    return content
+
+
+def load_content(data_dir, cache_dir=None):
+    files = _manifest_files(data_dir)
+    digest = _content_digest(files)
+    cache_path = os.path.join(cache_dir, f"content-{digest}.pickle") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as handle:
+                return pickle.load(handle)
+        except Exception:
+            pass
+    content = compile_content(files)
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for stale in glob.glob(os.path.join(cache_dir, "content-*.pickle")):
+                os.remove(stale)
+            temp_path = f"{cache_path}.tmp"
+            with open(temp_path, "wb") as handle:
+                pickle.dump(content, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass
+    return content
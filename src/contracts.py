@@ -0,0 +1,358 @@
+import argparse
+import json
+import os
+
+from rng import Rng
+from themes import synthesize_theme
+from worldGen import LEVEL_BOUNDS, contract_tuning, generate_layout
+
+CONTRACT_TIER_ORDER = ["easy", "medium", "hard"]
+PROCEDURAL_THEME_CHANCE = 0.5
+PROCEDURAL_SEED_SPACE = 1 << 16
+# Session seed -> contract board, checked by `python src/contracts.py --check` and by index.html?check.
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "golden", "contracts.json")
+GOLDEN_SESSION_SEEDS = tuple(range(1, 25))
+GOLDEN_FIELDS = (
+    "seed",
+    "archetype",
+    "name",
+    "description",
+    "payment",
+    "xp",
+    "gravity",
+    "jump",
+    "gap_min",
+    "gap_max",
+    "width_min",
+    "width_max",
+    "lives",
+    "difficulty",
+    "difficulty_raw",
+    "difficulty_score",
+    "label",
+    "vertical_bias",
+    "horizontal_bias",
+    "wall_jump",
+    "platform_mix",
+    "theme",
+    "theme_key",
+    "environment",
+    "hazard_label",
+    "hazard_kind",
+    "theme_context",
+)
+# What the shipped calibration table changes; recorded separately so both runtimes prove they look up the same rows.
+GOLDEN_CALIBRATED_FIELDS = ("difficulty", "payment", "xp", "label")
+# Contract -> level layout for every golden board contract, replayed by index.html's generateLayout as well.
+LAYOUT_GOLDEN_PATH = os.path.join(os.path.dirname(GOLDEN_PATH), "layouts.json")
+LAYOUT_GOLDEN_FIELDS = ("seed", "gravity", "jump", "gap_min", "gap_max", "width_min", "width_max", "vertical_bias", "horizontal_bias")
+
+namePrefixes = ["Aurora", "Nova", "Echo", "Titan", "Quantum", "Lumen", "Vortex", "Atlas", "Stellar", "Gale", "Eclipse", "Oracle"]
+nameSuffixes = ["Run", "Circuit", "Relay", "Shift", "Route", "Track", "Dash", "Spiral", "Passage", "Traverse", "Vector", "Expedition"]
+hazardDescriptors = ["charged dust lanes", "volatile thermal vents", "graviton storms", "magnetic shear pockets", "nebula acid rain", "rogue drone fields", "unstable warp echoes", "fractured bridgework"]
+# Which hazards.HAZARD_PROFILES entry each descriptor spawns in the level.
+hazardDescriptorKinds = {
+    "charged dust lanes": "dust",
+    "volatile thermal vents": "vent",
+    "graviton storms": "storm",
+    "magnetic shear pockets": "storm",
+    "nebula acid rain": "rain",
+    "rogue drone fields": "drone",
+    "unstable warp echoes": "drone",
+    "fractured bridgework": "rain",
+}
+difficultyScale = [(0.45, "Routine Route"), (0.7, "Risky Run"), (0.95, "Hazard Sweep"), (1.2, "Critical Gauntlet"), (10.0, "Impossible Route")]
+
+
+def pick_dimension_theme(rng, themes):
+    if rng.random() < PROCEDURAL_THEME_CHANCE:
+        return synthesize_theme(rng.randrange(PROCEDURAL_SEED_SPACE))
+    return rng.choice(themes)
+
+
+def _clampf(value, low, high):
+    return max(low, min(high, value))
+
+
+def _sample_range(value, fallback, rng):
+    if value is None:
+        return fallback
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return fallback
+        if len(value) == 1:
+            return value[0]
+        return rng.uniform(value[0], value[1])
+    return value
+
+
+def pick_contract_profiles(count, rng, archetypes):
+    selected = []
+    used_keys = set()
+    for tier in CONTRACT_TIER_ORDER:
+        if len(selected) >= count:
+            break
+        options = [arch for arch in archetypes if arch["tier"] == tier and arch["key"] not in used_keys]
+        if not options:
+            continue
+        choice = rng.choice(options)
+        selected.append(choice)
+        used_keys.add(choice["key"])
+    remaining_needed = count - len(selected)
+    remaining_pool = [arch for arch in archetypes if arch["key"] not in used_keys]
+    rng.shuffle(remaining_pool)
+    while remaining_needed > 0 and remaining_pool:
+        choice = remaining_pool.pop()
+        selected.append(choice)
+        used_keys.add(choice["key"])
+        remaining_needed -= 1
+    while len(selected) < count:
+        selected.append(rng.choice(archetypes))
+    rng.shuffle(selected)
+    return selected[:count]
+
+
+def index_calibration(records):
+    # archetype key -> [(formula score, calibrated difficulty)] sorted by score. Difficulty is carried
+    # forward as a running maximum, so a higher score never maps lower, even in a hand-edited table.
+    table = {}
+    for record in records:
+        table.setdefault(record["archetype"], []).append((record["score"], record["difficulty"]))
+    for points in table.values():
+        points.sort()
+        for idx in range(1, len(points)):
+            if points[idx][1] < points[idx - 1][1]:
+                points[idx] = (points[idx][0], points[idx - 1][1])
+    return table
+
+
+def calibrated_difficulty(calibration, archetype_key, score, default):
+    points = calibration.get(archetype_key) if calibration else None
+    if not points:
+        return default
+    if score <= points[0][0]:
+        return points[0][1]
+    for (low_score, low_diff), (high_score, high_diff) in zip(points, points[1:]):
+        if score <= high_score:
+            t = (score - low_score) / (high_score - low_score) if high_score > low_score else 0.0
+            return low_diff + (high_diff - low_diff) * t
+    return points[-1][1]
+
+
+def build_contract_from_archetype(archetype, seed, themes, calibration=None):
+    # index.html's buildContractFromArchetype is a draw-for-draw port of this; change both together and
+    # regenerate the golden board with `python src/contracts.py --write`.
+    rng = Rng(seed).stream("contract")
+    diff_range = archetype.get("difficulty_range", (0.35, 1.05))
+    if isinstance(diff_range, (list, tuple)) and len(diff_range) == 2:
+        base_diff = rng.uniform(diff_range[0], diff_range[1])
+    else:
+        base_diff = rng.uniform(0.35, 1.05)
+    gravity_val = round(
+        _clampf(
+            0.45 + base_diff * 0.35 + rng.uniform(-0.02, 0.02) + float(archetype.get("gravity_offset", 0.0)),
+            0.45,
+            0.9,
+        ),
+        3,
+    )
+    target_jump_height = rng.uniform(220 - base_diff * 60, 320 - base_diff * 20)
+    target_jump_height = max(160, target_jump_height)
+    jump_strength = round((target_jump_height * 2 * gravity_val) ** 0.5, 3)
+    gap_min_val = int(round(60 + base_diff * 55 + rng.uniform(-8, 8)))
+    gap_min_val = max(50, gap_min_val)
+    gap_spread = int(round(50 + base_diff * 80 + rng.uniform(-12, 12)))
+    gap_max_val = gap_min_val + max(30, gap_spread)
+    gap_mul = float(_sample_range(archetype.get("gap_mul"), 1.0, rng))
+    gap_min_val = int(round(gap_min_val * gap_mul))
+    gap_max_val = int(round(gap_max_val * gap_mul))
+    gap_min_val = max(40, gap_min_val)
+    gap_max_val = max(gap_min_val + 20, gap_max_val)
+    width_max_val = int(round(260 - base_diff * 110 + rng.uniform(-12, 12)))
+    width_max_val = max(140, width_max_val)
+    width_min_val = width_max_val - int(round(40 + base_diff * 45))
+    width_min_val = max(80, width_min_val)
+    width_mul = float(_sample_range(archetype.get("width_mul"), 1.0, rng))
+    width_min_val = int(round(width_min_val * width_mul))
+    width_max_val = int(round(width_max_val * width_mul))
+    if width_min_val >= width_max_val:
+        width_min_val = max(70, width_max_val - 20)
+    base_lives = max(2, 5 - int(base_diff * 3 + rng.random()))
+    base_lives += int(archetype.get("life_bonus", 0))
+    base_lives = max(1, base_lives)
+    difficulty_score = base_diff
+    difficulty_score += max(0, (gap_min_val - 70) / 140)
+    difficulty_score += max(0, (200 - width_max_val) / 200)
+    difficulty_score += (5 - base_lives) * 0.08
+    formula_score = difficulty_score
+    raw_score = _clampf(formula_score, 0.35, 1.6)
+    # The formula score only ranks the rolled parameters; calibration swaps in what simulated runs measured.
+    # Tables are keyed on the unclamped score, since most hard rolls sit past the clamp.
+    difficulty_score = calibrated_difficulty(calibration, archetype.get("key"), formula_score, raw_score)
+    payment = int(round(140 + difficulty_score * 340 + rng.uniform(-10, 10)))
+    xp_reward = int(round(80 + difficulty_score * 240))
+    payout_bonus = float(archetype.get("payout_bonus", 0.0))
+    xp_bonus = float(archetype.get("xp_bonus", 0.0))
+    if payout_bonus:
+        payment = int(round(payment * (1.0 + payout_bonus)))
+    if xp_bonus:
+        xp_reward = int(round(xp_reward * (1.0 + xp_bonus)))
+    label = "Unknown Route"
+    for threshold, tag in difficultyScale:
+        if difficulty_score <= threshold:
+            label = tag
+            break
+    hazard_text = rng.choice(hazardDescriptors)
+    tagline = archetype.get("tagline", label)
+    summary = archetype.get("summary", "")
+    theme = pick_dimension_theme(rng, themes)
+    theme_context = theme.get("description") or f"Look for landmarks in {theme['name']}."
+    if summary:
+        description = f"{tagline} — {summary} {theme_context} Expect {hazard_text}."
+    else:
+        description = f"{tagline} — {theme_context} Expect {hazard_text}."
+    traits = list(archetype.get("traits", ()))
+    platform_mix = {
+        kind: float(archetype[f"{kind}_platforms"]) for kind in ("moving", "crumbling", "phasing") if archetype.get(f"{kind}_platforms")
+    }
+    contract = {
+        "seed": seed,
+        "name": f"{rng.choice(namePrefixes)} {rng.choice(nameSuffixes)}",
+        "description": description,
+        "payment": payment,
+        "xp": xp_reward,
+        "gravity": gravity_val,
+        "jump": jump_strength,
+        "gap_min": gap_min_val,
+        "gap_max": gap_max_val,
+        "width_min": width_min_val,
+        "width_max": width_max_val,
+        "lives": base_lives,
+        "difficulty": round(difficulty_score, 2),
+        "difficulty_raw": round(raw_score, 2),
+        "difficulty_score": round(formula_score, 3),
+        "label": label,
+        "modifiers": traits,
+        "archetype": archetype.get("key", "unknown"),
+        "vertical_bias": float(_sample_range(archetype.get("vertical_bias"), 1.0, rng)),
+        "horizontal_bias": float(_sample_range(archetype.get("horizontal_bias"), 1.0, rng)),
+        "wall_jump": bool(archetype.get("wall_jump", False)),
+        "platform_mix": platform_mix,
+        "theme": theme,
+        "theme_key": theme.get("key"),
+        "environment": theme["name"],
+        "hazard_label": theme.get("hazard_name", hazard_text),
+        "hazard_kind": hazardDescriptorKinds.get(hazard_text),
+        "theme_context": theme_context,
+    }
+    return contract
+
+
+def roll_contract_board(count, rng, archetypes, themes, calibration=None):
+    # One hub visit's offer: profiles, a seed per contract, then an occasional reshuffle.
+    board = [
+        build_contract_from_archetype(archetype, rng.next_u32(), themes, calibration)
+        for archetype in pick_contract_profiles(count, rng, archetypes)
+    ]
+    if len(board) > 1 and rng.random() > 0.4:
+        rng.shuffle(board)
+    return board
+
+
+def golden_boards(archetypes, themes, calibration, count=3, session_seeds=GOLDEN_SESSION_SEEDS):
+    # Calibration never changes the draws, so each board is rolled twice: raw, and through the shipped table.
+    boards = []
+    for session_seed in session_seeds:
+        board = roll_contract_board(count, Rng(session_seed), archetypes, themes)
+        calibrated = roll_contract_board(count, Rng(session_seed), archetypes, themes, calibration)
+        boards.append(
+            {
+                "session_seed": session_seed,
+                "contracts": [{field: contract[field] for field in GOLDEN_FIELDS} for contract in board],
+                "calibrated": [{field: contract[field] for field in GOLDEN_CALIBRATED_FIELDS} for contract in calibrated],
+            }
+        )
+    # Round-trip through JSON so tuples compare equal to the lists read back from the file.
+    return json.loads(json.dumps({"count": count, "boards": boards}))
+
+
+def golden_layouts(contracts):
+    # Laid out from just the fields contract_tuning() reads, so the fixture holds everything the JS port needs.
+    layouts = []
+    for contract in contracts:
+        fields = {field: contract[field] for field in LAYOUT_GOLDEN_FIELDS}
+        layout = generate_layout(fields["seed"], contract_tuning(fields), LEVEL_BOUNDS)
+        layouts.append(
+            {
+                "contract": fields,
+                "sky_top": layout["sky_top"],
+                "platforms": [list(plat) for plat in layout["platforms"]],
+                "door": list(layout["door"]),
+                "beacons": [[*beacon["rect"].center, beacon["pulse"]] for beacon in layout["beacons"]],
+            }
+        )
+    return json.loads(json.dumps({"layouts": layouts}))
+
+
+def _write_json(data, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=1, ensure_ascii=False)
+        handle.write("\n")
+
+
+def write_golden(tables, path=GOLDEN_PATH, layout_path=LAYOUT_GOLDEN_PATH):
+    boards = golden_boards(tables["archetypes"], tables["themes"], index_calibration(tables["calibration"]))
+    _write_json(boards, path)
+    _write_json(golden_layouts(contract for board in boards["boards"] for contract in board["contracts"]), layout_path)
+    return boards
+
+
+def _differences(expected, actual, path):
+    if isinstance(expected, float) or isinstance(actual, float):
+        if not isinstance(actual, (int, float)) or abs(expected - actual) > 1e-9:
+            yield f"{path}: expected {expected!r}, got {actual!r}"
+    elif isinstance(expected, dict) and isinstance(actual, dict):
+        for key in expected.keys() | actual.keys():
+            yield from _differences(expected.get(key), actual.get(key), f"{path}.{key}")
+    elif isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            yield from _differences(left, right, f"{path}[{index}]")
+    elif expected != actual:
+        yield f"{path}: expected {expected!r}, got {actual!r}"
+
+
+def main():
+    import content
+
+    parser = argparse.ArgumentParser(description="Check or regenerate the golden contract board and level layout fixtures.")
+    parser.add_argument("--check", action="store_true", help="exit 1 if the builders no longer reproduce the fixtures")
+    parser.add_argument("--write", action="store_true", help="overwrite the fixtures with the current builders' output")
+    args = parser.parse_args()
+    data_dir = os.path.dirname(GOLDEN_PATH)
+    tables = content.load_content(os.path.dirname(data_dir))
+    if args.write:
+        boards = write_golden(tables)
+        print(f"contracts: wrote {len(boards['boards'])} boards to {GOLDEN_PATH} and their layouts to {LAYOUT_GOLDEN_PATH}")
+        return
+    boards = golden_boards(tables["archetypes"], tables["themes"], index_calibration(tables["calibration"]))
+    with open(GOLDEN_PATH, encoding="utf-8") as handle:
+        golden = json.load(handle)
+    failures = list(_differences(golden, boards, "golden"))
+    for failure in failures[:20]:
+        print(failure)
+    synthesized = sum(contract["theme_key"].startswith("synth_") for board in golden["boards"] for contract in board["contracts"])
+    print(f"contracts: {len(golden['boards'])} boards, {synthesized} synthesized themes, {len(failures)} differences")
+    with open(LAYOUT_GOLDEN_PATH, encoding="utf-8") as handle:
+        golden_layout = json.load(handle)
+    layouts = golden_layouts(record["contract"] for record in golden_layout["layouts"])
+    layout_failures = list(_differences(golden_layout, layouts, "layouts"))
+    for failure in layout_failures[:20]:
+        print(failure)
+    print(f"layouts: {len(golden_layout['layouts'])} layouts, {len(layout_failures)} differences")
+    if args.check and (failures or layout_failures):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
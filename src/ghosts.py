@@ -0,0 +1,195 @@
+import os
+import struct
+from array import array
+
+import pygame
+
+from physics import PLAYER_SIZE
+from surfaceRegistry import surfaceRegistry
+
+# Trajectories are sampled on a fixed level-time grid rather than per rendered frame, so a ghost
+# replays at the same pace whatever the frame rate was while it was recorded.
+GHOST_SAMPLE_MS = 25
+GHOST_MAGIC = b"GHST"
+GHOST_VERSION = 1
+# magic, version, level seed, clear time in ms, sample spacing in ms
+GHOST_HEADER = struct.Struct("<4sBIIH")
+# Ten minutes of samples; anything longer stops recording rather than growing without bound.
+GHOST_MAX_SAMPLES = 10 * 60 * 1000 // GHOST_SAMPLE_MS
+# Steps longer than this (respawns) snap instead of sliding the ghost across the hall.
+GHOST_SNAP_PX = 48
+GHOST_COLOR = (170, 225, 255)
+GHOST_ALPHA = 110
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def _unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def _put_varint(buffer, value):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+class GhostRecorder:
+    # Appends zigzag varint (dx, dy) pairs to one reusable byte array; a courier walking or falling
+    # moves a few pixels per sample, so nearly every sample costs two bytes.
+    def __init__(self, sample_ms=GHOST_SAMPLE_MS):
+        self.sample_ms = sample_ms
+        self.buffer = array("B")
+        self.start()
+
+    def start(self):
+        del self.buffer[:]
+        self.next_ms = 0
+        self.samples = 0
+        self.last_x = 0
+        self.last_y = 0
+
+    def sample(self, level_ms, x, y):
+        # A long frame repeats the current position for every tick it skipped.
+        while level_ms >= self.next_ms and self.samples < GHOST_MAX_SAMPLES:
+            _put_varint(self.buffer, _zigzag(x - self.last_x))
+            _put_varint(self.buffer, _zigzag(y - self.last_y))
+            self.last_x = x
+            self.last_y = y
+            self.samples += 1
+            self.next_ms += self.sample_ms
+
+    def encode(self, seed, time_ms):
+        return GHOST_HEADER.pack(GHOST_MAGIC, GHOST_VERSION, seed, int(time_ms), self.sample_ms) + self.buffer.tobytes()
+
+
+def ghost_time_ms(data):
+    if not data or len(data) < GHOST_HEADER.size:
+        return None
+    magic, version, _, time_ms, _ = GHOST_HEADER.unpack_from(data)
+    if magic != GHOST_MAGIC or version != GHOST_VERSION:
+        return None
+    return time_ms
+
+
+class GhostPlayer:
+    # Decodes a recording as the level clock advances: one cursor into the bytes and the two samples
+    # either side of the current time, so playback never builds a list or a new object per frame.
+    def __init__(self):
+        self.rect = pygame.Rect((0, 0), PLAYER_SIZE)
+        self.unload()
+
+    def unload(self):
+        self.data = b""
+        self.active = False
+        self.finished = False
+
+    def load(self, data):
+        if ghost_time_ms(data) is None:
+            self.unload()
+            return False
+        _, _, self.seed, self.time_ms, self.sample_ms = GHOST_HEADER.unpack_from(data)
+        self.data = data
+        self.offset = GHOST_HEADER.size
+        self.index = 0
+        self.x0 = self.y0 = 0
+        self.x1 = self.y1 = 0
+        self.active = True
+        self.finished = False
+        if not self._step():
+            self.unload()
+            return False
+        self.x0, self.y0 = self.x1, self.y1
+        self.finished = not self._step()
+        self.rect.topleft = (self.x0, self.y0)
+        return True
+
+    def _varint(self):
+        data = self.data
+        offset = self.offset
+        shift = 0
+        value = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        self.offset = offset
+        return _unzigzag(value)
+
+    def _step(self):
+        # Moves the lookahead sample (x1, y1) forward by one; False once the stream is spent.
+        if self.offset >= len(self.data):
+            return False
+        self.x1 += self._varint()
+        self.y1 += self._varint()
+        return True
+
+    def advance(self, level_ms):
+        if not self.active:
+            return False
+        while level_ms >= (self.index + 1) * self.sample_ms:
+            self.x0 = self.x1
+            self.y0 = self.y1
+            self.index += 1
+            if not self._step():
+                self.finished = True
+                break
+        rect = self.rect
+        dx = self.x1 - self.x0
+        dy = self.y1 - self.y0
+        if self.finished or abs(dx) > GHOST_SNAP_PX or abs(dy) > GHOST_SNAP_PX:
+            rect.x = self.x0
+            rect.y = self.y0
+        else:
+            blend = (level_ms - self.index * self.sample_ms) / self.sample_ms
+            rect.x = self.x0 + int(dx * blend)
+            rect.y = self.y0 + int(dy * blend)
+        return not self.finished
+
+
+def build_ghost_surface(size=PLAYER_SIZE, color=GHOST_COLOR):
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    rect = surface.get_rect()
+    pygame.draw.rect(surface, (*color, GHOST_ALPHA), rect, border_radius=6)
+    pygame.draw.rect(surface, (*color, min(255, GHOST_ALPHA * 2)), rect, 2, border_radius=6)
+    return surfaceRegistry.track(surface, "ghost")
+
+
+class GhostStore:
+    # Best clear per level seed, kept in memory and mirrored to one small file per seed.
+    def __init__(self, directory):
+        self.directory = directory
+        self.ghosts = {}
+
+    def _path(self, seed):
+        return os.path.join(self.directory, f"{seed:08x}.ghost")
+
+    def get(self, seed):
+        if seed not in self.ghosts:
+            try:
+                with open(self._path(seed), "rb") as handle:
+                    data = handle.read()
+            except OSError:
+                data = None
+            self.ghosts[seed] = data if ghost_time_ms(data) is not None else None
+        return self.ghosts[seed]
+
+    def offer(self, seed, time_ms, recorder):
+        best = ghost_time_ms(self.get(seed))
+        if time_ms is None or not recorder.samples or (best is not None and time_ms >= best):
+            return False
+        data = recorder.encode(seed, time_ms)
+        self.ghosts[seed] = data
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(seed), "wb") as handle:
+                handle.write(data)
+        except OSError:
+            pass
+        return True
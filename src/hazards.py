@@ -0,0 +1,339 @@
+import math
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pygame
+
+from rng import Rng
+from surfaceRegistry import surfaceRegistry
+
+# Motion per kind, sampled per hazard. density is hazards per 1000px of hall at difficulty 1.0;
+# speed is radians/s for the sway, fall is px/s for hazards that drop and wrap back to the sky.
+HAZARD_PROFILES = {
+    "drone": {"density": 1.5, "radius": (9, 13), "amp_x": (40, 120), "amp_y": (0, 14), "speed": (0.8, 1.6), "orbit": False, "fall": (0, 0)},
+    "vent": {"density": 1.2, "radius": (10, 14), "amp_x": (0, 0), "amp_y": (50, 110), "speed": (1.0, 1.8), "orbit": False, "fall": (0, 0)},
+    "storm": {"density": 1.0, "radius": (12, 16), "amp_x": (40, 80), "amp_y": (40, 80), "speed": (0.6, 1.2), "orbit": True, "fall": (0, 0)},
+    "rain": {"density": 4.0, "radius": (3, 5), "amp_x": (0, 6), "amp_y": (0, 0), "speed": (1.0, 2.0), "orbit": False, "fall": (120, 220)},
+    "dust": {"density": 2.5, "radius": (4, 6), "amp_x": (150, 300), "amp_y": (10, 30), "speed": (0.3, 0.6), "orbit": False, "fall": (0, 0)},
+}
+HAZARD_KINDS = tuple(HAZARD_PROFILES)
+# Keeps the spawn pad and the door approach free of hazards.
+HAZARD_CLEAR_ZONE = 60
+HAZARD_VIEW_MARGIN = 32
+# After a respawn (or level start) hazards cannot hit the courier for this long.
+HAZARD_RESPAWN_GRACE_MS = 1200
+HAZARD_POOL_SIZE = 256
+# Column width of the sway index touching() looks hazards up in.
+HAZARD_CELL = 128
+HAZARD_GLOW_ALPHA = 70
+
+
+def _draw_hazard_sprite(radius, color):
+    size = (radius + 4) * 2
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    center = (size // 2, size // 2)
+    pygame.draw.circle(sprite, (*color, HAZARD_GLOW_ALPHA), center, radius + 4)
+    pygame.draw.circle(sprite, color, center, radius)
+    pygame.draw.circle(sprite, (255, 255, 255), center, max(1, radius // 3))
+    return surfaceRegistry.track(sprite, "hazards")
+
+
+class HazardField:
+    # Structure-of-arrays pool of moving hazards. Slots are recycled through a free list and the arrays
+    # only grow (doubling) when a level needs more than the pool holds, so levels reuse the same storage.
+    # Positions are closed-form in level time, so a frame only touches the hazards that can reach the view,
+    # found by bisecting an anchor-sorted index that is rebuilt only when hazards spawn or despawn.
+    def __init__(self, capacity=HAZARD_POOL_SIZE):
+        self.capacity = 0
+        self._allocate(capacity)
+        self.sprites = {}
+        self.color = (255, 90, 90)
+        self.clear()
+
+    def _allocate(self, capacity):
+        def grow(name, dtype, fill=0):
+            array = np.full(capacity, fill, dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                array[: len(old)] = old
+            setattr(self, name, array)
+
+        for name in ("anchor_x", "anchor_y", "amp_x", "amp_y", "omega", "phase", "axis_phase", "fall", "top", "span", "x", "y"):
+            grow(name, np.float64)
+        grow("radius", np.int32)
+        grow("kind", np.int8)
+        grow("active", bool, False)
+        self.free = list(range(capacity - 1, self.capacity - 1, -1)) + getattr(self, "free", [])
+        self.capacity = capacity
+
+    def clear(self):
+        self.active[:] = False
+        self.free = list(range(self.capacity - 1, -1, -1))
+        self.count = 0
+        self.awake = np.empty(0, dtype=np.intp)
+        self._index_dirty = True
+
+    def set_color(self, color):
+        if tuple(color) != self.color:
+            self.color = tuple(color)
+            self.sprites.clear()
+
+    def spawn(self, kind, x, y, radius, amp_x=0.0, amp_y=0.0, omega=0.0, phase=0.0, orbit=False, fall=0.0, top=0.0, span=1.0):
+        if not self.free:
+            self._allocate(self.capacity * 2)
+        idx = self.free.pop()
+        self.kind[idx] = HAZARD_KINDS.index(kind)
+        self.anchor_x[idx] = self.x[idx] = x
+        self.anchor_y[idx] = self.y[idx] = y
+        self.radius[idx] = radius
+        self.amp_x[idx] = amp_x
+        self.amp_y[idx] = amp_y
+        self.omega[idx] = omega
+        self.phase[idx] = phase
+        self.axis_phase[idx] = math.pi / 2 if orbit else 0.0
+        self.fall[idx] = fall
+        self.top[idx] = top
+        self.span[idx] = max(1.0, span)
+        self.active[idx] = True
+        self.count += 1
+        self._index_dirty = True
+        return idx
+
+    def despawn(self, idx):
+        if self.active[idx]:
+            self.active[idx] = False
+            self.free.append(idx)
+            self.count -= 1
+            self._index_dirty = True
+
+    def _rebuild_index(self):
+        active = np.flatnonzero(self.active)
+        self._order = active[np.argsort(self.anchor_x[active], kind="stable")]
+        self._sorted_x = self.anchor_x[self._order]
+        reach = self.amp_x[self._order] + self.radius[self._order]
+        self._max_reach = float(reach.max()) if len(reach) else 0.0
+        # Plain-float copies in the same order for touching(), which the headless bots call every frame
+        # and which only ever looks at a handful of hazards, where per-call NumPy overhead dominates.
+        self._anchors = self._sorted_x.tolist()
+        self._order_slots = self._order.tolist()
+        fields = ("anchor_x", "anchor_y", "amp_x", "amp_y", "omega", "phase", "axis_phase", "fall", "top", "span", "radius")
+        self._probe = list(zip(*(getattr(self, name)[self._order].tolist() for name in fields)))
+        # Column -> the probes whose horizontal sway overlaps it, so a per-frame probe skips the far swings.
+        self._columns = {}
+        for probe in self._probe:
+            anchor_x, amp_x, radius = probe[0], probe[2], probe[10]
+            for cell in range(int(anchor_x - amp_x - radius) // HAZARD_CELL, int(anchor_x + amp_x + radius) // HAZARD_CELL + 1):
+                self._columns.setdefault(cell, []).append(probe)
+        self._index_dirty = False
+
+    def _positions(self, idx, seconds):
+        # idx and seconds broadcast, so a column of times yields one row of positions per time.
+        angle = self.omega[idx] * seconds + self.phase[idx]
+        x = self.anchor_x[idx] + self.amp_x[idx] * np.sin(angle)
+        y = self.anchor_y[idx] + self.amp_y[idx] * np.sin(angle + self.axis_phase[idx])
+        fall = self.fall[idx]
+        falling = fall > 0
+        if falling.any():
+            top = self.top[idx]
+            y = np.where(falling, top + np.mod(y - top + fall * seconds, self.span[idx]), y)
+        return x, y
+
+    def near(self, left, right):
+        # Broad phase: a hazard can only reach [left, right] if its anchor is within the widest sway of it.
+        if self._index_dirty:
+            self._rebuild_index()
+        reach = self._max_reach + HAZARD_VIEW_MARGIN
+        low = np.searchsorted(self._sorted_x, left - reach, "left")
+        high = np.searchsorted(self._sorted_x, right + reach, "right")
+        return self._order[low:high]
+
+    def update(self, seconds, view_left, view_right):
+        awake = self.awake = self.near(view_left, view_right)
+        if len(awake):
+            self.x[awake], self.y[awake] = self._positions(awake, seconds)
+        return awake
+
+    def sweeping(self, left, right, top, bottom):
+        # Pool slots of the hazards whose whole sway (or fall column) can overlap the box.
+        if self._index_dirty:
+            self._rebuild_index()
+        low = bisect_left(self._anchors, left - self._max_reach)
+        high = bisect_right(self._anchors, right + self._max_reach)
+        found = []
+        for slot, (anchor_x, anchor_y, amp_x, amp_y, _, _, _, fall, _, _, radius) in zip(
+            self._order_slots[low:high], self._probe[low:high]
+        ):
+            if anchor_x + amp_x + radius <= left or anchor_x - amp_x - radius >= right:
+                continue
+            if not fall and (anchor_y + amp_y + radius <= top or anchor_y - amp_y - radius >= bottom):
+                continue
+            found.append(slot)
+        return found
+
+    def paths(self, slots, seconds):
+        # Where each of `slots` is at each of `seconds`: (x, y), one row per time, for first_hit() callers
+        # that test many moves against the same stretch of time.
+        return self._positions(slots, seconds[:, None])
+
+    def first_hit(self, lefts, tops, width, height, seconds, margin=0, slots=None, paths=None):
+        # Predicted paths: rect corners per step at the shared `seconds`, one path per row of lefts/tops
+        # (or a single 1-D path); inf marks steps a path doesn't have. Returns the first step that touches a
+        # hazard, per path, or -1 where the path stays clear. Positions are closed-form, so update() is untouched.
+        # slots, from sweeping() over a box the paths stay inside, skips the broad phase; paths, from paths()
+        # for those slots at `seconds`, skips the position maths (seconds may then be None).
+        if slots is None:
+            present = np.isfinite(lefts)
+            if not present.any():
+                return np.full(lefts.shape[:-1], -1)
+            xs, ys = lefts[present], tops[present]
+            slots = self.sweeping(
+                float(xs.min()) - margin, float(xs.max()) + width + margin, float(ys.min()) - margin, float(ys.max()) + height + margin
+            )
+        if not len(slots):
+            return np.full(lefts.shape[:-1], -1)
+        x, y = self._positions(slots, seconds[:, None]) if paths is None else paths
+        reach = (self.radius[slots] + margin) ** 2
+        # Distance to the rect on each axis, zero inside it, measured from its centre: the fewest array passes,
+        # which is what these small paths cost. np.clip's dispatch costs more than the maths here.
+        dx = np.abs(x - (lefts[..., None] + width / 2)) - width / 2
+        dy = np.abs(y - (tops[..., None] + height / 2)) - height / 2
+        np.maximum(dx, 0.0, out=dx)
+        np.maximum(dy, 0.0, out=dy)
+        dx *= dx
+        dy *= dy
+        dx += dy
+        hit = (dx < reach).any(axis=-1)
+        return np.where(hit.any(axis=-1), hit.argmax(axis=-1), -1)
+
+    def hits(self, rect):
+        awake = self.awake
+        if not len(awake):
+            return False
+        x = self.x[awake]
+        radius = self.radius[awake]
+        near = np.abs(x - rect.centerx) <= radius + rect.width / 2
+        if not near.any():
+            return False
+        x = x[near]
+        y = self.y[awake][near]
+        radius = radius[near]
+        dx = x - np.clip(x, rect.left, rect.right)
+        dy = y - np.clip(y, rect.top, rect.bottom)
+        return bool((dx * dx + dy * dy < radius * radius).any())
+
+    def touching(self, rect, seconds):
+        # hits() at an arbitrary time without update(): same closed form, evaluated per hazard in plain floats.
+        if self._index_dirty:
+            self._rebuild_index()
+        left, right, top, bottom = rect.left, rect.right, rect.top, rect.bottom
+        first, last = left // HAZARD_CELL, right // HAZARD_CELL
+        probes = self._columns.get(first, ())
+        if last != first:
+            # A hazard sitting in both columns is just checked twice.
+            probes = [*probes, *self._columns.get(last, ())]
+        for anchor_x, anchor_y, amp_x, amp_y, omega, phase, axis_phase, fall, sky, span, radius in probes:
+            if anchor_x + amp_x + radius <= left or anchor_x - amp_x - radius >= right:
+                continue
+            if not fall and (anchor_y + amp_y + radius <= top or anchor_y - amp_y - radius >= bottom):
+                continue
+            angle = omega * seconds + phase
+            x = anchor_x + amp_x * math.sin(angle)
+            dx = x - min(max(x, left), right)
+            if dx * dx >= radius * radius:
+                continue
+            y = anchor_y + amp_y * math.sin(angle + axis_phase)
+            if fall:
+                y = sky + (y - sky + fall * seconds) % span
+            dy = y - min(max(y, top), bottom)
+            if dx * dx + dy * dy < radius * radius:
+                return True
+        return False
+
+    def closest(self, x, y, seconds, reach, count):
+        # Up to `count` hazards whose centres are within `reach` px of (x, y) at `seconds`, nearest first,
+        # as (dx, dy, radius) tuples; plain floats like touching(), for per-step observations.
+        if self._index_dirty:
+            self._rebuild_index()
+        low = bisect_left(self._anchors, x - reach - self._max_reach)
+        high = bisect_right(self._anchors, x + reach + self._max_reach)
+        found = []
+        for anchor_x, anchor_y, amp_x, amp_y, omega, phase, axis_phase, fall, sky, span, radius in self._probe[low:high]:
+            angle = omega * seconds + phase
+            dx = anchor_x + amp_x * math.sin(angle) - x
+            if abs(dx) > reach:
+                continue
+            hazard_y = anchor_y + amp_y * math.sin(angle + axis_phase)
+            if fall:
+                hazard_y = sky + (hazard_y - sky + fall * seconds) % span
+            dy = hazard_y - y
+            distance = dx * dx + dy * dy
+            if distance <= reach * reach:
+                found.append((distance, dx, dy, radius))
+        found.sort()
+        return [entry[1:] for entry in found[:count]]
+
+    def _sprite(self, radius):
+        sprite = self.sprites.get(radius)
+        if sprite is None:
+            sprite = self.sprites[radius] = _draw_hazard_sprite(radius, self.color)
+        return sprite
+
+    def draw(self, surface, camera_x):
+        awake = self.awake
+        if not len(awake):
+            return
+        width = surface.get_width()
+        x = self.x[awake] - camera_x
+        radius = self.radius[awake]
+        shown = (x + radius >= 0) & (x - radius <= width)
+        offsets = radius[shown] + 4
+        draw_x = (x[shown] - offsets).astype(np.int32)
+        draw_y = (self.y[awake][shown] - offsets).astype(np.int32)
+        surface.blits(
+            ((self._sprite(r), (dx, dy)) for r, dx, dy in zip(radius[shown].tolist(), draw_x, draw_y)),
+            doreturn=False,
+        )
+
+
+def populate_hazards(field, layout, kind, difficulty, bounds):
+    # Seeds from the level's own stream so hazards never move the layout or backdrop rolls.
+    field.clear()
+    profile = HAZARD_PROFILES.get(kind)
+    if profile is None:
+        return 0
+    rng = Rng(layout["seed"]).stream("hazards")
+    floor_y = bounds["floor_y"]
+    sky_top = layout["sky_top"]
+    low_x = layout["start"].right + HAZARD_CLEAR_ZONE
+    high_x = layout["end"].left - HAZARD_CLEAR_ZONE
+    if high_x <= low_x:
+        return 0
+    count = int(round(profile["density"] * (high_x - low_x) / 1000 * difficulty))
+    for _ in range(count):
+        radius = rng.randint(*profile["radius"])
+        amp_x = min(rng.uniform(*profile["amp_x"]), (high_x - low_x) / 2)
+        amp_y = rng.uniform(*profile["amp_y"])
+        fall = rng.uniform(*profile["fall"])
+        # The whole sway stays between the clear zones, not just the anchor.
+        x = rng.uniform(low_x + amp_x, high_x - amp_x)
+        if kind == "vent":
+            y = floor_y - amp_y - radius - 10
+        elif fall:
+            y = rng.uniform(sky_top, floor_y)
+        else:
+            y = rng.uniform(sky_top + amp_y + radius + 20, floor_y - amp_y - radius - 60)
+        field.spawn(
+            kind,
+            x,
+            y,
+            radius,
+            amp_x,
+            amp_y,
+            rng.uniform(*profile["speed"]),
+            rng.uniform(0, math.tau),
+            profile["orbit"],
+            fall,
+            sky_top,
+            floor_y - sky_top,
+        )
+    return count
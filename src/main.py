@@ -1,29 +1,94 @@
+import argparse
 import io
 import urllib.request
 
 import os
 import math
-import pygame, sys, random
+import time
+import pygame, sys
 from enum import Enum, auto
 
+import content
+from allocCheck import AllocationProbe
+from assetBundle import BundleError, load_bundle
+from audio import AUDIO_BUFFER, AUDIO_FREQUENCY, AudioSystem
+from codex import CODEX_FILTERS, CODEX_SORT_MODES, CodexStore
+from config import add_config_arguments, load_config, window_size
+from contracts import index_calibration, roll_contract_board
+from ghosts import GhostPlayer, GhostRecorder, GhostStore, build_ghost_surface
+from hazards import HAZARD_RESPAWN_GRACE_MS, HAZARD_VIEW_MARGIN, HazardField, populate_hazards
+from particles import ParticleSystem
+from physics import NO_PRESS_MS, PLAYER_SIZE, input_velocity, move_horizontal, move_vertical, new_body_state, resolve_jump
+from platforms import PlatformSet, plan_platform_behaviours
+from presenter import Presenter
+from progression import ProgressionTracker
+from quality import QUALITY_TIERS, QualityGovernor
+from rng import Rng, time_seed
+from surfaceRegistry import parse_budgets, surfaceRegistry
+from telemetry import (
+    EVENT_BEACON,
+    EVENT_CONTRACT_ACCEPTED,
+    EVENT_DEATH,
+    EVENT_FRAME_MISS,
+    EVENT_LEVEL_BUILT,
+    EVENT_PURCHASE,
+    EVENT_SESSION,
+    EVENT_STATE_CHANGE,
+    EVENT_WIN,
+    FRAME_MISS_RATIO,
+    Telemetry,
+)
+from runHistory import HISTORY_PATH, OUTCOME_CLEARED, OUTCOME_FAILED, TREND_WINDOW, RunHistory, run_record
+from themes import level_palette, synthesize_theme
+from toasts import ToastQueue
+from worldGen import LEVEL_BOUNDS, build_backdrop, contract_tuning, generate_layout
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Settings are resolved once, before the window opens: preset, then mups.toml/mups.ini, then MUPS_* env vars, then flags.
+argParser = add_config_arguments(argparse.ArgumentParser(description="M.U.P.S — Multi-Universal Postal Service"))
+argParser.add_argument(
+    "--alloc-check", action="store_true", help="play the hub and a level uncapped, report allocations per frame and exit 1 over budget"
+)
+cliArgs = argParser.parse_args()
+try:
+    CONFIG = load_config(cliArgs, BASE_DIR)
+except (OSError, ValueError) as exc:
+    argParser.error(str(exc))
+if cliArgs.print_config:
+    for key, value in CONFIG.items():
+        print(f"{key:<14}{value}")
+    sys.exit()
+TARGET_FPS = 0 if cliArgs.alloc_check else CONFIG["fps"]
+surfaceRegistry.set_budgets(parse_budgets(CONFIG["surface_budgets"]))
+# Gameplay events go to saves/telemetry/ as JSONL; emit() just drops a tuple into a ring a writer thread drains.
+telemetry = Telemetry(enabled=CONFIG["telemetry"])
+telemetry.emit(EVENT_SESSION, time.strftime("%Y-%m-%dT%H:%M:%S"), CONFIG["preset"], TARGET_FPS, CONFIG["quality"])
+
+# Open the mixer with a small buffer before pygame.init() picks its own, larger default.
+pygame.mixer.pre_init(AUDIO_FREQUENCY, -16, 2, AUDIO_BUFFER)
 pygame.init()
 screenWidth, screenHeight = 800, 600
-screen = pygame.display.set_mode((screenWidth, screenHeight))
+# Everything draws into the 800x600 canvas; the presenter stretches it to whatever window or monitor we have.
+presenter = Presenter((screenWidth, screenHeight), CONFIG["present_mode"], CONFIG["fullscreen"], window_size(CONFIG))
+screen = presenter.canvas
 pygame.display.set_caption("M.U.P.S — Loading Dimension")
 clock = pygame.time.Clock()
 uiFont = pygame.font.Font(None, 28)
 titleFont = pygame.font.Font(None, 48)
 smallFont = pygame.font.Font(None, 22)
 
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-PLAYER_SPRITE_CDN = (
-    "https://hc-cdn.hel1.your-objectstorage.com/s/v3/"
-    "7c71df3b1e06cbc3381153d807734c44a07b9a91_postman_walk_pixel_sheet.png"
-)
+
+def render_text(font, text, antialias, color):
+    # Rendered lines come from the surface registry's "text" LRU, so repeated labels are not re-rendered
+    # each frame; callers only blit the result and never draw into it.
+    return surfaceRegistry.cached("text", (font, text, antialias, color), font.render, text, antialias, color)
+
+
+CONTENT = content.load_content(os.path.join(BASE_DIR, "data"), os.path.join(BASE_DIR, ".cache"))
+PLAYER_SPRITE_CDN = CONFIG["sprite_url"]
 PLAYER_SPRITE_FRAME_COUNT = 16
-PLAYER_SPRITE_SCALE = 0.7
+PLAYER_SPRITE_SCALE = CONFIG["sprite_scale"]
 PLAYER_ANIM_FRAME_TIME = 90
-PLAYER_SPRINT_MULTIPLIER = 1.7
 
 
 def _slice_frames(sheet):
@@ -48,21 +113,45 @@ def _slice_frames(sheet):
             offset_center = art_center - (frame_width / 2)
         offsets.append(int(round(offset_center * scale_x)))
         scaled = pygame.transform.scale(frame_surface, (draw_width, draw_height))
-        frames.append(scaled)
+        frames.append(surfaceRegistry.track(scaled, "sprites"))
     return frames, offsets
 
 
-def _load_sheet_from_url(url):
+def _load_sheet_from_url(url, save_path):
+    # Only reached when assets/ has no sheet: the download is saved there, so the next launch's bundle packs it.
     try:
         with urllib.request.urlopen(url, timeout=6) as response:
             data = response.read()
-        return pygame.image.load(io.BytesIO(data)).convert_alpha()
+        sheet = pygame.image.load(io.BytesIO(data)).convert_alpha()
     except Exception:
         return None
+    try:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        with open(save_path, "wb") as handle:
+            handle.write(data)
+    except OSError:
+        pass
+    return sheet
+
+
+# assets/ is packed into a memory-mapped bundle of raw display-format pixels (rebuilt when files change),
+# so local sprites come up without a PNG decode; the F3 overlay shows how long that took.
+PLAYER_SHEET_ASSET = "walking/postman_walk_pixel_sheet.png"
+assetLoadStarted = time.perf_counter()
+try:
+    assetBundle = load_bundle(os.path.join(BASE_DIR, "assets"), os.path.join(BASE_DIR, ".cache"))
+except (OSError, BundleError):
+    assetBundle = None
+assetLoadMs = (time.perf_counter() - assetLoadStarted) * 1000
+# Effects and ambient loops are prepared on a background thread; until then effects are simply skipped.
+audio = AudioSystem(
+    os.path.join(BASE_DIR, "assets"), os.path.join(BASE_DIR, ".cache"), assetBundle, volume=CONFIG["volume"], enabled=CONFIG["audio"]
+)
 
 
-def _load_sheet_from_local():
-    path = os.path.join(BASE_DIR, "assets", "walking", "postman_walk_pixel_sheet.png")
+def _load_sheet_from_local(path):
+    if assetBundle is not None and PLAYER_SHEET_ASSET in assetBundle:
+        return assetBundle.surface(PLAYER_SHEET_ASSET)
     try:
         return pygame.image.load(path).convert_alpha()
     except Exception:
@@ -70,9 +159,10 @@ def _load_sheet_from_local():
 
 
 def load_player_walk_frames():
-    sheet = _load_sheet_from_url(PLAYER_SPRITE_CDN)
-    if sheet is None:
-        sheet = _load_sheet_from_local()
+    path = os.path.join(BASE_DIR, "assets", *PLAYER_SHEET_ASSET.split("/"))
+    sheet = _load_sheet_from_local(path)
+    if sheet is None and PLAYER_SPRITE_CDN:
+        sheet = _load_sheet_from_url(PLAYER_SPRITE_CDN, path)
     if sheet is None:
         return [], []
     return _slice_frames(sheet)
@@ -80,7 +170,7 @@ def load_player_walk_frames():
 
 player_walk_frames_right, player_walk_offsets_right = load_player_walk_frames()
 player_walk_frames_left = [
-    pygame.transform.flip(frame, True, False) for frame in player_walk_frames_right
+    surfaceRegistry.track(pygame.transform.flip(frame, True, False), "sprites") for frame in player_walk_frames_right
 ]
 player_walk_offsets_left = [-offset for offset in player_walk_offsets_right]
 player_anim_index = 0
@@ -88,20 +178,19 @@ player_anim_timer = 0
 player_facing = 1
 
 roofHeight = 0
-floorY = 520
-hallLength = 4000
+floorY = LEVEL_BOUNDS["floor_y"]
+hallLength = LEVEL_BOUNDS["hall_length"]
 platformWidthMin = 140
 platformWidthMax = 240
 platformGapMin = 70
 platformGapMax = 160
-platformThickness = 18
+platformThickness = LEVEL_BOUNDS["platform_thickness"]
 spawnBuffer = 240
-doorClearBuffer = 320
-playerSpeed = 5
+doorClearBuffer = LEVEL_BOUNDS["door_clear_buffer"]
 jumpStrength = 9.0
 gravity = 0.6
-minCeilRoom = 60
-minFloorRoom = 80
+minCeilRoom = LEVEL_BOUNDS["min_ceil_room"]
+minFloorRoom = LEVEL_BOUNDS["min_floor_room"]
 lastJumpHeight = (jumpStrength * jumpStrength) / (2.0 * max(1e-6, abs(gravity)))
 
 
@@ -118,138 +207,25 @@ class GameState(Enum):
 
 CONTRACT_OPTION_COUNT = 3
 contracts = []
-dimensionCodex = {}
+dimensionCodex = CodexStore()
 codexSelectionIndex = 0
 codexScrollOffset = 0
+codexSortIndex = 0
+codexFilterIndex = 0
 CODEX_VISIBLE_ROWS = 5
 
-shopItems = [
-    {"key": "premium_routes", "name": "Premium Routes License", "description": "+20% contract payouts.", "cost": 250, "type": "mission_bonus", "value": 1.2, "max_stacks": 1},
-    {"key": "extra_life", "name": "Auxiliary Drone", "description": "+1 life on every mission.", "cost": 200, "type": "extra_life", "value": 1, "max_stacks": 1},
-    {"key": "color_mint", "name": "Suit Paint - Neon Mint", "description": "Fresh mint glow for your suit.", "cost": 120, "type": "player_color", "value": (120, 255, 200), "max_stacks": 1},
-    {"key": "color_violet", "name": "Suit Paint - Royal Violet", "description": "Stand out with deep royal hues.", "cost": 120, "type": "player_color", "value": (190, 120, 255), "max_stacks": 1},
-    {"key": "decor_plant", "name": "Office Hanging Planter", "description": "Adds greenery to the office.", "cost": 90, "type": "decor", "value": "plant", "max_stacks": 1},
-    {"key": "decor_poster", "name": "Skyline Poster", "description": "Add a skyline view to the wall.", "cost": 110, "type": "decor", "value": "poster", "max_stacks": 1},
-]
-
-namePrefixes = ["Aurora", "Nova", "Echo", "Titan", "Quantum", "Lumen", "Vortex", "Atlas", "Stellar", "Gale", "Eclipse", "Oracle"]
-nameSuffixes = ["Run", "Circuit", "Relay", "Shift", "Route", "Track", "Dash", "Spiral", "Passage", "Traverse", "Vector", "Expedition"]
-hazardDescriptors = ["charged dust lanes", "volatile thermal vents", "graviton storms", "magnetic shear pockets", "nebula acid rain", "rogue drone fields", "unstable warp echoes", "fractured bridgework"]
-difficultyScale = [(0.45, "Routine Route"), (0.7, "Risky Run"), (0.95, "Hazard Sweep"), (1.2, "Critical Gauntlet"), (10.0, "Impossible Route")]
-
-DIMENSION_THEMES = [
-    {
-        "key": "aurora_shelf",
-        "name": "Aurora Shelf",
-        "description": "Frozen freighters channel aurora currents between jumps.",
-        "sky_top": (110, 190, 255),
-        "sky_bottom": (16, 36, 92),
-        "ceiling_color": (70, 120, 200),
-        "platform_color": (225, 240, 255),
-        "hazard_name": "Ion Tide",
-        "hazard_color": (80, 190, 255),
-        "glow_color": (150, 220, 255),
-        "orb_palette": [(255, 255, 220), (160, 220, 255), (255, 196, 220)],
-        "orb_count": 28,
-    },
-    {
-        "key": "ember_wastes",
-        "name": "Ember Wastes",
-        "description": "Charred mesas belch ember fire beneath courier routes.",
-        "sky_top": (255, 170, 90),
-        "sky_bottom": (60, 24, 18),
-        "ceiling_color": (150, 80, 50),
-        "platform_color": (240, 200, 150),
-        "hazard_name": "Volcanic Slurry",
-        "hazard_color": (220, 70, 32),
-        "glow_color": (255, 120, 70),
-        "orb_palette": [(255, 200, 90), (220, 120, 80), (255, 255, 180)],
-        "orb_count": 20,
-    },
-    {
-        "key": "mist_cascades",
-        "name": "Mist Cascades",
-        "description": "Waterfalls drift upside down among mossy pylons.",
-        "sky_top": (120, 220, 200),
-        "sky_bottom": (28, 70, 60),
-        "ceiling_color": (60, 150, 120),
-        "platform_color": (220, 255, 220),
-        "hazard_name": "Mycelium Bloom",
-        "hazard_color": (120, 220, 150),
-        "glow_color": (90, 200, 160),
-        "orb_palette": [(180, 255, 210), (90, 210, 140), (210, 255, 230)],
-        "orb_count": 24,
-    },
-    {
-        "key": "obsidian_verge",
-        "name": "Obsidian Verge",
-        "description": "Blackstone towers scrape storms of magnetized glass.",
-        "sky_top": (80, 50, 110),
-        "sky_bottom": (12, 8, 20),
-        "ceiling_color": (55, 40, 90),
-        "platform_color": (200, 180, 255),
-        "hazard_name": "Shard Mist",
-        "hazard_color": (150, 90, 200),
-        "glow_color": (200, 120, 255),
-        "orb_palette": [(220, 180, 255), (140, 120, 200), (255, 130, 190)],
-        "orb_count": 32,
-    },
-    {
-        "key": "sunken_grotto",
-        "name": "Sunken Grotto",
-        "description": "Coral ruins hide crosstide delivery gates.",
-        "sky_top": (70, 150, 200),
-        "sky_bottom": (10, 40, 70),
-        "ceiling_color": (40, 90, 140),
-        "platform_color": (210, 240, 230),
-        "hazard_name": "Brine Surge",
-        "hazard_color": (40, 150, 200),
-        "glow_color": (100, 200, 220),
-        "orb_palette": [(160, 220, 255), (120, 200, 180), (255, 240, 220)],
-        "orb_count": 22,
-    },
-    {
-        "key": "prism_belt",
-        "name": "Prism Belt",
-        "description": "Refraction fields split every shadow.",
-        "sky_top": (255, 220, 180),
-        "sky_bottom": (40, 30, 50),
-        "ceiling_color": (120, 80, 160),
-        "platform_color": (255, 255, 255),
-        "hazard_name": "Spectral Flux",
-        "hazard_color": (180, 80, 255),
-        "glow_color": (255, 180, 230),
-        "orb_palette": [(255, 200, 230), (200, 220, 255), (255, 250, 180)],
-        "orb_count": 36,
-    },
-]
-
-
-def pick_dimension_theme():
-    return random.choice(DIMENSION_THEMES)
+shopItems = CONTENT["shop_items"]
 
 
+DIMENSION_THEMES = CONTENT["themes"]
+# Contract seeds are drawn from the session stream; everything a contract rolls derives from its own seed.
+sessionRng = Rng(time_seed())
 def ensure_codex_entry(theme):
-    entry = dimensionCodex.setdefault(
-        theme["key"],
-        {
-            "key": theme["key"],
-            "name": theme.get("name", "Unknown"),
-            "description": theme.get("description", ""),
-            "hazard": theme.get("hazard_name", "Hazard"),
-            "times_seen": 0,
-            "completions": 0,
-            "failures": 0,
-            "best_time_ms": None,
-            "best_beacons": 0,
-        },
-    )
-    return entry
+    return dimensionCodex.ensure(theme)
 
 
 def register_dimension_discovery(theme):
-    entry = ensure_codex_entry(theme)
-    entry["times_seen"] += 1
+    entry = dimensionCodex.record_sighting(theme)
     if entry["times_seen"] == 1:
         push_progress_toast(f"Logged new dimension: {entry['name']}")
 
@@ -257,19 +233,20 @@ def register_dimension_discovery(theme):
 def record_codex_completion(theme_key, mission_time_ms, beacons_found, success=True):
     if not theme_key:
         return
-    entry = dimensionCodex.get(theme_key)
-    if not entry:
-        return
-    if success:
-        entry["completions"] += 1
-        if mission_time_ms is not None:
-            best = entry.get("best_time_ms")
-            if best is None or mission_time_ms < best:
-                entry["best_time_ms"] = mission_time_ms
-        if beacons_found:
-            entry["best_beacons"] = max(entry.get("best_beacons", 0), beacons_found)
-    else:
-        entry["failures"] += 1
+    dimensionCodex.record_run(theme_key, mission_time_ms, beacons_found, success=success)
+
+
+# Every finished mission is appended to the SQLite log by a background writer; screens read cached summaries.
+runHistory = RunHistory(HISTORY_PATH)
+
+
+def record_run_history(contract, outcome, mission_time_ms):
+    if not contract:
+        return None
+    lives_used = maxLives - livesRemaining
+    record = run_record(contract, outcome, mission_time_ms, beaconsCollected, len(levelBeacons), lives_used)
+    runHistory.record(record)
+    return record["recorded_at"]
 
 
 def format_time_ms(ms):
@@ -281,93 +258,22 @@ def format_time_ms(ms):
     return f"{minutes:02d}:{remaining:04.1f}s"
 
 
-def get_codex_entries():
-    return sorted(dimensionCodex.values(), key=lambda entry: entry["name"].lower())
+def get_codex_view():
+    return CODEX_SORT_MODES[codexSortIndex][0], CODEX_FILTERS[codexFilterIndex][0]
 
 
-POSTAL_RANKS = [
-    {"deliveries": 0, "title": "Probation Courier"},
-    {"deliveries": 3, "title": "Horizon Runner"},
-    {"deliveries": 7, "title": "Nebula Specialist"},
-    {"deliveries": 12, "title": "Fracture Lead"},
-    {"deliveries": 18, "title": "Constellation Marshal"},
-    {"deliveries": 25, "title": "Mythic Dispatcher"},
-]
+def get_codex_count():
+    return dimensionCodex.count(*get_codex_view())
 
-PROGRESSION_MILESTONES = [
-    {"deliveries": 1, "type": "message", "text": "First official route logged. Dispatcher noticed."},
-    {"deliveries": 3, "type": "pay_bonus", "value": 0.05, "text": "+5% command stipend applied."},
-    {"deliveries": 5, "type": "life_bonus", "value": 1, "text": "Support drone adds +1 life to missions."},
-    {"deliveries": 8, "type": "cash", "value": 150, "text": "Express bonus: 150 credits wired."},
-    {"deliveries": 12, "type": "pay_bonus", "value": 0.08, "text": "Hazard stipend upgraded (+8%)."},
-    {"deliveries": 15, "type": "color_unlock", "value": (255, 196, 120), "text": "Awarded Solar Courier suit tint."},
-    {"deliveries": 20, "type": "life_bonus", "value": 1, "text": "Emergency drone joins (+1 life)."},
-]
 
-CONTRACT_TIER_ORDER = ["easy", "medium", "hard"]
-CONTRACT_ARCHETYPES = [
-    {
-        "key": "courier_cruise",
-        "tier": "easy",
-        "tagline": "Courier Cruise",
-        "summary": "Training loop with generous landing pads.",
-        "difficulty_range": (0.35, 0.5),
-        "gap_mul": (0.75, 0.9),
-        "width_mul": (1.2, 1.35),
-        "life_bonus": 1,
-        "gravity_offset": -0.02,
-        "traits": ["+1 support drone", "Wide landing pads"],
-    },
-    {
-        "key": "express_dash",
-        "tier": "medium",
-        "tagline": "Express Relay",
-        "summary": "Rush contracts with long sprints and bonus pay.",
-        "difficulty_range": (0.55, 0.85),
-        "gap_mul": (1.05, 1.2),
-        "width_mul": (0.9, 1.0),
-        "horizontal_bias": 1.25,
-        "payout_bonus": 0.15,
-        "traits": ["+15% payout", "Long sprint sections"],
-    },
-    {
-        "key": "precision_shift",
-        "tier": "medium",
-        "tagline": "Precision Shift",
-        "summary": "Compact pads that reward careful jumps.",
-        "difficulty_range": (0.65, 0.95),
-        "gap_mul": (1.0, 1.15),
-        "width_mul": (0.75, 0.9),
-        "xp_bonus": 0.15,
-        "traits": ["Compact pads", "+15% XP bounty"],
-    },
-    {
-        "key": "spireline_gauntlet",
-        "tier": "hard",
-        "tagline": "Spireline Contract",
-        "summary": "Vertical shafts carved between floating towers.",
-        "difficulty_range": (0.9, 1.2),
-        "gap_mul": (0.95, 1.05),
-        "width_mul": (0.8, 0.9),
-        "vertical_bias": 1.35,
-        "wall_jump": True,
-        "traits": ["Wall-jump thrusters online", "Vertical shaft routing"],
-    },
-    {
-        "key": "hazard_sweep",
-        "tier": "hard",
-        "tagline": "Hazard Sweep",
-        "summary": "Toxic fields with premium payout for precision.",
-        "difficulty_range": (1.0, 1.3),
-        "gap_mul": (1.2, 1.35),
-        "width_mul": (0.65, 0.8),
-        "gravity_offset": 0.04,
-        "life_bonus": -1,
-        "payout_bonus": 0.25,
-        "xp_bonus": 0.1,
-        "traits": ["Tiny pads", "+25% hazard pay", "-1 drone"],
-    },
-]
+POSTAL_RANKS = CONTENT["ranks"]
+
+PROGRESSION_MILESTONES = CONTENT["milestones"]
+
+progressionTracker = ProgressionTracker(POSTAL_RANKS, PROGRESSION_MILESTONES)
+
+CONTRACT_ARCHETYPES = CONTENT["archetypes"]
+CONTRACT_CALIBRATION = index_calibration(CONTENT["calibration"])
 
 gameState = GameState.HUB
 portalActive = False
@@ -399,7 +305,7 @@ ownedUpgrades = {}
 shopMessage = "Welcome to the Supply Depot."
 codexMessage = "Scan new dimensions to expand this log."
 
-doorWidth, doorHeight = 52, 150
+doorWidth, doorHeight = LEVEL_BOUNDS["door_width"], LEVEL_BOUNDS["door_height"]
 doorColor = (60, 200, 90)
 doorRect = pygame.Rect(0, 0, doorWidth, doorHeight)
 portalRect = pygame.Rect(screenWidth - 180, floorY - 160, 90, 160)
@@ -414,16 +320,37 @@ hubCeilingColor = (44, 44, 66)
 hubFloorColor = (60, 60, 90)
 shopCounterRect = pygame.Rect(screenWidth // 2 - 90, floorY - 40, 180, 40)
 shopInteractRect = shopCounterRect.inflate(80, 80)
+# The hub furniture never moves, so its draw rects are built once instead of every frame.
+deskLegRects = (
+    pygame.Rect(deskRect.left + 8, deskRect.bottom, 16, 50),
+    pygame.Rect(deskRect.right - 24, deskRect.bottom, 16, 50),
+)
+computerScreenRect = computerBodyRect.inflate(-14, -18)
+keyboardRect = pygame.Rect(computerBodyRect.left - 20, computerBodyRect.bottom, computerBodyRect.width + 40, 14)
+counterLegRects = (
+    pygame.Rect(shopCounterRect.left + 10, shopCounterRect.bottom, 16, 46),
+    pygame.Rect(shopCounterRect.right - 26, shopCounterRect.bottom, 16, 46),
+)
+portalFrameRect = portalRect.inflate(12, 12)
+portalInsetRect = portalRect.inflate(-40, -120)
+plantPotRect = pygame.Rect(deskRect.right + 20, deskRect.top - 24, 20, 24)
+posterRect = pygame.Rect(screenWidth - 260, 60, 140, 90)
+posterInsetRect = posterRect.inflate(-12, -12)
+introArrowPoints = [[0, 0], [0, 0], [0, 0]]
+playerDrawRect = pygame.Rect(0, 0, 0, 0)
+# Handed to resolve_jump every frame; the fields are refreshed in place rather than building a new dict.
+jumpState = new_body_state()
 
 
 def dispatcher_dynamic_lines():
-    current_rank, next_rank = get_postal_rank(contractsCompleted)
+    rank_status = progressionTracker.status(contractsCompleted)
+    next_rank = rank_status["next_rank"]
     lines = [
         f"You're level {playerLevel}. Keep cashing in XP to reach new payouts.",
-        f"Rank: {current_rank['title']}  Streak: {deliveryStreak}",
+        f"Rank: {rank_status['rank']['title']}  Streak: {deliveryStreak}",
     ]
     if next_rank:
-        lines.append(f"{max(0, next_rank['deliveries'] - contractsCompleted)} deliveries away from {next_rank['title']}.")
+        lines.append(f"{rank_status['next_delta']} deliveries away from {next_rank['title']}.")
     if portalActive:
         lines.append("Portal's charged—step through whenever you're prepped.")
     else:
@@ -480,6 +407,10 @@ npc_characters.append(
 )
 for npc in npc_characters:
     npc["talk_rect"] = npc["rect"].inflate(90, 30)
+    npc["outline_rect"] = npc["rect"].inflate(6, 6)
+    npc["highlight_rect"] = npc["rect"].inflate(10, 10)
+    npc["head_center"] = (npc["rect"].centerx, npc["rect"].top - 12)
+dispatcherNpc = next((npc for npc in npc_characters if npc["key"] == "dispatcher_rae"), None)
 
 activeNpc = None
 activeNpcLines = []
@@ -523,17 +454,16 @@ def close_npc_dialog():
     activeNpcIndex = 0
     gameState = GameState.HUB
 
-playerRect = pygame.Rect(100, 500, 30, 30)
+playerRect = pygame.Rect((100, 500), PLAYER_SIZE)
 velX = 0.0
 velY = 0.0
 onGround = False
-lastGroundedMs = -10_000
-lastJumpPressMs = -10_000
+lastGroundedMs = NO_PRESS_MS
+lastJumpPressMs = NO_PRESS_MS
 cameraX = 0
 dimensionIndex = 0
 
 platformColor = (210, 210, 230)
-hazardOptions = [("ACID", (80, 200, 80)), ("LAVA", (220, 60, 40))]
 bgColor = (30, 30, 38)
 ceilingColor = (60, 60, 100)
 floorColor = (70, 55, 40)
@@ -542,19 +472,44 @@ levelSkyTop = 80
 levelBackgroundSurface = None
 levelGlowSurface = None
 backdropOrbs = []
+levelSeed = 0
+levelPalette = None
+# Detail tiers follow measured frame time; F3 shows what the governor sees.
+# A fixed quality setting pins the tier; "auto" lets the governor move it against the frame budget.
+QUALITY_LOCKED = CONFIG["quality"] != "auto"
+qualityGovernor = QualityGovernor(
+    1000 / (TARGET_FPS or 60),
+    next(idx for idx, tier in enumerate(QUALITY_TIERS) if tier["name"] == CONFIG["quality"]) if QUALITY_LOCKED else len(QUALITY_TIERS) - 1,
+)
+textAntialias = True
+showPerfOverlay = False
 levelBeacons = []
 beaconsCollected = 0
 levelStartTimeMs = 0
+# One pooled field for every level; populate_hazards refills it in place.
+levelHazards = HazardField()
+levelParticles = ParticleSystem()
+# Falls slower than this (px/frame at impact) land without kicking up dust.
+LANDING_DUST_MIN_SPEED = 4.0
+hazardGraceUntilMs = 0
+# The fastest clear of each level seed is kept as a compact trace and raced as a ghost on later attempts.
+ghostStore = GhostStore(os.path.join(BASE_DIR, "saves", "ghosts"))
+ghostRecorder = GhostRecorder()
+ghostPlayer = GhostPlayer()
+ghostSurface = build_ghost_surface()
+ghostDrawRect = ghostSurface.get_rect()
+lastContract = None
 introArrowActive = True
 levelVerticalBias = 1.0
 levelHorizontalBias = 1.0
 wallJumpUnlocked = False
 wallContactDir = 0
 lastWallJumpMs = -10_000
-wallJumpCooldownMs = 220
 dimensionLoreText = ""
+dimensionLoreLines = []
 
 platformRects = []
+levelPlatforms = PlatformSet(platformRects, {})
 startPlatformRect = pygame.Rect(0, 0, 0, 0)
 endPlatformRect = pygame.Rect(0, 0, 0, 0)
 hubSpawnPoint = pygame.Vector2(deskRect.centerx + 20, deskRect.top)
@@ -579,30 +534,11 @@ winSummary = {
     "beaconCash": 0,
     "beaconXp": 0,
     "time": None,
+    "recorded_at": None,
+    "ghostSaved": False,
 }
 gameOverSummary = {"contract": "", "reason": "Out of lives", "streak_note": "", "best": 0}
 
-jumpBufferMs = 140
-coyoteTimeMs = 120
-
-
-def mix_colors(color_a, color_b, t):
-    return tuple(int(color_a[i] + (color_b[i] - color_a[i]) * t) for i in range(3))
-
-
-def create_vertical_gradient(width, height, top_color, bottom_color, top_alpha=255, bottom_alpha=255):
-    height = max(1, int(height))
-    surface = pygame.Surface((int(width), height), pygame.SRCALPHA)
-    if height == 1:
-        color = (*top_color, int(top_alpha))
-        surface.fill(color)
-        return surface.convert_alpha()
-    for y in range(height):
-        t = y / (height - 1)
-        color = mix_colors(top_color, bottom_color, t)
-        alpha = int(top_alpha + (bottom_alpha - top_alpha) * t)
-        surface.fill((*color, alpha), rect=pygame.Rect(0, y, width, 1))
-    return surface.convert_alpha()
 
 
 def wrap_text(text, font, max_width):
@@ -625,49 +561,40 @@ def wrap_text(text, font, max_width):
 
 
 def get_postal_rank(deliveries):
-    current = POSTAL_RANKS[0]
-    next_rank = None
-    for rank in POSTAL_RANKS:
-        if deliveries >= rank["deliveries"]:
-            current = rank
-        elif deliveries < rank["deliveries"] and next_rank is None:
-            next_rank = rank
-            break
-    return current, next_rank
+    rank_status = progressionTracker.status(deliveries)
+    return rank_status["rank"], rank_status["next_rank"]
 
 
-PROGRESS_TOAST_DURATION_MS = 5200
-progressToasts = []
+progressToasts = ToastQueue(smallFont)
 
 
 def push_progress_toast(message):
-    expire_at = pygame.time.get_ticks() + PROGRESS_TOAST_DURATION_MS
-    progressToasts.append({"text": message, "expires": expire_at})
+    progressToasts.push(message, pygame.time.get_ticks())
+    audio.play("toast")
 
 
 def apply_progress_milestones():
     global progressionPayBonusMultiplier, progressionLifeBonus, playerMoney, playerColor, unlockedMilestones
     unlocked_messages = []
-    for milestone in PROGRESSION_MILESTONES:
+    for milestone in progressionTracker.advance(contractsCompleted):
         key = milestone["deliveries"]
-        if contractsCompleted >= key and key not in unlockedMilestones:
-            unlockedMilestones.add(key)
-            reward_type = milestone.get("type")
-            if reward_type == "pay_bonus":
-                progressionPayBonusMultiplier = round(
-                    progressionPayBonusMultiplier * (1.0 + float(milestone.get("value", 0.0))), 3
-                )
-            elif reward_type == "life_bonus":
-                progressionLifeBonus += int(milestone.get("value", 0))
-            elif reward_type == "cash":
-                playerMoney += int(milestone.get("value", 0))
-            elif reward_type == "color_unlock":
-                playerColor = milestone.get("value", playerColor)
-            message = milestone.get("text", "Milestone reached!")
-            unlocked_messages.append(message)
-            push_progress_toast(message)
-        elif contractsCompleted < key:
+        if key in unlockedMilestones:
             continue
+        unlockedMilestones.add(key)
+        reward_type = milestone.get("type")
+        if reward_type == "pay_bonus":
+            progressionPayBonusMultiplier = round(
+                progressionPayBonusMultiplier * (1.0 + float(milestone.get("value", 0.0))), 3
+            )
+        elif reward_type == "life_bonus":
+            progressionLifeBonus += int(milestone.get("value", 0))
+        elif reward_type == "cash":
+            playerMoney += int(milestone.get("value", 0))
+        elif reward_type == "color_unlock":
+            playerColor = milestone.get("value", playerColor)
+        message = milestone.get("text", "Milestone reached!")
+        unlocked_messages.append(message)
+        push_progress_toast(message)
     return unlocked_messages
 
 
@@ -696,159 +623,142 @@ def get_effective_pay_multiplier():
     return missionPayMultiplier * progressionPayBonusMultiplier
 
 
-def _clampf(value, low, high):
-    return max(low, min(high, value))
+def build_hud_lines():
+    rank_status = progressionTracker.status(contractsCompleted)
+    current_rank_info = rank_status["rank"]
+    next_rank_info = rank_status["next_rank"]
+    if gameState == GameState.LEVEL:
+        contract_name = currentContract["name"] if currentContract else "Contract"
+        base_payment = currentContract["payment"] if currentContract else 0
+        payment = int(round(base_payment * get_effective_pay_multiplier()))
+        hud_lines = [
+            contract_name,
+            f"Lives: {livesRemaining}",
+            f"Payment: ${payment}",
+            f"Hazard: {floorHazardName}",
+        ]
+        if currentContract:
+            envLine = currentContract.get("environment")
+            if envLine:
+                hud_lines.append(f"Dimension: {envLine}")
+            modifiers = currentContract.get("modifiers") or []
+            if modifiers:
+                summary = " · ".join(modifiers[:2])
+                if len(modifiers) > 2:
+                    summary += " · ..."
+                hud_lines.append(f"Mods: {summary}")
+            if currentContract.get("wall_jump"):
+                hud_lines.append("Ability: Wall jump thrusters online")
+        hud_lines.extend(
+            [
+                f"Jump Height: {int(lastJumpHeight)} px",
+                f"XP: {playerXP}/{xpForNextLevel} (Lv {playerLevel})",
+            ]
+        )
+        if levelBeacons:
+            hud_lines.append(f"Beacons: {beaconsCollected}/{len(levelBeacons)}")
+        hud_lines.append(f"Deliveries: {contractsCompleted}  Streak: {deliveryStreak}")
+        rank_line = f"Rank: {current_rank_info['title']}"
+        if next_rank_info:
+            rank_line += f"  Next: {rank_status['next_delta']}"
+        hud_lines.append(rank_line)
+        perk_line = f"Perks: pay x{get_effective_pay_multiplier():.2f}"
+        bonus_lives = extraLifeBonus + progressionLifeBonus
+        if bonus_lives > 0:
+            perk_line += f"  +{bonus_lives} life(s)"
+        hud_lines.append(perk_line)
+    elif gameState in (GameState.HUB, GameState.NPC_DIALOG, GameState.CODEX):
+        hud_lines = [
+            f"Level {playerLevel}    XP: {playerXP}/{xpForNextLevel}",
+            f"Money: ${playerMoney}",
+            "A/D to move  SPACE to jump",
+            "Press E at the computer for contracts",
+            "Press C at the computer for codex",
+            "Press E at the counter for upgrades",
+            "Press E near crew to chat",
+            f"Portal: {'ONLINE' if portalActive else 'offline'}",
+        ]
+        if gameState == GameState.NPC_DIALOG and activeNpc:
+            hud_lines.append(f"Chatting with {activeNpc['name']}")
+        hud_lines.append(f"Deliveries: {contractsCompleted}  Streak: {deliveryStreak}")
+        next_rank_delta = rank_status["next_delta"]
+        if next_rank_delta > 0:
+            hud_lines.append(f"Rank: {current_rank_info['title']}  Next in {next_rank_delta}")
+        else:
+            hud_lines.append(f"Rank: {current_rank_info['title']}")
+        perk_line = f"Perks: pay x{get_effective_pay_multiplier():.2f}"
+        bonus_lives = extraLifeBonus + progressionLifeBonus
+        if bonus_lives > 0:
+            perk_line += f"  +{bonus_lives} life(s)"
+        hud_lines.append(perk_line)
+    else:
+        hud_lines = [
+            f"Level {playerLevel}    XP: {playerXP}/{xpForNextLevel}",
+            f"Money: ${playerMoney}",
+        ]
+    return hud_lines
+
+
+def hud_key():
+    # Everything the HUD text depends on; the lines are only rebuilt and re-rendered when this changes.
+    return (
+        gameState,
+        currentContract,
+        activeNpc,
+        textAntialias,
+        livesRemaining,
+        floorHazardName,
+        int(lastJumpHeight),
+        playerXP,
+        xpForNextLevel,
+        playerLevel,
+        playerMoney,
+        beaconsCollected,
+        levelBeacons,
+        contractsCompleted,
+        deliveryStreak,
+        portalActive,
+        missionPayMultiplier,
+        progressionPayBonusMultiplier,
+        extraLifeBonus,
+        progressionLifeBonus,
+        dimensionLoreLines,
+    )
 
 
-def _sample_range(value, fallback):
-    if value is None:
-        return fallback
-    if isinstance(value, (list, tuple)):
-        if not value:
-            return fallback
-        if len(value) == 1:
-            return value[0]
-        return random.uniform(value[0], value[1])
-    return value
+def refresh_hud():
+    global hudKey
+    key = hud_key()
+    if key == hudKey:
+        return
+    hudKey = key
+    hudBlits.clear()
+    for idx, line in enumerate(build_hud_lines()):
+        hudBlits.append((render_text(uiFont, line, textAntialias, (255, 255, 255)), (20, 20 + idx * 24)))
+    if gameState == GameState.LEVEL:
+        for idx, lore in enumerate(dimensionLoreLines):
+            hudBlits.append((render_text(smallFont, lore, textAntialias, (210, 220, 255)), (20, screenHeight - 60 + idx * 18)))
 
 
-def pick_contract_profiles(count):
-    selected = []
-    used_keys = set()
-    for tier in CONTRACT_TIER_ORDER:
-        if len(selected) >= count:
-            break
-        options = [arch for arch in CONTRACT_ARCHETYPES if arch["tier"] == tier and arch["key"] not in used_keys]
-        if not options:
-            continue
-        choice = random.choice(options)
-        selected.append(choice)
-        used_keys.add(choice["key"])
-    remaining_needed = count - len(selected)
-    remaining_pool = [arch for arch in CONTRACT_ARCHETYPES if arch["key"] not in used_keys]
-    random.shuffle(remaining_pool)
-    while remaining_needed > 0 and remaining_pool:
-        choice = remaining_pool.pop()
-        selected.append(choice)
-        used_keys.add(choice["key"])
-        remaining_needed -= 1
-    while len(selected) < count:
-        selected.append(random.choice(CONTRACT_ARCHETYPES))
-    random.shuffle(selected)
-    return selected[:count]
-
-
-def build_contract_from_archetype(archetype):
-    diff_range = archetype.get("difficulty_range", (0.35, 1.05))
-    if isinstance(diff_range, (list, tuple)) and len(diff_range) == 2:
-        base_diff = random.uniform(diff_range[0], diff_range[1])
-    else:
-        base_diff = random.uniform(0.35, 1.05)
-    gravity_val = round(
-        _clampf(
-            0.45 + base_diff * 0.35 + random.uniform(-0.02, 0.02) + float(archetype.get("gravity_offset", 0.0)),
-            0.45,
-            0.9,
-        ),
-        3,
-    )
-    target_jump_height = random.uniform(220 - base_diff * 60, 320 - base_diff * 20)
-    target_jump_height = max(160, target_jump_height)
-    jump_strength = round((target_jump_height * 2 * gravity_val) ** 0.5, 3)
-    gap_min_val = int(round(60 + base_diff * 55 + random.uniform(-8, 8)))
-    gap_min_val = max(50, gap_min_val)
-    gap_spread = int(round(50 + base_diff * 80 + random.uniform(-12, 12)))
-    gap_max_val = gap_min_val + max(30, gap_spread)
-    gap_mul = float(_sample_range(archetype.get("gap_mul"), 1.0))
-    gap_min_val = int(round(gap_min_val * gap_mul))
-    gap_max_val = int(round(gap_max_val * gap_mul))
-    gap_min_val = max(40, gap_min_val)
-    gap_max_val = max(gap_min_val + 20, gap_max_val)
-    width_max_val = int(round(260 - base_diff * 110 + random.uniform(-12, 12)))
-    width_max_val = max(140, width_max_val)
-    width_min_val = width_max_val - int(round(40 + base_diff * 45))
-    width_min_val = max(80, width_min_val)
-    width_mul = float(_sample_range(archetype.get("width_mul"), 1.0))
-    width_min_val = int(round(width_min_val * width_mul))
-    width_max_val = int(round(width_max_val * width_mul))
-    if width_min_val >= width_max_val:
-        width_min_val = max(70, width_max_val - 20)
-    base_lives = max(2, 5 - int(base_diff * 3 + random.random()))
-    base_lives += int(archetype.get("life_bonus", 0))
-    base_lives = max(1, base_lives)
-    difficulty_score = base_diff
-    difficulty_score += max(0, (gap_min_val - 70) / 140)
-    difficulty_score += max(0, (200 - width_max_val) / 200)
-    difficulty_score += (5 - base_lives) * 0.08
-    difficulty_score = _clampf(difficulty_score, 0.35, 1.6)
-    payment = int(round(140 + difficulty_score * 340 + random.uniform(-10, 10)))
-    xp_reward = int(round(80 + difficulty_score * 240))
-    payout_bonus = float(archetype.get("payout_bonus", 0.0))
-    xp_bonus = float(archetype.get("xp_bonus", 0.0))
-    if payout_bonus:
-        payment = int(round(payment * (1.0 + payout_bonus)))
-    if xp_bonus:
-        xp_reward = int(round(xp_reward * (1.0 + xp_bonus)))
-    label = "Unknown Route"
-    for threshold, tag in difficultyScale:
-        if difficulty_score <= threshold:
-            label = tag
-            break
-    hazard_text = random.choice(hazardDescriptors)
-    tagline = archetype.get("tagline", label)
-    summary = archetype.get("summary", "")
-    theme = pick_dimension_theme()
-    theme_context = theme.get("description") or f"Look for landmarks in {theme['name']}."
-    if summary:
-        description = f"{tagline} — {summary} {theme_context} Expect {hazard_text}."
-    else:
-        description = f"{tagline} — {theme_context} Expect {hazard_text}."
-    traits = list(archetype.get("traits", ()))
-    contract = {
-        "name": f"{random.choice(namePrefixes)} {random.choice(nameSuffixes)}",
-        "description": description,
-        "payment": payment,
-        "xp": xp_reward,
-        "gravity": gravity_val,
-        "jump": jump_strength,
-        "gap_min": gap_min_val,
-        "gap_max": gap_max_val,
-        "width_min": width_min_val,
-        "width_max": width_max_val,
-        "lives": base_lives,
-        "difficulty": round(difficulty_score, 2),
-        "label": label,
-        "modifiers": traits,
-        "archetype": archetype.get("key", "unknown"),
-        "vertical_bias": float(_sample_range(archetype.get("vertical_bias"), 1.0)),
-        "horizontal_bias": float(_sample_range(archetype.get("horizontal_bias"), 1.0)),
-        "wall_jump": bool(archetype.get("wall_jump", False)),
-        "theme": theme,
-        "theme_key": theme.get("key"),
-        "environment": theme["name"],
-        "hazard_label": theme.get("hazard_name", hazard_text),
-        "theme_context": theme_context,
-    }
-    return contract
+hudKey = None
+hudBlits = []
 
 
 def returnToHub():
     global gameState, portalActive, levelNeedsBuild, gravity, jumpStrength, platformGapMin, platformGapMax, platformWidthMin, platformWidthMax
     global livesRemaining, maxLives, shopSelectionIndex, shopScrollOffset, shopMessage, spawnPoint, lastJumpPressMs, lastGroundedMs, velX, velY, onGround, cameraX, lastJumpHeight, currentContract, contracts, selectedContractIndex
-    global levelVerticalBias, levelHorizontalBias, wallJumpUnlocked, wallContactDir, lastWallJumpMs, dimensionLoreText, activeNpc, activeNpcLines, activeNpcIndex
+    global levelVerticalBias, levelHorizontalBias, wallJumpUnlocked, wallContactDir, lastWallJumpMs, dimensionLoreText, dimensionLoreLines, activeNpc, activeNpcLines
+    global activeNpcIndex
     global levelBeacons, beaconsCollected, levelStartTimeMs
-    contracts.clear()
-    for archetype in pick_contract_profiles(CONTRACT_OPTION_COUNT):
-        contracts.append(build_contract_from_archetype(archetype))
+    contracts[:] = roll_contract_board(CONTRACT_OPTION_COUNT, sessionRng, CONTRACT_ARCHETYPES, DIMENSION_THEMES, CONTRACT_CALIBRATION)
     selectedContractIndex = 0
-    if len(contracts) > 1 and random.random() > 0.4:
-        random.shuffle(contracts)
     levelVerticalBias = 1.0
     levelHorizontalBias = 1.0
     wallJumpUnlocked = False
     wallContactDir = 0
     lastWallJumpMs = -10_000
     dimensionLoreText = ""
+    dimensionLoreLines = []
     spawnPoint.update(hubSpawnPoint.x, hubSpawnPoint.y)
     livesRemaining = 0
     maxLives = 0
@@ -872,6 +782,10 @@ def returnToHub():
     activeNpcLines = []
     activeNpcIndex = 0
     levelBeacons = []
+    levelHazards.clear()
+    levelParticles.clear()
+    ghostPlayer.unload()
+    audio.play_music(None)
     beaconsCollected = 0
     levelStartTimeMs = 0
     lastJumpHeight = (jumpStrength * jumpStrength) / (2.0 * max(1e-6, abs(gravity)))
@@ -885,12 +799,96 @@ def returnToHub():
     cameraX = 0
 
 
+def begin_contract(contract):
+    global currentContract, lastContract, gravity, jumpStrength, platformGapMin, platformGapMax, platformWidthMin, platformWidthMax
+    global livesRemaining, maxLives, levelVerticalBias, levelHorizontalBias, wallJumpUnlocked, wallContactDir, lastWallJumpMs
+    global dimensionLoreText, dimensionLoreLines, portalActive, levelNeedsBuild, lastJumpHeight
+    currentContract = dict(contract)
+    lastContract = currentContract
+    theme = currentContract.get("theme")
+    if theme:
+        register_dimension_discovery(theme)
+    gravity = currentContract["gravity"]
+    jumpStrength = currentContract["jump"]
+    platformGapMin = currentContract["gap_min"]
+    platformGapMax = currentContract["gap_max"]
+    platformWidthMin = currentContract["width_min"]
+    platformWidthMax = currentContract["width_max"]
+    bonus_lives = extraLifeBonus + progressionLifeBonus
+    livesRemaining = max(1, currentContract["lives"] + bonus_lives)
+    maxLives = livesRemaining
+    levelVerticalBias = currentContract.get("vertical_bias", 1.0)
+    levelHorizontalBias = currentContract.get("horizontal_bias", 1.0)
+    wallJumpUnlocked = currentContract.get("wall_jump", False)
+    wallContactDir = 0
+    lastWallJumpMs = -10_000
+    dimensionLoreText = currentContract.get("theme_context", "")
+    dimensionLoreLines = wrap_text(dimensionLoreText, smallFont, 360)[:2]
+    portalActive = True
+    levelNeedsBuild = True
+    lastJumpHeight = (jumpStrength * jumpStrength) / (2.0 * max(1e-6, abs(gravity)))
+    telemetry.emit(
+        EVENT_CONTRACT_ACCEPTED,
+        currentContract["name"],
+        currentContract.get("seed"),
+        currentContract.get("theme_key"),
+        currentContract.get("archetype"),
+        currentContract.get("difficulty"),
+    )
+    return currentContract
+
+
+def apply_quality_tier():
+    global textAntialias, levelBackgroundSurface, levelGlowSurface, backdropOrbs
+    settings = qualityGovernor.settings
+    textAntialias = settings["text_aa"]
+    levelParticles.set_limit(settings["particle_cap"])
+    # Accent rects are painted into the backdrop, so a tier change mid-level repaints it from the same seed.
+    if gameState == GameState.LEVEL and levelPalette is not None:
+        levelBackgroundSurface, levelGlowSurface, backdropOrbs = build_backdrop(
+            levelSeed,
+            levelPalette,
+            levelSkyTop,
+            (screenWidth, screenHeight),
+            LEVEL_BOUNDS,
+            settings["accents"],
+            CONFIG["orb_scale"],
+            CONFIG["orb_min"],
+        )
+
+
 returnToHub()
+apply_quality_tier()
+telemetryState = gameState
+allocProbe = AllocationProbe() if cliArgs.alloc_check else None
+# Movement keys are tracked from KEYDOWN/KEYUP; key.get_pressed() builds a fresh 512-entry wrapper every frame.
+heldKeys = {pygame.K_a: False, pygame.K_d: False, pygame.K_LSHIFT: False, pygame.K_RSHIFT: False}
 
 while True:
-    dt = clock.tick(60)
+    if allocProbe is not None:
+        # Scripted run: idle in the hub, then idle on the first contract's start platform.
+        allocPhase = allocProbe.frame()
+        if allocPhase == "level" and gameState == GameState.HUB:
+            begin_contract(contracts[0])
+            gameState = GameState.LEVEL
+        elif allocPhase is None:
+            allocLines, allocPassed = allocProbe.report()
+            print("\n".join(allocLines))
+            runHistory.close()
+            audio.close()
+            telemetry.close()
+            pygame.quit()
+            sys.exit(0 if allocPassed else 1)
+    dt = clock.tick(TARGET_FPS)
     now = pygame.time.get_ticks()
-    progressToasts[:] = [toast for toast in progressToasts if toast["expires"] > now]
+    if not QUALITY_LOCKED and qualityGovernor.note(clock.get_time(), clock.get_rawtime()):
+        apply_quality_tier()
+    progressToasts.expire(now)
+    if TARGET_FPS and clock.get_time() > qualityGovernor.budget_ms * FRAME_MISS_RATIO:
+        telemetry.emit(EVENT_FRAME_MISS, clock.get_time(), clock.get_rawtime(), gameState.name)
+    if gameState != telemetryState:
+        telemetry.emit(EVENT_STATE_CHANGE, telemetryState.name, gameState.name)
+        telemetryState = gameState
 
     jumpPressedThisFrame = False
     interactPressed = False
@@ -898,13 +896,30 @@ while True:
     backPressed = False
     menuUp = False
     menuDown = False
+    menuLeft = False
+    menuRight = False
+    filterPressed = False
     codexPressed = False
+    retryPressed = False
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            runHistory.close()
+            audio.close()
+            telemetry.close()
             pygame.quit()
             sys.exit()
+        if event.type == pygame.VIDEORESIZE:
+            presenter.resized(event.size)
+        if event.type == pygame.KEYUP:
+            if event.key in heldKeys:
+                heldKeys[event.key] = False
+        if event.type == pygame.WINDOWFOCUSLOST:
+            for heldKey in heldKeys:
+                heldKeys[heldKey] = False
         if event.type == pygame.KEYDOWN:
+            if event.key in heldKeys:
+                heldKeys[event.key] = True
             if event.key == pygame.K_SPACE:
                 jumpPressedThisFrame = True
                 lastJumpPressMs = now
@@ -918,10 +933,20 @@ while True:
                 menuUp = True
             elif event.key in (pygame.K_DOWN, pygame.K_s):
                 menuDown = True
+            elif event.key in (pygame.K_LEFT, pygame.K_a):
+                menuLeft = True
+            elif event.key in (pygame.K_RIGHT, pygame.K_d):
+                menuRight = True
+            elif event.key == pygame.K_TAB:
+                filterPressed = True
             elif event.key == pygame.K_c:
                 codexPressed = True
-
-    keys = pygame.key.get_pressed()
+            elif event.key == pygame.K_r:
+                retryPressed = True
+            elif event.key == pygame.K_F3:
+                showPerfOverlay = not showPerfOverlay
+            elif event.key == pygame.K_F11:
+                screen = presenter.toggle_fullscreen()
 
     if gameState == GameState.CONTRACT_MENU:
         if contracts:
@@ -930,30 +955,7 @@ while True:
             if menuDown:
                 selectedContractIndex = (selectedContractIndex + 1) % len(contracts)
             if confirmPressed or interactPressed:
-                currentContract = dict(contracts[selectedContractIndex])
-                contracts[selectedContractIndex] = currentContract
-                theme = currentContract.get("theme")
-                if theme:
-                    register_dimension_discovery(theme)
-                gravity = currentContract["gravity"]
-                jumpStrength = currentContract["jump"]
-                platformGapMin = currentContract["gap_min"]
-                platformGapMax = currentContract["gap_max"]
-                platformWidthMin = currentContract["width_min"]
-                platformWidthMax = currentContract["width_max"]
-                bonus_lives = extraLifeBonus + progressionLifeBonus
-                livesRemaining = max(1, currentContract["lives"] + bonus_lives)
-                maxLives = livesRemaining
-                levelVerticalBias = currentContract.get("vertical_bias", 1.0)
-                levelHorizontalBias = currentContract.get("horizontal_bias", 1.0)
-                wallJumpUnlocked = currentContract.get("wall_jump", False)
-                wallContactDir = 0
-                lastWallJumpMs = -10_000
-                dimensionLoreText = currentContract.get("theme_context", "")
-                portalActive = True
-                levelNeedsBuild = True
-                lastJumpHeight = (jumpStrength * jumpStrength) / (2.0 * max(1e-6, abs(gravity)))
-                print("ok fine we're doing", currentContract["name"])
+                contracts[selectedContractIndex] = begin_contract(contracts[selectedContractIndex])
                 gameState = GameState.HUB
         if backPressed:
             gameState = GameState.HUB
@@ -999,7 +1001,8 @@ while True:
                 else:
                     shopMessage = "Upgrade applied."
                 ownedUpgrades[key] = stacks + 1
-                print("bought", item["name"])
+                audio.play("purchase")
+                telemetry.emit(EVENT_PURCHASE, item["name"], item["cost"], playerMoney)
         if backPressed:
             shopMessage = "Come again soon."
             gameState = GameState.HUB
@@ -1017,13 +1020,22 @@ while True:
     elif gameState == GameState.CODEX:
         velX = 0.0
         velY = 0.0
-        entries = get_codex_entries()
-        if entries:
+        if menuLeft or menuRight or filterPressed:
+            if menuLeft:
+                codexSortIndex = (codexSortIndex - 1) % len(CODEX_SORT_MODES)
+            if menuRight:
+                codexSortIndex = (codexSortIndex + 1) % len(CODEX_SORT_MODES)
+            if filterPressed:
+                codexFilterIndex = (codexFilterIndex + 1) % len(CODEX_FILTERS)
+            codexSelectionIndex = 0
+            codexScrollOffset = 0
+        entry_count = get_codex_count()
+        if entry_count:
             if menuUp:
-                codexSelectionIndex = (codexSelectionIndex - 1) % len(entries)
+                codexSelectionIndex = (codexSelectionIndex - 1) % entry_count
             if menuDown:
-                codexSelectionIndex = (codexSelectionIndex + 1) % len(entries)
-            max_offset = max(0, len(entries) - CODEX_VISIBLE_ROWS)
+                codexSelectionIndex = (codexSelectionIndex + 1) % entry_count
+            max_offset = max(0, entry_count - CODEX_VISIBLE_ROWS)
             if codexSelectionIndex < codexScrollOffset:
                 codexScrollOffset = codexSelectionIndex
             elif codexSelectionIndex >= codexScrollOffset + CODEX_VISIBLE_ROWS:
@@ -1034,190 +1046,66 @@ while True:
     elif gameState == GameState.WIN:
         if confirmPressed or interactPressed or backPressed:
             returnToHub()
+        elif retryPressed and lastContract is not None:
+            returnToHub()
+            begin_contract(lastContract)
+            gameState = GameState.LEVEL
         velX = 0.0
         velY = 0.0
     elif gameState == GameState.GAME_OVER:
         if confirmPressed or interactPressed or backPressed:
             returnToHub()
+        elif retryPressed and lastContract is not None:
+            returnToHub()
+            begin_contract(lastContract)
+            gameState = GameState.LEVEL
         velX = 0.0
         velY = 0.0
     else:
         if gameState == GameState.LEVEL and levelNeedsBuild and currentContract is not None:
+            buildStarted = time.perf_counter()
             dimensionIndex += 1
 
-            def clamp_channel(v):
-                if v < 0:
-                    return 0
-                if v > 255:
-                    return 255
-                return v
-
-            hazard_name, hazard_color = random.choice(hazardOptions)
-            orb_palette = None
-            orb_count = 26
-            theme = currentContract.get("theme")
-            if theme:
-                sky_top_color = theme.get("sky_top", (80, 80, 140))
-                sky_bottom_color = theme.get("sky_bottom", (30, 30, 38))
-                ceilingColor = theme.get("ceiling_color", sky_top_color)
-                platformColor = theme.get("platform_color", (210, 210, 230))
-                hazard_name = theme.get("hazard_name", hazard_name)
-                hazard_color = theme.get("hazard_color", hazard_color)
-                glow_target_color = theme.get("glow_color", hazard_color)
-                orb_palette = theme.get("orb_palette")
-                orb_count = theme.get("orb_count", orb_count)
-            else:
-                shift = (dimensionIndex * 18) % 120
-                bgColor = (
-                    clamp_channel(30 + shift // 2),
-                    clamp_channel(30 + shift // 3),
-                    clamp_channel(38 + shift // 2),
-                )
-                ceilingColor = (
-                    clamp_channel(60 + shift // 2),
-                    clamp_channel(60 + shift // 4),
-                    clamp_channel(100 + shift // 2),
-                )
-                platformColor = (
-                    clamp_channel(190 + shift // 3),
-                    clamp_channel(200 + shift // 4),
-                    clamp_channel(235 + shift // 5),
-                )
-                glow_target_color = (
-                    clamp_channel(hazard_color[0] + 60),
-                    clamp_channel(hazard_color[1] + 50),
-                    clamp_channel(hazard_color[2] + 40),
-                )
-                sky_top_color = (
-                    clamp_channel(ceilingColor[0] + 40),
-                    clamp_channel(ceilingColor[1] + 30),
-                    clamp_channel(ceilingColor[2] + 60),
-                )
-                sky_bottom_color = (
-                    clamp_channel(bgColor[0] - 12),
-                    clamp_channel(bgColor[1] - 6),
-                    clamp_channel(bgColor[2] + 40),
-                )
-            floorHazardName = hazard_name
-            floorColor = hazard_color
-            bgColor = sky_bottom_color
+            theme = currentContract.get("theme") or synthesize_theme(dimensionIndex)
+            palette = level_palette(theme)
+            ceilingColor = palette["ceiling"]
+            platformColor = palette["platform"]
+            floorHazardName = palette["hazard_name"]
+            floorColor = palette["hazard_color"]
+            bgColor = palette["sky_bottom"]
             jumpHeight = (jumpStrength * jumpStrength) / (2.0 * max(1e-6, abs(gravity)))
             lastJumpHeight = jumpHeight
-            min_corridor = minCeilRoom + minFloorRoom + 180
-            base_corridor = min_corridor + int(jumpHeight * 0.6)
-            variation = max(24, int(jumpHeight * 0.35))
-            corridor_height = base_corridor + random.randint(-variation, variation)
-            if corridor_height < min_corridor:
-                corridor_height = min_corridor
-            if corridor_height > floorY - 80:
-                corridor_height = floorY - 80
-            levelSkyTop = max(40, floorY - corridor_height)
+            level_seed = currentContract.get("seed", dimensionIndex)
+            layout = generate_layout(level_seed, contract_tuning(currentContract), LEVEL_BOUNDS)
+            levelSkyTop = layout["sky_top"]
             roofHeight = 0
-            if not theme:
-                glow_target_color = (
-                    clamp_channel(floorColor[0] + 60),
-                    clamp_channel(floorColor[1] + 50),
-                    clamp_channel(floorColor[2] + 40),
-                )
-            # Pre-render sky gradient and parallax glow for a cleaner backdrop.
-            levelBackgroundSurface = create_vertical_gradient(screenWidth, screenHeight, sky_top_color, sky_bottom_color)
-            if theme:
-                accent_alpha = 55
-                for _ in range(10):
-                    height = random.randint(80, 220)
-                    width = random.randint(60, 160)
-                    x = random.randint(0, screenWidth)
-                    y = random.randint(int(levelSkyTop * 0.6), floorY - 220)
-                    accent_color = mix_colors(sky_top_color, glow_target_color, random.uniform(0.2, 0.8))
-                    pygame.draw.rect(
-                        levelBackgroundSurface,
-                        (*accent_color, accent_alpha),
-                        pygame.Rect(x, y, width, height),
-                        border_radius=18,
-                    )
-            levelGlowSurface = create_vertical_gradient(screenWidth, 180, sky_top_color, glow_target_color, 0, 170)
-            backdropOrbs = []
-            # Build a handful of parallax lights to float behind the action.
-            orb_total = max(12, int(orb_count))
-            for _ in range(orb_total):
-                orb_x = random.randint(0, hallLength)
-                orb_y = random.randint(int(max(20, levelSkyTop * 0.6)), int(floorY * 0.65))
-                radius = random.randint(6, 18)
-                tint_amount = random.uniform(0.25, 0.75)
-                if orb_palette:
-                    palette_color = random.choice(orb_palette)
-                    orb_color = mix_colors(palette_color, glow_target_color, tint_amount)
-                else:
-                    orb_color = mix_colors(sky_top_color, glow_target_color, tint_amount)
-                orb_alpha = int(random.uniform(120, 210))
-                orb_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-                pygame.draw.circle(orb_surface, (*orb_color, orb_alpha), (radius, radius), radius)
-                backdropOrbs.append(
-                    {
-                        "x": orb_x,
-                        "y": orb_y,
-                        "radius": radius,
-                        "parallax": random.uniform(0.18, 0.42),
-                        "surface": orb_surface.convert_alpha(),
-                    }
-                )
-            levelBeacons = []
+            levelSeed = level_seed
+            levelPalette = palette
+            levelBackgroundSurface, levelGlowSurface, backdropOrbs = build_backdrop(
+                level_seed,
+                palette,
+                levelSkyTop,
+                (screenWidth, screenHeight),
+                LEVEL_BOUNDS,
+                qualityGovernor.settings["accents"],
+                CONFIG["orb_scale"],
+                CONFIG["orb_min"],
+            )
+            levelBeacons = layout["beacons"]
             beaconsCollected = 0
-            candidate_platforms = [plat for plat in platforms[1:-1]]
-            random.shuffle(candidate_platforms)
-            beacon_target = min(len(candidate_platforms), random.randint(2, 4))
-            for idx in range(beacon_target):
-                plat = candidate_platforms[idx]
-                if plat.width <= 40:
-                    continue
-                spawn_x = random.randint(plat.left + 20, plat.right - 20)
-                spawn_y = plat.top - 18
-                beacon_rect = pygame.Rect(spawn_x - 8, spawn_y - 8, 16, 16)
-                levelBeacons.append(
-                    {
-                        "rect": beacon_rect,
-                        "pulse": random.uniform(0.2, 1.0),
-                        "collected": False,
-                    }
-                )
-            vertical_step = max(28, int(jumpHeight * 0.6 * levelVerticalBias))
-            horizontal_step = max(
-                platformGapMin,
-                min(platformGapMax, int(jumpHeight * 1.2 * levelHorizontalBias)),
+            levelHazards.set_color(floorColor)
+            levelParticles.set_palette(floorColor, palette["glow"])
+            levelParticles.clear()
+            populate_hazards(
+                levelHazards, layout, currentContract.get("hazard_kind"), currentContract.get("difficulty_raw", 1.0), LEVEL_BOUNDS
             )
-            start_y = floorY - minFloorRoom - 40
-            min_platform_y = max(100, levelSkyTop + minCeilRoom)
-            max_platform_y = floorY - minFloorRoom
-            door_start = hallLength - doorClearBuffer
-            start_platform = pygame.Rect(60, start_y, 220, platformThickness)
-            platforms = [start_platform]
-            current_x = start_platform.right + random.randint(platformGapMin, horizontal_step)
-            current_y = start_platform.y
-            while current_x < door_start - platformWidthMin - platformGapMin:
-                width = random.randint(platformWidthMin, platformWidthMax)
-                current_y += random.randint(-vertical_step, vertical_step)
-                if current_y < min_platform_y:
-                    current_y = min_platform_y
-                if current_y > max_platform_y:
-                    current_y = max_platform_y
-                platforms.append(pygame.Rect(current_x, current_y, width, platformThickness))
-                current_x += width + random.randint(platformGapMin, horizontal_step)
-            end_width = max(200, platformWidthMax)
-            end_x = max(door_start - end_width - 40, current_x - 80)
-            end_y = max(min_platform_y, min(current_y, max_platform_y))
-            end_platform = pygame.Rect(end_x, end_y, end_width, platformThickness)
-            platforms.append(end_platform)
-            platformRects = platforms
-            startPlatformRect = start_platform
-            endPlatformRect = end_platform
-            door_left = max(endPlatformRect.centerx - doorWidth // 2, endPlatformRect.left + 10)
-            if door_left > endPlatformRect.right - doorWidth - 10:
-                door_left = endPlatformRect.right - doorWidth - 10
-            door_top_desired = endPlatformRect.top - doorHeight
-            min_door_top = max(80, levelSkyTop + 20)
-            door_top = door_top_desired if door_top_desired > min_door_top else min_door_top
-            door_height_actual = max(60, endPlatformRect.top - door_top)
-            doorRect.update(door_left, door_top, doorWidth, door_height_actual)
+            platformRects = layout["platforms"]
+            levelPlatforms = PlatformSet(
+                platformRects, plan_platform_behaviours(layout, currentContract.get("platform_mix"), LEVEL_BOUNDS)
+            )
+            startPlatformRect = layout["start"]
+            endPlatformRect = layout["end"]
+            doorRect.update(layout["door"])
             spawnPoint.update(startPlatformRect.centerx, startPlatformRect.top)
             playerRect.midbottom = (spawnPoint.x, spawnPoint.y)
             velX = 0.0
@@ -1229,75 +1117,64 @@ while True:
             pygame.display.set_caption(f"M.U.P.S — Dimension {dimensionIndex + 1}")
             levelNeedsBuild = False
             levelStartTimeMs = pygame.time.get_ticks()
+            hazardGraceUntilMs = levelStartTimeMs + HAZARD_RESPAWN_GRACE_MS
+            ghostRecorder.start()
+            ghostPlayer.load(ghostStore.get(level_seed))
+            audio.play_music(currentContract.get("theme_key"))
+            telemetry.emit(
+                EVENT_LEVEL_BUILT,
+                level_seed,
+                round((time.perf_counter() - buildStarted) * 1000, 2),
+                len(platformRects),
+                len(levelBeacons),
+                levelHazards.count,
+            )
 
-        sprint_active = keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]
-        move_speed = playerSpeed * (PLAYER_SPRINT_MULTIPLIER if sprint_active else 1)
-        left = keys[pygame.K_a]
-        right = keys[pygame.K_d]
-        if left and not right:
-            velX = -move_speed
-        elif right and not left:
-            velX = move_speed
-        else:
-            velX = 0
+        sprint_active = heldKeys[pygame.K_LSHIFT] or heldKeys[pygame.K_RSHIFT]
+        velX = input_velocity(heldKeys[pygame.K_a], heldKeys[pygame.K_d], sprint_active)
         velY += gravity
 
-        solids = platformRects if gameState == GameState.LEVEL else []
-        playerRect.x += int(velX)
-        if solids:
-            collided_horizontally = False
-            if velX != 0:
-                for solid in solids:
-                    if playerRect.colliderect(solid):
-                        if velX > 0:
-                            playerRect.right = solid.left
-                            wallContactDir = 1
-                            collided_horizontally = True
-                        elif velX < 0:
-                            playerRect.left = solid.right
-                            wallContactDir = -1
-                            collided_horizontally = True
-            if not collided_horizontally:
-                contact_dir = 0
-                for solid in solids:
-                    if solid.top < playerRect.bottom and solid.bottom > playerRect.top:
-                        if playerRect.right == solid.left:
-                            contact_dir = 1
-                            break
-                        if playerRect.left == solid.right:
-                            contact_dir = -1
-                            break
-                wallContactDir = contact_dir
+        if gameState == GameState.LEVEL:
+            solids = levelPlatforms.update(now - levelStartTimeMs, cameraX, cameraX + screenWidth, playerRect, velY)
         else:
-            wallContactDir = 0
-
-        playerRect.y += int(velY)
-        groundedNow = False
-        if solids:
-            for solid in solids:
-                if playerRect.colliderect(solid):
-                    if velY > 0:
-                        playerRect.bottom = solid.top
-                        velY = 0
-                        groundedNow = True
-                    elif velY < 0:
-                        playerRect.top = solid.bottom
-                        velY = 0
+            solids = []
+        wallContactDir = move_horizontal(playerRect, velX, solids)
+        impactSpeed = velY
+        velY, groundedNow = move_vertical(playerRect, velY, solids)
+        if gameState == GameState.LEVEL and groundedNow and not onGround and impactSpeed >= LANDING_DUST_MIN_SPEED:
+            levelParticles.landing_dust(playerRect.centerx, playerRect.bottom, impactSpeed)
+            audio.play("land")
 
         if levelBeacons and gameState == GameState.LEVEL:
             for beacon in levelBeacons:
                 if beacon.get("collected"):
                     continue
-                if playerRect.colliderect(beacon["rect"].inflate(6, 6)):
+                if playerRect.colliderect(beacon["hit_rect"]):
                     beacon["collected"] = True
                     beaconsCollected += 1
+                    levelParticles.beacon_burst(beacon["rect"].centerx, beacon["rect"].centery)
+                    audio.play("beacon")
+                    telemetry.emit(EVENT_BEACON, beaconsCollected, len(levelBeacons), now - levelStartTimeMs)
                     push_progress_toast(
                         f"Beacon {beaconsCollected}/{len(levelBeacons)} secured"
                     )
 
-        if playerRect.bottom >= floorY:
+        hazardHit = False
+        if gameState == GameState.LEVEL and levelHazards.count:
+            levelHazards.update(
+                (now - levelStartTimeMs) / 1000.0, cameraX - HAZARD_VIEW_MARGIN, cameraX + screenWidth + HAZARD_VIEW_MARGIN
+            )
+            hazardHit = now >= hazardGraceUntilMs and levelHazards.hits(playerRect)
+        if gameState == GameState.LEVEL:
+            levelParticles.note_frame(dt)
+            levelParticles.ambient_embers(dt, cameraX, cameraX + screenWidth, floorY)
+            levelParticles.update(dt)
+
+        if playerRect.bottom >= floorY or hazardHit:
             if gameState == GameState.LEVEL:
                 livesRemaining = max(0, livesRemaining - 1)
+                telemetry.emit(EVENT_DEATH, "hazard" if hazardHit else "fall", livesRemaining, now - levelStartTimeMs)
+                hazardGraceUntilMs = now + HAZARD_RESPAWN_GRACE_MS
                 playerRect.midbottom = (spawnPoint.x, spawnPoint.y)
                 velX = 0.0
                 velY = 0.0
@@ -1309,6 +1186,7 @@ while True:
                     failure_note = record_delivery_failure("Ran out of lives")
                     if currentContract:
                         record_codex_completion(currentContract.get("theme_key"), None, beaconsCollected, success=False)
+                        record_run_history(currentContract, OUTCOME_FAILED, now - levelStartTimeMs)
                     if currentContract:
                         gameOverSummary.update(
                             {
@@ -1327,7 +1205,6 @@ while True:
                                 "best": bestDeliveryStreak,
                             }
                         )
-                    print("rip mission lol")
                     portalActive = False
                     currentContract = None
                     levelNeedsBuild = False
@@ -1343,38 +1220,35 @@ while True:
             lastGroundedMs = now
         onGround = groundedNow
 
-        pressedRecently = (now - lastJumpPressMs) <= jumpBufferMs
-        hasCoyote = (now - lastGroundedMs) <= coyoteTimeMs
-        wantsJump = jumpPressedThisFrame or pressedRecently
-        canWallJump = (
-            wantsJump
-            and wallJumpUnlocked
-            and wallContactDir != 0
-            and not onGround
-            and gameState == GameState.LEVEL
-            and (now - lastWallJumpMs) >= wallJumpCooldownMs
+        jump_state = jumpState
+        jump_state["vel_y"] = velY
+        jump_state["on_ground"] = onGround
+        jump_state["wall_dir"] = wallContactDir
+        jump_state["last_jump_press_ms"] = lastJumpPressMs
+        jump_state["last_grounded_ms"] = lastGroundedMs
+        jump_state["last_wall_jump_ms"] = lastWallJumpMs
+        resolve_jump(
+            playerRect,
+            solids,
+            now,
+            jumpPressedThisFrame,
+            jumpStrength,
+            wallJumpUnlocked and gameState == GameState.LEVEL,
+            jump_state,
         )
-        if canWallJump:
-            velY = -jumpStrength
-            lastWallJumpMs = now
-            onGround = False
-            lastJumpPressMs = -10_000
-            push = -wallContactDir * 6
-            if push != 0:
-                playerRect.x += push
-                if solids:
-                    for solid in solids:
-                        if playerRect.colliderect(solid):
-                            if push > 0:
-                                playerRect.right = solid.left
-                            else:
-                                playerRect.left = solid.right
-            wallContactDir = 0
-            lastGroundedMs = now - coyoteTimeMs - 5
-        elif wantsJump and (onGround or hasCoyote):
-            velY = -jumpStrength
-            onGround = False
-            lastJumpPressMs = -10_000
+        velY = jump_state["vel_y"]
+        onGround = jump_state["on_ground"]
+        wallContactDir = jump_state["wall_dir"]
+        # resolve_jump clears the buffered press when it actually launches a jump.
+        if lastJumpPressMs != NO_PRESS_MS and jump_state["last_jump_press_ms"] == NO_PRESS_MS:
+            audio.play("jump")
+        lastJumpPressMs = jump_state["last_jump_press_ms"]
+        lastGroundedMs = jump_state["last_grounded_ms"]
+        lastWallJumpMs = jump_state["last_wall_jump_ms"]
+
+        if gameState == GameState.LEVEL:
+            ghostRecorder.sample(now - levelStartTimeMs, playerRect.x, playerRect.y)
+            ghostPlayer.advance(now - levelStartTimeMs)
 
         if gameState == GameState.LEVEL and playerRect.colliderect(doorRect):
             pay_multiplier = get_effective_pay_multiplier()
@@ -1382,6 +1256,7 @@ while True:
             beacon_cash_bonus = beaconsCollected * 30
             beacon_xp_bonus = beaconsCollected * 15
             mission_time_ms = now - levelStartTimeMs if levelStartTimeMs else None
+            audio.play("door")
             if currentContract:
                 playerMoney += payout + beacon_cash_bonus
                 playerXP += currentContract["xp"] + beacon_xp_bonus
@@ -1390,9 +1265,11 @@ while True:
                     playerLevel += 1
                     xpForNextLevel = max(xpForNextLevel + 80, int(xpForNextLevel * 1.2))
                 milestone_messages, rank_info, next_rank = record_delivery_success()
-                next_delta = next_rank["deliveries"] - contractsCompleted if next_rank else 0
+                next_delta = progressionTracker.status(contractsCompleted)["next_delta"]
                 pay_bonus_percent = int(round((progressionPayBonusMultiplier - 1.0) * 100))
                 record_codex_completion(currentContract.get("theme_key"), mission_time_ms, beaconsCollected, success=True)
+                recorded_at = record_run_history(currentContract, OUTCOME_CLEARED, mission_time_ms)
+                ghost_saved = ghostStore.offer(currentContract.get("seed", dimensionIndex), mission_time_ms, ghostRecorder)
                 winSummary.update(
                     {
                         "payment": payout + beacon_cash_bonus,
@@ -1415,14 +1292,19 @@ while True:
                         "beaconCash": beacon_cash_bonus,
                         "beaconXp": beacon_xp_bonus,
                         "time": mission_time_ms,
+                        "theme_key": currentContract.get("theme_key"),
+                        "recorded_at": recorded_at,
+                        "ghostSaved": ghost_saved,
                     }
                 )
+                telemetry.emit(
+                    EVENT_WIN, currentContract["name"], currentContract.get("theme_key"), mission_time_ms, beaconsCollected, winSummary["payment"]
+                )
             portalActive = False
             levelNeedsBuild = False
             currentContract = None
             gameState = GameState.WIN
             levelBeacons = []
-            print("ez win, next")
             continue
 
         if gameState == GameState.HUB:
@@ -1453,12 +1335,12 @@ while True:
                     elif near_computer:
                         gameState = GameState.CONTRACT_MENU
             elif codexPressed and near_computer:
-                entries = get_codex_entries()
-                if entries:
-                    codexSelectionIndex = max(0, min(codexSelectionIndex, len(entries) - 1))
+                entry_count = get_codex_count()
+                if entry_count:
+                    codexSelectionIndex = max(0, min(codexSelectionIndex, entry_count - 1))
                 else:
                     codexSelectionIndex = 0
-                codexScrollOffset = max(0, min(codexScrollOffset, max(0, len(entries) - CODEX_VISIBLE_ROWS)))
+                codexScrollOffset = max(0, min(codexScrollOffset, max(0, entry_count - CODEX_VISIBLE_ROWS)))
                 gameState = GameState.CODEX
             if portalActive and playerRect.colliderect(portalRect):
                 gameState = GameState.LEVEL
@@ -1493,19 +1375,25 @@ while True:
             screen.blit(levelBackgroundSurface, (0, 0))
         else:
             screen.fill(bgColor)
+        quality = qualityGovernor.settings
         if backdropOrbs:
-            for orb in backdropOrbs:
+            for orb in backdropOrbs[: int(len(backdropOrbs) * quality["orb_fraction"])]:
                 draw_x = orb["x"] - cameraX * orb["parallax"] - orb["radius"]
                 if draw_x > screenWidth or draw_x < -orb["radius"] * 2:
                     continue
                 draw_y = orb["y"] - orb["radius"]
                 screen.blit(orb["surface"], (draw_x, draw_y))
         pygame.draw.rect(screen, floorColor, (-cameraX, floorY, hallLength, screenHeight - floorY))
-        if levelGlowSurface:
+        if levelGlowSurface and quality["glow"]:
             glow_y = floorY - levelGlowSurface.get_height()
             screen.blit(levelGlowSurface, (0, glow_y))
-        for plat in platformRects:
-            pygame.draw.rect(screen, platformColor, (plat.x - cameraX, plat.y, plat.width, plat.height))
+        levelPlatforms.draw(screen, cameraX, platformColor, now - levelStartTimeMs)
+        levelHazards.draw(screen, cameraX)
+        levelParticles.draw(screen, cameraX)
+        if ghostPlayer.active and not ghostPlayer.finished:
+            ghostDrawRect.x = ghostPlayer.rect.x - cameraX
+            ghostDrawRect.y = ghostPlayer.rect.y
+            screen.blit(ghostSurface, ghostDrawRect)
         if levelBeacons:
             time_pulse = pygame.time.get_ticks() / 400.0
             for beacon in levelBeacons:
@@ -1516,7 +1404,8 @@ while True:
                 draw_x = rect.centerx - cameraX
                 draw_y = rect.centery + bob
                 pygame.draw.circle(screen, (255, 240, 160), (draw_x, draw_y), 8)
-                pygame.draw.circle(screen, (60, 200, 255), (draw_x, draw_y), 13, 2)
+                if quality["beacon_rings"]:
+                    pygame.draw.circle(screen, (60, 200, 255), (draw_x, draw_y), 13, 2)
         pygame.draw.rect(screen, doorColor, (doorRect.x - cameraX, doorRect.y, doorRect.width, doorRect.height))
     else:
         screen.fill(hubBackgroundColor)
@@ -1524,68 +1413,61 @@ while True:
         pygame.draw.rect(screen, hubFloorColor, (0, floorY, screenWidth, screenHeight - floorY))
 
         tableColor = (110, 90, 120)
-        legWidth = 16
         pygame.draw.rect(screen, tableColor, deskRect)
-        pygame.draw.rect(screen, tableColor, (deskRect.left + 8, deskRect.bottom, legWidth, 50))
-        pygame.draw.rect(screen, tableColor, (deskRect.right - legWidth - 8, deskRect.bottom, legWidth, 50))
+        for legRect in deskLegRects:
+            pygame.draw.rect(screen, tableColor, legRect)
         pygame.draw.rect(screen, (15, 15, 20), computerBodyRect)
-        screenRect = computerBodyRect.inflate(-14, -18)
-        pygame.draw.rect(screen, computerScreenColor, screenRect)
-        keyboardRect = pygame.Rect(computerBodyRect.left - 20, computerBodyRect.bottom, computerBodyRect.width + 40, 14)
+        pygame.draw.rect(screen, computerScreenColor, computerScreenRect)
         pygame.draw.rect(screen, (160, 160, 175), keyboardRect)
-        dispatcher_npc = next((npc for npc in npc_characters if npc["key"] == "dispatcher_rae"), None)
-        if introArrowActive and dispatcher_npc:
-            arrow_x = dispatcher_npc["rect"].centerx
-            arrow_y = dispatcher_npc["rect"].top - 70
+        if introArrowActive and dispatcherNpc:
+            arrow_x = dispatcherNpc["rect"].centerx
+            arrow_y = dispatcherNpc["rect"].top - 70
             wiggle = math.sin(pygame.time.get_ticks() / 400.0) * 6
-            points = [
-                (arrow_x, arrow_y + wiggle),
-                (arrow_x - 18, arrow_y - 30 + wiggle),
-                (arrow_x + 18, arrow_y - 30 + wiggle),
-            ]
-            pygame.draw.polygon(screen, (255, 230, 140), points)
-            prompt = smallFont.render("Talk to Dispatcher Rae", True, (250, 240, 210))
+            tip, left_wing, right_wing = introArrowPoints
+            tip[0], tip[1] = arrow_x, arrow_y + wiggle
+            left_wing[0], left_wing[1] = arrow_x - 18, arrow_y - 30 + wiggle
+            right_wing[0], right_wing[1] = arrow_x + 18, arrow_y - 30 + wiggle
+            pygame.draw.polygon(screen, (255, 230, 140), introArrowPoints)
+            prompt = render_text(smallFont, "Talk to Dispatcher Rae", textAntialias, (250, 240, 210))
             screen.blit(prompt, (arrow_x - prompt.get_width() // 2, arrow_y - 50 + wiggle))
-        comp_hint = smallFont.render("E: Contracts", True, (210, 240, 255))
+        comp_hint = render_text(smallFont, "E: Contracts", textAntialias, (210, 240, 255))
         screen.blit(comp_hint, (computerBodyRect.left - 8, computerBodyRect.top - 50))
-        codex_hint = smallFont.render("C: Codex", True, (190, 220, 255))
+        codex_hint = render_text(smallFont, "C: Codex", textAntialias, (190, 220, 255))
         screen.blit(codex_hint, (computerBodyRect.left - 8, computerBodyRect.top - 30))
 
         counterColor = (90, 100, 150)
         pygame.draw.rect(screen, counterColor, shopCounterRect)
-        pygame.draw.rect(screen, counterColor, (shopCounterRect.left + 10, shopCounterRect.bottom, 16, 46))
-        pygame.draw.rect(screen, counterColor, (shopCounterRect.right - 26, shopCounterRect.bottom, 16, 46))
-        sign = uiFont.render("Shop", True, (230, 230, 255))
+        for legRect in counterLegRects:
+            pygame.draw.rect(screen, counterColor, legRect)
+        sign = render_text(uiFont, "Shop", textAntialias, (230, 230, 255))
         signPos = (shopCounterRect.centerx - sign.get_width() // 2, shopCounterRect.y - 32)
         pygame.draw.rect(screen, (32, 32, 48), (signPos[0], signPos[1], sign.get_width() + 16, sign.get_height() + 8))
         screen.blit(sign, (signPos[0] + 8, signPos[1] + 4))
 
         portalColor = portalActiveColor if portalActive else portalInactiveColor
-        pygame.draw.rect(screen, (40, 40, 60), portalRect.inflate(12, 12))
+        pygame.draw.rect(screen, (40, 40, 60), portalFrameRect)
         pygame.draw.rect(screen, portalColor, portalRect)
-        pygame.draw.rect(screen, (255, 255, 255), portalRect.inflate(-40, -120), 2)
+        pygame.draw.rect(screen, (255, 255, 255), portalInsetRect, 2)
 
         if officeDecorStyle == "plant":
-            plantPot = pygame.Rect(deskRect.right + 20, deskRect.top - 24, 20, 24)
-            pygame.draw.rect(screen, (120, 70, 40), plantPot)
-            pygame.draw.circle(screen, (80, 200, 90), (plantPot.centerx, plantPot.top - 10), 18)
+            pygame.draw.rect(screen, (120, 70, 40), plantPotRect)
+            pygame.draw.circle(screen, (80, 200, 90), (plantPotRect.centerx, plantPotRect.top - 10), 18)
         elif officeDecorStyle == "poster":
-            posterRect = pygame.Rect(screenWidth - 260, 60, 140, 90)
             pygame.draw.rect(screen, (30, 45, 80), posterRect)
-            pygame.draw.rect(screen, (190, 210, 255), posterRect.inflate(-12, -12))
+            pygame.draw.rect(screen, (190, 210, 255), posterInsetRect)
             pygame.draw.line(screen, (60, 90, 150), posterRect.midbottom, (posterRect.centerx, posterRect.top + 10), 2)
 
         for npc in npc_characters:
             body_rect = npc["rect"]
             pygame.draw.rect(screen, npc["color"], body_rect, border_radius=6)
-            pygame.draw.circle(screen, npc["accent"], (body_rect.centerx, body_rect.top - 12), 16)
-            pygame.draw.rect(screen, (25, 25, 38), body_rect.inflate(6, 6), 2, border_radius=8)
+            pygame.draw.circle(screen, npc["accent"], npc["head_center"], 16)
+            pygame.draw.rect(screen, (25, 25, 38), npc["outline_rect"], 2, border_radius=8)
             if activeNpc and npc["key"] == activeNpc.get("key"):
-                pygame.draw.rect(screen, (255, 245, 180), body_rect.inflate(10, 10), 2, border_radius=10)
-            nameSurf = smallFont.render(npc["name"], True, (220, 220, 255))
+                pygame.draw.rect(screen, (255, 245, 180), npc["highlight_rect"], 2, border_radius=10)
+            nameSurf = render_text(smallFont, npc["name"], textAntialias, (220, 220, 255))
             screen.blit(nameSurf, (body_rect.centerx - nameSurf.get_width() // 2, body_rect.top - 38))
             if gameState == GameState.HUB and playerRect.colliderect(npc["talk_rect"]):
-                prompt = smallFont.render("E - Talk", True, (200, 245, 255))
+                prompt = render_text(smallFont, "E - Talk", textAntialias, (200, 245, 255))
                 screen.blit(prompt, (body_rect.centerx - prompt.get_width() // 2, body_rect.bottom + 6))
 
     if player_walk_frames_right:
@@ -1598,100 +1480,19 @@ while True:
         sprite_y = playerRect.bottom - sprite.get_height()
         screen.blit(sprite, (sprite_x, sprite_y))
     else:
-        playerDrawRect = pygame.Rect(playerRect.x - cameraX, playerRect.y, playerRect.width, playerRect.height)
+        playerDrawRect.update(playerRect.x - cameraX, playerRect.y, playerRect.width, playerRect.height)
         pygame.draw.rect(screen, playerColor, playerDrawRect)
 
-    current_rank_info, next_rank_info = get_postal_rank(contractsCompleted)
-    if gameState == GameState.LEVEL:
-        contract_name = currentContract["name"] if currentContract else "Contract"
-        base_payment = currentContract["payment"] if currentContract else 0
-        payment = int(round(base_payment * get_effective_pay_multiplier()))
-        hud_lines = [
-            contract_name,
-            f"Lives: {livesRemaining}",
-            f"Payment: ${payment}",
-            f"Hazard: {floorHazardName}",
-        ]
-        if currentContract:
-            envLine = currentContract.get("environment")
-            if envLine:
-                hud_lines.append(f"Dimension: {envLine}")
-            modifiers = currentContract.get("modifiers") or []
-            if modifiers:
-                summary = " · ".join(modifiers[:2])
-                if len(modifiers) > 2:
-                    summary += " · ..."
-                hud_lines.append(f"Mods: {summary}")
-            if currentContract.get("wall_jump"):
-                hud_lines.append("Ability: Wall jump thrusters online")
-        hud_lines.extend(
-            [
-                f"Jump Height: {int(lastJumpHeight)} px",
-                f"XP: {playerXP}/{xpForNextLevel} (Lv {playerLevel})",
-            ]
-        )
-        if levelBeacons:
-            hud_lines.append(f"Beacons: {beaconsCollected}/{len(levelBeacons)}")
-        hud_lines.append(f"Deliveries: {contractsCompleted}  Streak: {deliveryStreak}")
-        rank_line = f"Rank: {current_rank_info['title']}"
-        if next_rank_info:
-            rank_line += f"  Next: {max(0, next_rank_info['deliveries'] - contractsCompleted)}"
-        hud_lines.append(rank_line)
-        perk_line = f"Perks: pay x{get_effective_pay_multiplier():.2f}"
-        bonus_lives = extraLifeBonus + progressionLifeBonus
-        if bonus_lives > 0:
-            perk_line += f"  +{bonus_lives} life(s)"
-        hud_lines.append(perk_line)
-    elif gameState in (GameState.HUB, GameState.NPC_DIALOG, GameState.CODEX):
-        hud_lines = [
-            f"Level {playerLevel}    XP: {playerXP}/{xpForNextLevel}",
-            f"Money: ${playerMoney}",
-            "A/D to move  SPACE to jump",
-            "Press E at the computer for contracts",
-            "Press C at the computer for codex",
-            "Press E at the counter for upgrades",
-            "Press E near crew to chat",
-            f"Portal: {'ONLINE' if portalActive else 'offline'}",
-        ]
-        if gameState == GameState.NPC_DIALOG and activeNpc:
-            hud_lines.append(f"Chatting with {activeNpc['name']}")
-        hud_lines.append(f"Deliveries: {contractsCompleted}  Streak: {deliveryStreak}")
-        next_rank_delta = next_rank_info['deliveries'] - contractsCompleted if next_rank_info else 0
-        if next_rank_delta > 0:
-            hud_lines.append(f"Rank: {current_rank_info['title']}  Next in {next_rank_delta}")
-        else:
-            hud_lines.append(f"Rank: {current_rank_info['title']}")
-        perk_line = f"Perks: pay x{get_effective_pay_multiplier():.2f}"
-        bonus_lives = extraLifeBonus + progressionLifeBonus
-        if bonus_lives > 0:
-            perk_line += f"  +{bonus_lives} life(s)"
-        hud_lines.append(perk_line)
-    else:
-        hud_lines = [
-            f"Level {playerLevel}    XP: {playerXP}/{xpForNextLevel}",
-            f"Money: ${playerMoney}",
-        ]
-
-    for idx, line in enumerate(hud_lines):
-        screen.blit(uiFont.render(line, True, (255, 255, 255)), (20, 20 + idx * 24))
-    if gameState == GameState.LEVEL and dimensionLoreText:
-        lore_lines = wrap_text(dimensionLoreText, smallFont, 360)
-        for idx, lore in enumerate(lore_lines[:2]):
-            screen.blit(smallFont.render(lore, True, (210, 220, 255)), (20, screenHeight - 60 + idx * 18))
+    refresh_hud()
+    screen.blits(hudBlits, doreturn=False)
     if progressToasts:
-        for idx, toast in enumerate(progressToasts[:3]):
-            textSurf = smallFont.render(toast["text"], True, (255, 235, 205))
-            bgRect = textSurf.get_rect()
-            bgRect.top = 20 + idx * 26
-            bgRect.right = screenWidth - 20
-            pygame.draw.rect(screen, (30, 32, 52), bgRect.inflate(14, 8), border_radius=8)
-            screen.blit(textSurf, (bgRect.x + 7, bgRect.y + 4))
+        progressToasts.draw(screen, now, screenWidth - 20, 20)
 
     if gameState == GameState.CONTRACT_MENU:
         panelRect = pygame.Rect(140, 120, screenWidth - 280, screenHeight - 240)
         pygame.draw.rect(screen, (28, 28, 42), panelRect)
         pygame.draw.rect(screen, (180, 180, 210), panelRect, 2)
-        title = titleFont.render("Select Contract", True, (245, 245, 255))
+        title = render_text(titleFont, "Select Contract", textAntialias, (245, 245, 255))
         screen.blit(title, (panelRect.x + 20, panelRect.y + 20))
         itemY = panelRect.y + 80
         for idx, contract in enumerate(contracts):
@@ -1710,13 +1511,14 @@ while True:
             if isSelected:
                 highlight = pygame.Rect(panelRect.x + 15, itemY - 6, panelRect.width - 30, blockHeight + 12)
                 pygame.draw.rect(screen, (70, 90, 140), highlight, border_radius=6)
-            nameText = uiFont.render(f"{contract['name']} — ${effectivePay}", True, nameColor)
+            nameText = render_text(uiFont, f"{contract['name']} — ${effectivePay}", textAntialias, nameColor)
             screen.blit(nameText, (panelRect.x + 24, itemY))
-            descText = uiFont.render(contract["description"], True, descColor)
+            descText = render_text(uiFont, contract["description"], textAntialias, descColor)
             screen.blit(descText, (panelRect.x + 24, itemY + 22))
-            extraText = uiFont.render(
+            extraText = render_text(
+                uiFont,
                 f"XP {contract['xp']} | Lives {contract['lives']} | {contract['label']} ({contract['difficulty']:.2f})",
-                True,
+                textAntialias,
                 extraColor,
             )
             info_y = itemY + 42
@@ -1724,26 +1526,26 @@ while True:
             env_y = info_y + 18
             if envParts:
                 envColor = (170, 220, 255) if isSelected else (115, 145, 185)
-                envText = smallFont.render(" · ".join(envParts), True, envColor)
+                envText = render_text(smallFont, " · ".join(envParts), textAntialias, envColor)
                 screen.blit(envText, (panelRect.x + 24, env_y))
             mods_y = env_y + (18 if envParts else 0)
             if modifiers:
                 modsColor = (205, 235, 255) if isSelected else (145, 160, 190)
-                modsText = smallFont.render(" · ".join(modifiers), True, modsColor)
+                modsText = render_text(smallFont, " · ".join(modifiers), textAntialias, modsColor)
                 screen.blit(modsText, (panelRect.x + 24, mods_y))
             itemY += blockHeight
             itemY += 12
-        instructions = uiFont.render("Enter/E to accept • Esc to cancel • W/S to navigate", True, (230, 230, 240))
+        instructions = render_text(uiFont, "Enter/E to accept • Esc to cancel • W/S to navigate", textAntialias, (230, 230, 240))
         screen.blit(instructions, (panelRect.x + 20, panelRect.bottom - 40))
 
     elif gameState == GameState.SHOP:
         panelRect = pygame.Rect(120, 110, screenWidth - 240, screenHeight - 220)
         pygame.draw.rect(screen, (30, 26, 42), panelRect)
         pygame.draw.rect(screen, (186, 190, 220), panelRect, 2, border_radius=10)
-        title = titleFont.render("Supply Depot", True, (245, 245, 255))
+        title = render_text(titleFont, "Supply Depot", textAntialias, (245, 245, 255))
         screen.blit(title, (panelRect.x + 28, panelRect.y + 24))
 
-        fundsText = uiFont.render(f"Credits: ${playerMoney}", True, (220, 220, 255))
+        fundsText = render_text(uiFont, f"Credits: ${playerMoney}", textAntialias, (220, 220, 255))
         screen.blit(fundsText, (panelRect.x + panelRect.width - fundsText.get_width() - 28, panelRect.y + 30))
 
         listTop = panelRect.y + 100
@@ -1767,10 +1569,10 @@ while True:
             descColor = (200, 200, 215)
             statusColor = (200, 235, 255) if available else (255, 150, 150)
 
-            nameSurf = uiFont.render(item["name"], True, titleColor)
+            nameSurf = render_text(uiFont, item["name"], textAntialias, titleColor)
             screen.blit(nameSurf, (rowRect.x + 16, rowRect.y + 10))
 
-            costSurf = uiFont.render(f"${item['cost']}", True, statusColor if available else (200, 140, 160))
+            costSurf = render_text(uiFont, f"${item['cost']}", textAntialias, statusColor if available else (200, 140, 160))
             screen.blit(costSurf, (rowRect.right - costSurf.get_width() - 16, rowRect.y + 10))
 
             detailParts = [item["description"]]
@@ -1779,70 +1581,85 @@ while True:
             elif ownedTimes:
                 detailParts.append("already owned")
             detailText = " · ".join(detailParts)
-            descSurf = smallFont.render(detailText, True, descColor)
+            descSurf = render_text(smallFont, detailText, textAntialias, descColor)
             screen.blit(descSurf, (rowRect.x + 16, rowRect.y + 36))
 
             status = "Press Enter to purchase" if (available and isSelected) else ("Owned" if ownedTimes else "Available")
-            statusSurf = smallFont.render(status, True, statusColor)
+            statusSurf = render_text(smallFont, status, textAntialias, statusColor)
             screen.blit(statusSurf, (rowRect.right - statusSurf.get_width() - 16, rowRect.y + 38))
 
             listTop += rowHeight
 
         if shopScrollOffset > 0:
-            upIndicator = smallFont.render("▲ more", True, (210, 210, 235))
+            upIndicator = render_text(smallFont, "▲ more", textAntialias, (210, 210, 235))
             screen.blit(upIndicator, (panelRect.centerx - upIndicator.get_width() // 2, panelRect.y + 72))
         if visibleEnd < len(shopItems):
-            downIndicator = smallFont.render("▼ more", True, (210, 210, 235))
+            downIndicator = render_text(smallFont, "▼ more", textAntialias, (210, 210, 235))
             screen.blit(downIndicator, (panelRect.centerx - downIndicator.get_width() // 2, panelRect.bottom - 120))
 
         infoBarRect = pygame.Rect(panelRect.x + 24, panelRect.bottom - 70, panelRect.width - 48, 48)
         pygame.draw.rect(screen, (44, 40, 62), infoBarRect, border_radius=10)
         pygame.draw.rect(screen, (96, 94, 140), infoBarRect, 1, border_radius=10)
-        instructions = smallFont.render("Enter/E to purchase   •   Esc to exit   •   W/S to browse", True, (215, 215, 235))
+        instructions = render_text(smallFont, "Enter/E to purchase   •   Esc to exit   •   W/S to browse", textAntialias, (215, 215, 235))
         screen.blit(instructions, (infoBarRect.x + 12, infoBarRect.y + 8))
-        messageText = smallFont.render(shopMessage, True, (200, 220, 255))
+        messageText = render_text(smallFont, shopMessage, textAntialias, (200, 220, 255))
         screen.blit(messageText, (infoBarRect.x + 12, infoBarRect.y + 24))
 
     elif gameState == GameState.CODEX:
         panelRect = pygame.Rect(130, 110, screenWidth - 260, screenHeight - 220)
         pygame.draw.rect(screen, (20, 22, 36), panelRect)
         pygame.draw.rect(screen, (170, 190, 230), panelRect, 2, border_radius=10)
-        title = titleFont.render("Dimension Codex", True, (235, 240, 255))
+        title = render_text(titleFont, "Dimension Codex", textAntialias, (235, 240, 255))
         screen.blit(title, (panelRect.x + 24, panelRect.y + 24))
-        entries = get_codex_entries()
-        if entries:
+        sort_mode, filter_key = get_codex_view()
+        entry_count = dimensionCodex.count(sort_mode, filter_key)
+        viewText = render_text(
+            smallFont,
+            f"Sort: {CODEX_SORT_MODES[codexSortIndex][1]}  •  Filter: {CODEX_FILTERS[codexFilterIndex][1]}  ({entry_count})",
+            textAntialias,
+            (170, 190, 230),
+        )
+        screen.blit(viewText, (panelRect.right - viewText.get_width() - 24, panelRect.y + 36))
+        if entry_count:
             listTop = panelRect.y + 90
             rowHeight = 86
             visibleStart = codexScrollOffset
-            visibleEnd = min(len(entries), codexScrollOffset + CODEX_VISIBLE_ROWS)
-            for idx in range(visibleStart, visibleEnd):
-                entry = entries[idx]
+            visibleEnd = min(entry_count, codexScrollOffset + CODEX_VISIBLE_ROWS)
+            visibleEntries = dimensionCodex.rows(sort_mode, filter_key, visibleStart, visibleEnd)
+            for idx, entry in enumerate(visibleEntries, start=visibleStart):
                 isSelected = idx == codexSelectionIndex
                 rowRect = pygame.Rect(panelRect.x + 20, listTop, panelRect.width - 40, rowHeight)
                 pygame.draw.rect(screen, (32, 34, 54), rowRect, border_radius=8)
                 if isSelected:
                     pygame.draw.rect(screen, (110, 160, 255), rowRect, 2, border_radius=8)
-                nameSurf = uiFont.render(entry["name"], True, (235, 235, 255))
+                nameSurf = render_text(uiFont, entry["name"], textAntialias, (235, 235, 255))
                 screen.blit(nameSurf, (rowRect.x + 12, rowRect.y + 8))
-                descSurf = smallFont.render(entry["description"], True, (195, 205, 230))
+                descSurf = render_text(smallFont, entry["description"], textAntialias, (195, 205, 230))
                 screen.blit(descSurf, (rowRect.x + 12, rowRect.y + 36))
                 stats = f"Seen {entry['times_seen']}x | Completions {entry['completions']} | Failures {entry['failures']}"
-                statsSurf = smallFont.render(stats, True, (180, 210, 245))
+                statsSurf = render_text(smallFont, stats, textAntialias, (180, 210, 245))
                 screen.blit(statsSurf, (rowRect.x + 12, rowRect.y + 58))
                 extra = f"Best Time {format_time_ms(entry.get('best_time_ms'))} | Best Beacons {entry.get('best_beacons', 0)}"
-                extraSurf = smallFont.render(extra, True, (160, 195, 235))
+                history = runHistory.query("theme_summary", entry["key"])
+                if history and history["p50"] is not None:
+                    extra += f" | Median {format_time_ms(history['p50'])} (p90 {format_time_ms(history['p90'])})"
+                    if history["trend_ms"] is not None:
+                        direction = "faster" if history["trend_ms"] < 0 else "slower"
+                        extra += f" | Last {TREND_WINDOW} {abs(history['trend_ms']) / 1000:.1f}s {direction}"
+                extraSurf = render_text(smallFont, extra, textAntialias, (160, 195, 235))
                 screen.blit(extraSurf, (rowRect.x + 12, rowRect.y + 72))
                 listTop += rowHeight + 12
             if codexScrollOffset > 0:
-                upIndicator = smallFont.render("▲ more", True, (210, 210, 235))
+                upIndicator = render_text(smallFont, "▲ more", textAntialias, (210, 210, 235))
                 screen.blit(upIndicator, (panelRect.centerx - upIndicator.get_width() // 2, panelRect.y + 60))
-            if visibleEnd < len(entries):
-                downIndicator = smallFont.render("▼ more", True, (210, 210, 235))
+            if visibleEnd < entry_count:
+                downIndicator = render_text(smallFont, "▼ more", textAntialias, (210, 210, 235))
                 screen.blit(downIndicator, (panelRect.centerx - downIndicator.get_width() // 2, panelRect.bottom - 90))
         else:
-            message = smallFont.render(codexMessage, True, (210, 220, 240))
+            emptyText = codexMessage if not len(dimensionCodex) else "No logged dimensions match this filter."
+            message = render_text(smallFont, emptyText, textAntialias, (210, 220, 240))
             screen.blit(message, (panelRect.x + 30, panelRect.y + 110))
-        instructions = smallFont.render("W/S to scroll   •   Enter/E or Esc to close", True, (215, 215, 230))
+        instructions = render_text(smallFont, "W/S scroll  •  A/D sort  •  Tab filter  •  Enter/E or Esc to close", textAntialias, (215, 215, 230))
         screen.blit(instructions, (panelRect.x + 24, panelRect.bottom - 40))
 
     elif gameState == GameState.NPC_DIALOG and activeNpc:
@@ -1850,23 +1667,23 @@ while True:
         pygame.draw.rect(screen, (32, 34, 58), panelRect, border_radius=14)
         pygame.draw.rect(screen, (205, 210, 255), panelRect, 2, border_radius=14)
         title_text = f"{activeNpc['name']}  —  {activeNpcIndex + 1}/{max(1, len(activeNpcLines))}"
-        titleSurf = uiFont.render(title_text, True, (235, 235, 255))
+        titleSurf = render_text(uiFont, title_text, textAntialias, (235, 235, 255))
         screen.blit(titleSurf, (panelRect.x + 20, panelRect.y + 16))
         dialog_line = activeNpcLines[activeNpcIndex] if activeNpcLines else "..."
         wrapped = wrap_text(dialog_line, uiFont, panelRect.width - 40)
         if not wrapped:
             wrapped = [dialog_line]
         for idx, text in enumerate(wrapped[:4]):
-            render = uiFont.render(text, True, (215, 225, 255))
+            render = render_text(uiFont, text, textAntialias, (215, 225, 255))
             screen.blit(render, (panelRect.x + 20, panelRect.y + 60 + idx * 28))
-        prompt = smallFont.render("Enter/E to continue   •   Esc to exit", True, (215, 220, 240))
+        prompt = render_text(smallFont, "Enter/E to continue   •   Esc to exit", textAntialias, (215, 220, 240))
         screen.blit(prompt, (panelRect.x + 20, panelRect.bottom - 36))
 
     elif gameState == GameState.WIN:
         panelRect = pygame.Rect(180, 160, screenWidth - 360, screenHeight - 320)
         pygame.draw.rect(screen, (24, 50, 32), panelRect)
         pygame.draw.rect(screen, (90, 200, 120), panelRect, 3)
-        title = titleFont.render("Delivery Complete!", True, (200, 255, 210))
+        title = render_text(titleFont, "Delivery Complete!", textAntialias, (200, 255, 210))
         screen.blit(title, (panelRect.centerx - title.get_width() // 2, panelRect.y + 28))
         lines = [
             f"Contract: {winSummary['contract']}",
@@ -1891,20 +1708,27 @@ while True:
             beacon_line += f"  (+${bonus_cash} / +{bonus_xp} XP)"
         lines.append(beacon_line)
         mission_time = format_time_ms(winSummary.get("time"))
-        lines.append(f"Mission Time: {mission_time}")
+        time_line = f"Mission Time: {mission_time}"
+        if winSummary.get("theme_key") and winSummary.get("time"):
+            rank = runHistory.query("run_rank", winSummary["theme_key"], winSummary["time"], winSummary["recorded_at"])
+            if rank and rank["total"]:
+                time_line += f"  (faster than {rank['slower'] * 100 // rank['total']}% of {rank['total']} clears)"
+        lines.append(time_line)
         lines.append(f"Best Streak: {bestDeliveryStreak}")
         for msg in (winSummary.get("milestones") or [])[:2]:
             lines.append(f"Milestone: {msg}")
-        lines.append("Press Enter/E to return to the office.")
+        if winSummary.get("ghostSaved"):
+            lines.append("Route record! Ghost saved for this seed.")
+        lines.append("Press Enter/E to return to the office, R to rerun this route.")
         for idx, text in enumerate(lines):
-            render = uiFont.render(text, True, (220, 255, 230))
+            render = render_text(uiFont, text, textAntialias, (220, 255, 230))
             screen.blit(render, (panelRect.x + 30, panelRect.y + 110 + idx * 30))
 
     elif gameState == GameState.GAME_OVER:
         panelRect = pygame.Rect(180, 160, screenWidth - 360, screenHeight - 320)
         pygame.draw.rect(screen, (60, 25, 25), panelRect)
         pygame.draw.rect(screen, (200, 80, 80), panelRect, 3)
-        title = titleFont.render("Mission Failed", True, (255, 210, 210))
+        title = render_text(titleFont, "Mission Failed", textAntialias, (255, 210, 210))
         screen.blit(title, (panelRect.centerx - title.get_width() // 2, panelRect.y + 28))
         lines = [
             f"Contract: {gameOverSummary['contract']}",
@@ -1914,9 +1738,22 @@ while True:
         note = gameOverSummary.get("streak_note")
         if note:
             lines.append(note)
-        lines.append("Press Enter/E to return to the office.")
+        lines.append("Press Enter/E to return to the office, R to retry.")
         for idx, text in enumerate(lines):
-            render = uiFont.render(text, True, (255, 220, 220))
+            render = render_text(uiFont, text, textAntialias, (255, 220, 220))
             screen.blit(render, (panelRect.x + 30, panelRect.y + 120 + idx * 32))
 
-    pygame.display.flip()
+    if showPerfOverlay:
+        overlayLines = (
+            f"{clock.get_fps():.0f} fps  frame {qualityGovernor.frame_ms:.1f} ms  work {qualityGovernor.work_ms:.1f} ms  "
+            f"detail {qualityGovernor.settings['name']}  assets {assetLoadMs:.1f} ms",
+            audio.summary() if audio.enabled else "audio off",
+            surfaceRegistry.summary(),
+        )
+        overlayY = screenHeight - 8
+        for line in reversed(overlayLines):
+            overlayText = render_text(smallFont, line, textAntialias, (255, 255, 200))
+            overlayY -= overlayText.get_height() + 2
+            screen.blit(overlayText, (screenWidth - overlayText.get_width() - 10, overlayY))
+
+    presenter.present()
@@ -0,0 +1,114 @@
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+import pygame
+
+from surfaceRegistry import SURFACE_CACHEABLE, SURFACE_MB, surfaceRegistry
+
+# After the warm-up half every cache is at its cap, so the second half must not grow the Python heap by
+# more than this or leave any game-owned surface category bigger than it found it.
+MEMCHECK_HEAP_SLACK = 256 * 1024
+
+
+def build_levels(count):
+    # Builds levels the way the game loop does (theme, backdrop, hazards, platforms, particles, toasts,
+    # HUD text), each one replacing the last, and yields after every level.
+    import content
+    from contracts import build_contract_from_archetype, index_calibration
+    from hazards import HazardField, populate_hazards
+    from particles import ParticleSystem
+    from platforms import PlatformSet, plan_platform_behaviours
+    from themes import level_palette, synthesize_theme
+    from toasts import ToastQueue
+    from worldGen import LEVEL_BOUNDS, build_backdrop, contract_tuning, generate_layout
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    tables = content.load_content(os.path.join(base_dir, "data"), os.path.join(base_dir, ".cache"))
+    calibration = index_calibration(tables["calibration"])
+    font = pygame.font.Font(None, 22)
+    hazards = HazardField()
+    particles = ParticleSystem()
+    toasts = ToastQueue(font)
+    level = None
+    for seed in range(1, count + 1):
+        archetype = tables["archetypes"][seed % len(tables["archetypes"])]
+        contract = build_contract_from_archetype(archetype, seed, tables["themes"], calibration)
+        palette = level_palette(contract.get("theme") or synthesize_theme(seed))
+        layout = generate_layout(contract["seed"], contract_tuning(contract), LEVEL_BOUNDS)
+        backdrop = build_backdrop(contract["seed"], palette, layout["sky_top"], (800, 600), LEVEL_BOUNDS)
+        hazards.set_color(palette["hazard_color"])
+        populate_hazards(hazards, layout, contract.get("hazard_kind"), contract.get("difficulty_raw", 1.0), LEVEL_BOUNDS)
+        platforms = PlatformSet(layout["platforms"], plan_platform_behaviours(layout, contract.get("platform_mix"), LEVEL_BOUNDS))
+        particles.set_palette(palette["hazard_color"], palette["glow"])
+        particles.clear()
+        toasts.push(f"Beacon 1/{len(layout['beacons'])} secured", seed * 100)
+        toasts.expire(seed * 100)
+        title = contract["name"]
+        surfaceRegistry.cached("text", (font, title, True, (255, 255, 255)), font.render, title, True, (255, 255, 255))
+        level = (contract, layout, backdrop, platforms)
+        yield seed
+
+
+def memcheck(levels):
+    # Both measurements are taken with a level alive, so only growth between them counts.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+    warmup = levels // 2
+    # Tracing starts before the warm-up so cache entries evicted later are freed from traced memory.
+    tracemalloc.start()
+    for built in build_levels(levels):
+        if built == warmup:
+            gc.collect()
+            heap_before = tracemalloc.get_traced_memory()[0]
+            surfaces_before = dict(surfaceRegistry.live)
+            objects_before = len(gc.get_objects())
+        elif built == levels:
+            gc.collect()
+            heap_growth = tracemalloc.get_traced_memory()[0] - heap_before
+            tracemalloc.stop()
+            result = {
+                "heap_growth": heap_growth,
+                "surface_growth": {category: size - surfaces_before[category] for category, size in surfaceRegistry.live.items()},
+                "object_growth": len(gc.get_objects()) - objects_before,
+                "garbage": len(gc.garbage),
+            }
+    pygame.quit()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build levels headless and check surface and heap memory stays flat.")
+    # The theme and palette caches hold 256 entries, so the warm-up half needs a few hundred levels to fill them.
+    parser.add_argument("--levels", type=int, default=800)
+    args = parser.parse_args()
+    result = memcheck(args.levels)
+    growth = result["surface_growth"]
+    print(
+        f"memcheck: {args.levels} levels, heap {result['heap_growth'] / 1024:+.1f} KB, "
+        f"{result['object_growth']:+d} gc objects, surfaces {sum(growth.values()) / 1024:+.1f} KB"
+    )
+    print(f"memcheck: {surfaceRegistry.summary()}, peak {surfaceRegistry.peak / SURFACE_MB:.1f} MB")
+    failures = []
+    if result["heap_growth"] > MEMCHECK_HEAP_SLACK:
+        failures.append(f"heap grew {result['heap_growth'] / 1024:.1f} KB")
+    # Caches may keep filling toward their budget; everything else must come back to where it was.
+    grown = [f"{category} +{size / 1024:.1f} KB" for category, size in growth.items() if size > 0 and category not in SURFACE_CACHEABLE]
+    if grown:
+        failures.append("surfaces grew: " + ", ".join(grown))
+    over = [category for category in SURFACE_CACHEABLE if surfaceRegistry.cache_bytes[category] > surfaceRegistry.budgets[category]]
+    if over:
+        failures.append("caches over budget: " + ", ".join(over))
+    if result["garbage"]:
+        failures.append(f"{result['garbage']} uncollectable objects")
+    if failures:
+        print("memcheck: FAILED - " + "; ".join(failures))
+        sys.exit(1)
+    print("memcheck: memory stayed flat")
+
+
+if __name__ == "__main__":
+    main()
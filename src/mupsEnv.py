@@ -0,0 +1,274 @@
+import multiprocessing
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from contracts import build_contract_from_archetype
+from hazards import HAZARD_RESPAWN_GRACE_MS, HazardField, populate_hazards
+from platforms import PLATFORM_VIEW_HALF, PlatformSet, plan_platform_behaviours
+from physics import (
+    ACTION_JUMP,
+    ACTION_LEFT,
+    ACTION_RIGHT,
+    ACTION_SPRINT,
+    COYOTE_TIME_MS,
+    FRAME_MS,
+    new_body_state,
+    spawn_rect,
+    step_body,
+)
+from rng import Rng, derive_seed
+from worldGen import LEVEL_BOUNDS, contract_tuning, generate_layout
+
+OBS_PLATFORMS = 4
+# The nearest hazards within OBS_HAZARD_REACH px of the courier follow the platforms in the observation.
+OBS_HAZARDS = 3
+OBS_HAZARD_REACH = 240
+OBS_HAZARD_START = 10 + OBS_PLATFORMS * 3
+OBS_SIZE = OBS_HAZARD_START + OBS_HAZARDS * 3
+ACTION_COUNT = 16
+MAX_EPISODE_FRAMES = 60 * 90
+COLUMN_WIDTH = 64
+# Columns either side of the courier that can hold a platform it could touch this frame.
+COLUMN_REACH = 1
+PROGRESS_REWARD = 0.01
+BEACON_REWARD = 1.0
+DOOR_REWARD = 10.0
+DEATH_PENALTY = -1.0
+
+
+@lru_cache(maxsize=1)
+def _content():
+    import content
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return content.load_content(os.path.join(base_dir, "data"), os.path.join(base_dir, ".cache"))
+
+
+def contract_for_seed(seed):
+    tables = _content()
+    archetypes = tables["archetypes"]
+    return build_contract_from_archetype(archetypes[Rng(seed).randrange(len(archetypes))], seed, tables["themes"])
+
+
+class MupsEnv:
+    # Wraps GameState.LEVEL: the courier's physics step, beacon pickups, the door, the floor hazard, the
+    # contract's moving hazards and its moving, crumbling and phasing platforms. Rendering is left to the game;
+    # observations are float32 arrays of OBS_SIZE.
+    def __init__(self, bounds=LEVEL_BOUNDS, max_frames=MAX_EPISODE_FRAMES):
+        self.bounds = bounds
+        self.floor_y = bounds["floor_y"]
+        self.max_frames = max_frames
+        self.observation = np.zeros(OBS_SIZE, dtype=np.float32)
+        # One pooled field per env, refilled on every reset like the game's.
+        self.hazards = HazardField()
+        self.contract = None
+
+    def reset(self, seed=0, contract=None):
+        self.contract = contract or contract_for_seed(seed)
+        layout = generate_layout(self.contract["seed"], contract_tuning(self.contract), self.bounds)
+        self.layout = layout
+        self.platforms = layout["platforms"]
+        self.door = layout["door"]
+        self.beacons = [beacon["hit_rect"] for beacon in layout["beacons"]]
+        self.gravity = self.contract["gravity"]
+        self.jump_strength = self.contract["jump"]
+        self.wall_jump = bool(self.contract.get("wall_jump", False))
+        self.lives = self.contract["lives"]
+        self._build_columns()
+        behaviours = plan_platform_behaviours(layout, self.contract.get("platform_mix"), self.bounds)
+        # Levels without dynamic platforms keep the precomputed columns; the others step a PlatformSet like the game.
+        self.platform_set = PlatformSet(self.platforms, behaviours) if behaviours else None
+        populate_hazards(
+            self.hazards, layout, self.contract.get("hazard_kind"), self.contract.get("difficulty_raw", 1.0), self.bounds
+        )
+        self.grace_until = HAZARD_RESPAWN_GRACE_MS
+        self.rect = spawn_rect(layout["start"])
+        self.state = new_body_state()
+        self.frame = 0
+        self.best_x = self.rect.x
+        self.beacons_collected = 0
+        self.deaths = 0
+        return self._observe()
+
+    def _build_columns(self):
+        # Per column: the platforms that can be touched from it (in layout order, which collision
+        # resolution depends on) and the next OBS_PLATFORMS platforms ahead for the observation.
+        column_count = self.bounds["hall_length"] // COLUMN_WIDTH + 2
+        ordered = sorted(self.platforms, key=lambda plat: plat.left)
+        self.solid_columns = []
+        self.ahead_columns = []
+        for column in range(column_count):
+            low = (column - COLUMN_REACH) * COLUMN_WIDTH
+            high = (column + 1 + COLUMN_REACH) * COLUMN_WIDTH
+            self.solid_columns.append([plat for plat in self.platforms if plat.right >= low and plat.left <= high])
+            self.ahead_columns.append([plat for plat in ordered if plat.right > column * COLUMN_WIDTH][: OBS_PLATFORMS + 2])
+
+    def _column(self, x):
+        return min(max(0, x // COLUMN_WIDTH), len(self.solid_columns) - 1)
+
+    def _observe(self):
+        rect = self.rect
+        state = self.state
+        obs = self.observation
+        obs[0] = rect.x / 1000.0
+        obs[1] = rect.y / 1000.0
+        obs[2] = state["vel_x"] / 10.0
+        obs[3] = state["vel_y"] / 10.0
+        obs[4] = state["on_ground"]
+        obs[5] = state["wall_dir"]
+        obs[6] = max(0, COYOTE_TIME_MS - (int(self.frame * FRAME_MS) - state["last_grounded_ms"])) / COYOTE_TIME_MS
+        obs[7] = (self.door.centerx - rect.centerx) / 1000.0
+        obs[8] = (self.door.bottom - rect.bottom) / 1000.0
+        obs[9] = self.lives
+        slot = 10
+        for plat in self.ahead_columns[self._column(rect.x)]:
+            if plat.right <= rect.left:
+                continue
+            obs[slot] = (plat.left - rect.right) / 1000.0
+            obs[slot + 1] = (plat.top - rect.bottom) / 1000.0
+            obs[slot + 2] = plat.width / 1000.0
+            slot += 3
+            if slot >= OBS_HAZARD_START:
+                break
+        obs[slot:OBS_HAZARD_START] = 0.0
+        slot = OBS_HAZARD_START
+        if self.hazards.count:
+            seconds = int(self.frame * FRAME_MS) / 1000.0
+            for dx, dy, radius in self.hazards.closest(rect.centerx, rect.centery, seconds, OBS_HAZARD_REACH, OBS_HAZARDS):
+                obs[slot] = dx / 1000.0
+                obs[slot + 1] = dy / 1000.0
+                obs[slot + 2] = radius / 1000.0
+                slot += 3
+        obs[slot:] = 0.0
+        return obs
+
+    def step(self, action):
+        self.frame += 1
+        now = int(self.frame * FRAME_MS)
+        rect = self.rect
+        if self.platform_set is not None:
+            # main.py hands update() the velocity after this frame's gravity, before the move.
+            solids = self.platform_set.update(
+                now,
+                rect.left - PLATFORM_VIEW_HALF,
+                rect.right + PLATFORM_VIEW_HALF,
+                rect,
+                self.state["vel_y"] + self.gravity,
+            )
+        else:
+            solids = self.solid_columns[self._column(rect.x)]
+        alive = step_body(
+            rect,
+            self.state,
+            solids,
+            self.floor_y,
+            now,
+            action & ACTION_LEFT,
+            action & ACTION_RIGHT,
+            action & ACTION_SPRINT,
+            action & ACTION_JUMP,
+            self.gravity,
+            self.jump_strength,
+            self.wall_jump,
+        )
+        if alive and self.hazards.count and now >= self.grace_until:
+            alive = not self.hazards.touching(rect, now / 1000.0)
+        reward = 0.0
+        done = False
+        if not alive:
+            reward += DEATH_PENALTY
+            self.deaths += 1
+            self.lives -= 1
+            self.grace_until = now + HAZARD_RESPAWN_GRACE_MS
+            self.rect = rect = spawn_rect(self.layout["start"])
+            self.state = new_body_state(now)
+            done = self.lives <= 0
+        else:
+            if rect.x > self.best_x:
+                reward += (rect.x - self.best_x) * PROGRESS_REWARD
+                self.best_x = rect.x
+            if self.beacons:
+                hit = rect.collidelist(self.beacons)
+                if hit >= 0:
+                    self.beacons.pop(hit)
+                    self.beacons_collected += 1
+                    reward += BEACON_REWARD
+            if rect.colliderect(self.door):
+                reward += DOOR_REWARD
+                done = True
+        if self.frame >= self.max_frames:
+            done = True
+        info = {"frame": self.frame, "deaths": self.deaths, "beacons": self.beacons_collected}
+        return self._observe(), reward, done, info
+
+
+def _worker(conn, env_count, bounds, max_frames):
+    envs = [MupsEnv(bounds, max_frames) for _ in range(env_count)]
+    while True:
+        command, payload = conn.recv()
+        if command == "step":
+            observations = np.empty((env_count, OBS_SIZE), dtype=np.float32)
+            rewards = np.empty(env_count)
+            dones = np.empty(env_count, dtype=bool)
+            infos = []
+            for idx, (env, action) in enumerate(zip(envs, payload)):
+                obs, rewards[idx], dones[idx], info = env.step(action)
+                if dones[idx]:
+                    info["final_observation"] = obs.copy()
+                    obs = env.reset(derive_seed(env.contract["seed"], "next"))
+                observations[idx] = obs
+                infos.append(info)
+            conn.send((observations, rewards, dones, infos))
+        elif command == "reset":
+            conn.send(np.stack([env.reset(seed).copy() for env, seed in zip(envs, payload)]))
+        elif command == "close":
+            conn.close()
+            return
+
+
+class SubprocVecEnv:
+    # count MupsEnvs spread over worker processes. Each worker steps its whole slice per message so the
+    # pipe round trip is paid once per worker, not once per env. Finished episodes reset onto a seed derived from the last one.
+    def __init__(self, count, workers=None, bounds=LEVEL_BOUNDS, max_frames=MAX_EPISODE_FRAMES):
+        workers = max(1, min(count, workers or os.cpu_count() or 1))
+        context = multiprocessing.get_context("spawn")
+        self.count = count
+        self.slices = []
+        self.conns = []
+        self.processes = []
+        start = 0
+        for worker in range(workers):
+            size = count // workers + (1 if worker < count % workers else 0)
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, size, bounds, max_frames), daemon=True)
+            process.start()
+            child.close()
+            self.slices.append(slice(start, start + size))
+            self.conns.append(parent)
+            self.processes.append(process)
+            start += size
+
+    def reset(self, seeds):
+        seeds = list(seeds)
+        for conn, part in zip(self.conns, self.slices):
+            conn.send(("reset", seeds[part]))
+        return np.concatenate([conn.recv() for conn in self.conns])
+
+    def step(self, actions):
+        actions = [int(action) for action in actions]
+        for conn, part in zip(self.conns, self.slices):
+            conn.send(("step", actions[part]))
+        results = [conn.recv() for conn in self.conns]
+        observations = np.concatenate([result[0] for result in results])
+        rewards = np.concatenate([result[1] for result in results])
+        dones = np.concatenate([result[2] for result in results])
+        infos = [info for result in results for info in result[3]]
+        return observations, rewards, dones, infos
+
+    def close(self):
+        for conn in self.conns:
+            conn.send(("close", None))
+        for process in self.processes:
+            process.join(timeout=5)
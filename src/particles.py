@@ -0,0 +1,173 @@
+from itertools import repeat
+
+import numpy as np
+import pygame
+
+from surfaceRegistry import surfaceRegistry
+
+# Bursts are a few dozen particles; the cap only bounds the blit cost when many overlap.
+PARTICLE_CAP = 1024
+PARTICLE_RADII = (2, 3, 5, 8)
+PARTICLE_FADE_STEPS = 4
+PARTICLE_CELL = PARTICLE_RADII[-1] * 2 + 2
+# Tint slots in the atlas; set_palette fills them per level.
+SLOT_HAZARD = 0
+SLOT_GLOW = 1
+SLOT_BEACON = 2
+SLOT_DUST = 3
+PARTICLE_SLOTS = 4
+BEACON_COLOR = (255, 240, 160)
+# Spawning scales down once the smoothed frame time passes the first value and stops at the second.
+PARTICLE_THROTTLE_MS = (17.5, 25.0)
+AMBIENT_EMBERS_PER_SECOND = 36
+
+
+def build_atlas(colors):
+    # One SRCALPHA sheet: a row per tint slot, a column per (radius, fade step).
+    columns = len(PARTICLE_RADII) * PARTICLE_FADE_STEPS
+    atlas = pygame.Surface((columns * PARTICLE_CELL, len(colors) * PARTICLE_CELL), pygame.SRCALPHA)
+    half = PARTICLE_CELL // 2
+    for row, color in enumerate(colors):
+        for size, radius in enumerate(PARTICLE_RADII):
+            for fade in range(PARTICLE_FADE_STEPS):
+                alpha = int(255 * (PARTICLE_FADE_STEPS - fade) / PARTICLE_FADE_STEPS)
+                column = size * PARTICLE_FADE_STEPS + fade
+                center = (column * PARTICLE_CELL + half, row * PARTICLE_CELL + half)
+                pygame.draw.circle(atlas, (*color, alpha // 3), center, radius + 1)
+                pygame.draw.circle(atlas, (*color, alpha), center, radius)
+    areas = [
+        pygame.Rect(column * PARTICLE_CELL, row * PARTICLE_CELL, PARTICLE_CELL, PARTICLE_CELL)
+        for row in range(len(colors))
+        for column in range(columns)
+    ]
+    return surfaceRegistry.track(atlas, "particles"), areas
+
+
+class ParticleSystem:
+    # Fixed-size ring buffer of particles: spawning overwrites the oldest slot once the cap is reached,
+    # integration is one NumPy pass over the buffer and drawing is one blits() call against the atlas.
+    def __init__(self, capacity=PARTICLE_CAP, seed=0):
+        self.capacity = capacity
+        # The ring wraps at limit, which set_limit can lower below capacity without reallocating.
+        self.limit = capacity
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.gravity = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.sprite = np.zeros(capacity, dtype=np.int32)
+        self.scratch = np.zeros(capacity, dtype=np.float32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.head = 0
+        self.frame_ms = 1000 / 60
+        self.ember_debt = 0.0
+        self.rng = np.random.default_rng(seed)
+        self.set_palette((255, 90, 90), (255, 180, 120))
+
+    def set_palette(self, hazard_color, glow_color):
+        colors = [None] * PARTICLE_SLOTS
+        colors[SLOT_HAZARD] = tuple(hazard_color)
+        colors[SLOT_GLOW] = tuple(glow_color)
+        colors[SLOT_BEACON] = BEACON_COLOR
+        colors[SLOT_DUST] = tuple(min(255, (a + b) // 2 + 40) for a, b in zip(hazard_color, (200, 200, 210)))
+        self.atlas, self.areas = build_atlas(colors)
+
+    def clear(self):
+        self.life[:] = 0.0
+
+    def set_limit(self, limit):
+        self.limit = max(1, min(self.capacity, int(limit)))
+        self.life[self.limit :] = 0.0
+        self.head %= self.limit
+
+    def note_frame(self, frame_ms):
+        self.frame_ms += (frame_ms - self.frame_ms) * 0.1
+
+    def allowance(self, count):
+        low, high = PARTICLE_THROTTLE_MS
+        if self.frame_ms <= low:
+            return count
+        return int(count * max(0.0, (high - self.frame_ms) / (high - low)))
+
+    def emit(self, x, y, count, slot, size, speed, spread, life, gravity=0.0, angle=-np.pi / 2, jitter_x=0.0):
+        count = min(self.allowance(count), self.limit)
+        if count <= 0:
+            return 0
+        slots = (self.head + np.arange(count)) % self.limit
+        self.head = (self.head + count) % self.limit
+        rng = self.rng
+        theta = angle + rng.uniform(-spread, spread, count)
+        velocity = speed * rng.uniform(0.4, 1.0, count)
+        self.x[slots] = x + rng.uniform(-jitter_x, jitter_x, count) if jitter_x else x
+        self.y[slots] = y
+        self.vx[slots] = np.cos(theta) * velocity
+        self.vy[slots] = np.sin(theta) * velocity
+        self.gravity[slots] = gravity
+        lifetimes = life * rng.uniform(0.6, 1.0, count)
+        self.life[slots] = lifetimes
+        self.max_life[slots] = lifetimes
+        self.sprite[slots] = (slot * len(PARTICLE_RADII) + size) * PARTICLE_FADE_STEPS
+        return count
+
+    def beacon_burst(self, x, y):
+        self.emit(x, y, 28, SLOT_BEACON, 1, 180.0, np.pi, 0.7, gravity=120.0)
+        self.emit(x, y, 12, SLOT_GLOW, 2, 90.0, np.pi, 0.9)
+
+    def landing_dust(self, x, y, impact):
+        count = int(min(18, 4 + impact * 1.5))
+        self.emit(x, y, count // 2, SLOT_DUST, 0, 70.0 + impact * 6, 0.5, 0.45, gravity=160.0, angle=-np.pi * 0.9)
+        self.emit(x, y, count - count // 2, SLOT_DUST, 0, 70.0 + impact * 6, 0.5, 0.45, gravity=160.0, angle=-np.pi * 0.1)
+
+    def ambient_embers(self, dt_ms, left, right, floor_y):
+        # Embers rise off the hazard floor across the visible span; skipped first when the frame is over budget.
+        self.ember_debt += AMBIENT_EMBERS_PER_SECOND * dt_ms / 1000
+        count = int(self.ember_debt)
+        self.ember_debt -= count
+        if count and self.frame_ms <= PARTICLE_THROTTLE_MS[0]:
+            centre = (left + right) / 2
+            self.emit(centre, floor_y, count, SLOT_HAZARD, 1, 40.0, 0.35, 1.6, gravity=-20.0, jitter_x=(right - left) / 2)
+
+    def update(self, dt_ms):
+        # Dead slots are integrated along with the live ones: whole-buffer ops can run in place, where a
+        # mask would copy every array, and emit() resets a slot before it is drawn again.
+        dt = dt_ms / 1000
+        scratch = self.scratch
+        np.multiply(self.gravity, dt, out=scratch)
+        self.vy += scratch
+        np.multiply(self.vx, dt, out=scratch)
+        self.x += scratch
+        np.multiply(self.vy, dt, out=scratch)
+        self.y += scratch
+        self.life -= dt
+
+    def draw(self, surface, camera_x):
+        # Temporaries are sized by the live particles, not the buffer, and updated in place where possible.
+        alive = np.flatnonzero(np.greater(self.life, 0, out=self.alive))
+        if not len(alive):
+            return 0
+        half = PARTICLE_CELL // 2
+        x = self.x[alive]
+        x -= camera_x + half
+        y = self.y[alive]
+        y -= half
+        shown = x > -PARTICLE_CELL
+        shown &= x < surface.get_width()
+        shown &= y > -PARTICLE_CELL
+        shown &= y < surface.get_height()
+        alive = alive[shown]
+        fade = self.life[alive]
+        fade /= self.max_life[alive]
+        np.subtract(1.0, fade, out=fade)
+        fade *= PARTICLE_FADE_STEPS
+        sprites = fade.astype(np.int32)
+        np.minimum(sprites, PARTICLE_FADE_STEPS - 1, out=sprites)
+        sprites += self.sprite[alive]
+        # Built from zip/map/repeat so the blit sequence is assembled in C, and consumed lazily so only one
+        # entry is alive at a time.
+        surface.blits(
+            zip(repeat(self.atlas), zip(x[shown].astype(np.int32), y[shown].astype(np.int32)), map(self.areas.__getitem__, sprites)),
+            doreturn=False,
+        )
+        return len(sprites)
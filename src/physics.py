@@ -0,0 +1,141 @@
+import pygame
+
+# Shared by the game loop, the autopilot and the batch simulators; keep them in step with each other.
+PLAYER_SIZE = (30, 30)
+PLAYER_SPEED = 5
+PLAYER_SPRINT_MULTIPLIER = 1.7
+JUMP_BUFFER_MS = 140
+COYOTE_TIME_MS = 120
+WALL_JUMP_COOLDOWN_MS = 220
+WALL_JUMP_PUSH = 6
+NO_PRESS_MS = -10_000
+FRAME_MS = 1000 / 60
+# Input bitmask used by the bots and simulators in place of the keyboard.
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_SPRINT = 4
+ACTION_JUMP = 8
+
+
+def input_velocity(left, right, sprint, speed=PLAYER_SPEED):
+    move_speed = speed * (PLAYER_SPRINT_MULTIPLIER if sprint else 1)
+    if left and not right:
+        return -move_speed
+    if right and not left:
+        return move_speed
+    return 0
+
+
+def move_horizontal(rect, vel_x, solids):
+    # Returns the wall contact direction: 1 for a wall on the right, -1 on the left.
+    rect.x += int(vel_x)
+    if not solids:
+        return 0
+    wall_dir = 0
+    collided = False
+    if vel_x != 0:
+        for solid in solids:
+            if rect.colliderect(solid):
+                if vel_x > 0:
+                    rect.right = solid.left
+                    wall_dir = 1
+                    collided = True
+                elif vel_x < 0:
+                    rect.left = solid.right
+                    wall_dir = -1
+                    collided = True
+    if collided:
+        return wall_dir
+    for solid in solids:
+        if solid.top < rect.bottom and solid.bottom > rect.top:
+            if rect.right == solid.left:
+                return 1
+            if rect.left == solid.right:
+                return -1
+    return 0
+
+
+def move_vertical(rect, vel_y, solids):
+    rect.y += int(vel_y)
+    grounded = False
+    for solid in solids:
+        if rect.colliderect(solid):
+            if vel_y > 0:
+                rect.bottom = solid.top
+                vel_y = 0
+                grounded = True
+            elif vel_y < 0:
+                rect.top = solid.bottom
+                vel_y = 0
+    return vel_y, grounded
+
+
+def _push_off_wall(rect, push, solids):
+    rect.x += push
+    for solid in solids:
+        if rect.colliderect(solid):
+            if push > 0:
+                rect.right = solid.left
+            else:
+                rect.left = solid.right
+
+
+def resolve_jump(rect, solids, now, jump_pressed, jump_strength, wall_jump, state):
+    # state holds vel_y, on_ground, wall_dir and the jump/grounded/wall-jump timestamps.
+    wants_jump = jump_pressed or (now - state["last_jump_press_ms"]) <= JUMP_BUFFER_MS
+    if not wants_jump:
+        return state
+    has_coyote = (now - state["last_grounded_ms"]) <= COYOTE_TIME_MS
+    if (
+        wall_jump
+        and state["wall_dir"] != 0
+        and not state["on_ground"]
+        and (now - state["last_wall_jump_ms"]) >= WALL_JUMP_COOLDOWN_MS
+    ):
+        state["vel_y"] = -jump_strength
+        state["last_wall_jump_ms"] = now
+        state["on_ground"] = False
+        state["last_jump_press_ms"] = NO_PRESS_MS
+        _push_off_wall(rect, -state["wall_dir"] * WALL_JUMP_PUSH, solids)
+        state["wall_dir"] = 0
+        state["last_grounded_ms"] = now - COYOTE_TIME_MS - 5
+    elif state["on_ground"] or has_coyote:
+        state["vel_y"] = -jump_strength
+        state["on_ground"] = False
+        state["last_jump_press_ms"] = NO_PRESS_MS
+    return state
+
+
+def new_body_state(now=0):
+    return {
+        "vel_x": 0.0,
+        "vel_y": 0.0,
+        "on_ground": True,
+        "wall_dir": 0,
+        "last_grounded_ms": now,
+        "last_jump_press_ms": NO_PRESS_MS,
+        "last_wall_jump_ms": NO_PRESS_MS,
+    }
+
+
+def step_body(rect, state, solids, floor_y, now, left, right, sprint, jump_pressed, gravity, jump_strength, wall_jump):
+    # One LEVEL frame of the main loop. Returns False when the courier touched the floor hazard.
+    if jump_pressed:
+        state["last_jump_press_ms"] = now
+    state["vel_x"] = input_velocity(left, right, sprint)
+    state["vel_y"] += gravity
+    state["wall_dir"] = move_horizontal(rect, state["vel_x"], solids)
+    state["vel_y"], grounded = move_vertical(rect, state["vel_y"], solids)
+    if rect.bottom >= floor_y:
+        return False
+    if grounded:
+        state["last_grounded_ms"] = now
+    state["on_ground"] = grounded
+    resolve_jump(rect, solids, now, jump_pressed, jump_strength, wall_jump, state)
+    return True
+
+
+def spawn_rect(start_platform):
+    rect = pygame.Rect((0, 0), PLAYER_SIZE)
+    rect.midbottom = (start_platform.centerx, start_platform.top)
+    return rect
@@ -0,0 +1,256 @@
+import bisect
+import math
+
+import pygame
+
+from rng import Rng
+
+PLATFORM_KINDS = ("moving", "crumbling", "phasing")
+PLATFORM_CELL = 128
+# Moving platforms further than this outside the view are left where they were; they are snapped
+# to the current time when they come back in range, since their motion is closed-form.
+PLATFORM_WAKE_MARGIN = 160
+# Headless runs have no camera: they advance the platforms within this many px either side of the courier.
+PLATFORM_VIEW_HALF = 480
+MOVE_PERIOD_MS = (2600, 4600)
+MOVE_MAX_AMP_X = 60
+MOVE_MAX_AMP_Y = 36
+MOVE_NEIGHBOUR_CLEARANCE = 24
+CRUMBLE_DELAY_MS = 450
+CRUMBLE_RESPAWN_MS = 2200
+PHASE_PERIOD_MS = (2600, 3400)
+PHASE_SOLID_FRACTION = 0.6
+
+
+def _cell_span(rect):
+    return rect.left // PLATFORM_CELL, (rect.right - 1) // PLATFORM_CELL
+
+
+def plan_platform_behaviours(layout, mix, bounds):
+    # mix: kind -> fraction of the interior platforms (never the start or end pad) that get that behaviour.
+    platforms = layout["platforms"]
+    interior = list(range(1, len(platforms) - 1))
+    if not mix or not interior:
+        return {}
+    rng = Rng(layout["seed"]).stream("platforms")
+    rng.shuffle(interior)
+    # Beacons hover at fixed points, so the pads holding them never move.
+    carriers = {
+        idx
+        for idx in interior
+        for beacon in layout.get("beacons", ())
+        if platforms[idx].left <= beacon["rect"].centerx <= platforms[idx].right
+        and 0 <= platforms[idx].top - beacon["rect"].bottom <= 20
+    }
+    behaviours = {}
+    for kind in PLATFORM_KINDS:
+        count = int(round(len(interior) * float(mix.get(kind, 0.0))))
+        pool = [idx for idx in interior if kind != "moving" or idx not in carriers][:count]
+        for idx in pool:
+            behaviours[idx] = _roll_behaviour(kind, idx, platforms, rng, layout["sky_top"], bounds)
+        interior = [idx for idx in interior if idx not in behaviours]
+    return behaviours
+
+
+def _roll_behaviour(kind, idx, platforms, rng, sky_top, bounds):
+    if kind == "moving":
+        plat = platforms[idx]
+        # Half of each gap, so two neighbouring shuttles can never swing into each other.
+        left_room = (plat.left - platforms[idx - 1].right - MOVE_NEIGHBOUR_CLEARANCE) // 2
+        right_room = (platforms[idx + 1].left - plat.right - MOVE_NEIGHBOUR_CLEARANCE) // 2
+        room_x = min(MOVE_MAX_AMP_X, left_room, right_room)
+        horizontal = room_x >= 16 and rng.random() < 0.6
+        if horizontal:
+            amp_x, amp_y = room_x, 0
+        else:
+            ceiling = max(sky_top + bounds["min_ceil_room"], 100)
+            floor = bounds["floor_y"] - bounds["min_floor_room"]
+            amp_x, amp_y = 0, max(0, min(MOVE_MAX_AMP_Y, plat.top - ceiling, floor - plat.top))
+        return {
+            "kind": kind,
+            "amp_x": amp_x,
+            "amp_y": amp_y,
+            "omega": math.tau / rng.uniform(*MOVE_PERIOD_MS),
+            "phase": rng.uniform(0, math.tau),
+        }
+    if kind == "phasing":
+        period = rng.randint(*PHASE_PERIOD_MS)
+        return {"kind": kind, "period": period, "solid_ms": int(period * PHASE_SOLID_FRACTION), "offset": rng.randrange(period)}
+    return {"kind": kind}
+
+
+class PlatformSet:
+    # The level's platform rects plus their behaviours. Collision candidates come from a column grid;
+    # static platforms are bucketed once and moving ones only change buckets when they cross a cell edge.
+    def __init__(self, platforms, behaviours):
+        self.rects = platforms
+        self.behaviours = behaviours
+        self.cells = {}
+        # (first cell, last cell) -> the merged candidates across them, dropped whenever a bucket changes.
+        self.merged = {}
+        self.spans = []
+        for idx, rect in enumerate(platforms):
+            span = _cell_span(rect)
+            self.spans.append(span)
+            self._bucket(idx, span, add=True)
+        self.base = {idx: platforms[idx].topleft for idx in behaviours}
+        moving = sorted((platforms[idx].centerx, idx) for idx, spec in behaviours.items() if spec["kind"] == "moving")
+        self.moving_x = [x for x, _ in moving]
+        self.moving = [idx for _, idx in moving]
+        self.max_amp_x = max((behaviours[idx]["amp_x"] for idx in self.moving), default=0)
+        self.crumble_at = {}
+        self.respawn_at = {}
+        self.riding = None
+        # Per-frame scratch: solids_near() hands back this list, and candidates() hands back bucket lists,
+        # so callers use them before the next call rather than keeping or editing them.
+        self.solids = []
+        self.draw_rect = pygame.Rect(0, 0, 0, 0)
+        self.accent = (None, None)
+
+    def _bucket(self, idx, span, add):
+        self.merged.clear()
+        for cell in range(span[0], span[1] + 1):
+            bucket = self.cells.setdefault(cell, [])
+            if add:
+                bisect.insort(bucket, idx)
+            else:
+                bucket.remove(idx)
+
+    def _move(self, idx, x, y):
+        rect = self.rects[idx]
+        rect.topleft = (x, y)
+        span = _cell_span(rect)
+        if span != self.spans[idx]:
+            self._bucket(idx, self.spans[idx], add=False)
+            self._bucket(idx, span, add=True)
+            self.spans[idx] = span
+
+    def candidates(self, left, right):
+        first, last = left // PLATFORM_CELL, (right - 1) // PLATFORM_CELL
+        if first == last:
+            return self.cells.get(first, ())
+        found = self.merged.get((first, last))
+        if found is None:
+            found = []
+            for cell in range(first, last + 1):
+                for idx in self.cells.get(cell, ()):
+                    # Wide platforms sit in several cells; the lists are a handful long, so a scan beats a set.
+                    if idx not in found:
+                        found.append(idx)
+            found.sort()
+            self.merged[(first, last)] = found
+        return found
+
+    def is_solid(self, idx, now):
+        spec = self.behaviours.get(idx)
+        if spec is None:
+            return True
+        if spec["kind"] == "phasing":
+            return (now + spec["offset"]) % spec["period"] < spec["solid_ms"]
+        if spec["kind"] == "crumbling":
+            crumble_at = self.crumble_at.get(idx)
+            if crumble_at is None or now < crumble_at:
+                return True
+            if now >= self.respawn_at[idx]:
+                del self.crumble_at[idx], self.respawn_at[idx]
+                return True
+            return False
+        return True
+
+    def solid_until(self, idx, now):
+        # When the platform next stops being solid (now if it isn't, inf if it never will), without touching
+        # crumble bookkeeping; a pad nobody has stood on yet stays solid, since only a rider starts its timer.
+        spec = self.behaviours.get(idx)
+        if spec is None or spec["kind"] == "moving":
+            return math.inf
+        if spec["kind"] == "phasing":
+            into = (now + spec["offset"]) % spec["period"]
+            return now + spec["solid_ms"] - into if into < spec["solid_ms"] else now
+        crumble_at = self.crumble_at.get(idx)
+        if crumble_at is None or now >= self.respawn_at[idx]:
+            return math.inf
+        return crumble_at if now < crumble_at else now
+
+    def standing_on(self, rect, now):
+        for idx in self.candidates(rect.left, rect.right):
+            plat = self.rects[idx]
+            if rect.bottom == plat.top and rect.right > plat.left and rect.left < plat.right:
+                if idx not in self.behaviours or self.is_solid(idx, now):
+                    return idx
+        return None
+
+    def update(self, now, view_left, view_right, player, vel_y):
+        # Advances the platforms near the view, carries the rider and returns the solids around the player.
+        # Riding is geometric rather than on_ground, which flickers while sub-pixel gravity builds up.
+        self.riding = self.standing_on(player, now) if vel_y >= 0 else None
+        if self.moving:
+            low = bisect.bisect_left(self.moving_x, view_left - self.max_amp_x - PLATFORM_WAKE_MARGIN)
+            high = bisect.bisect_right(self.moving_x, view_right + self.max_amp_x + PLATFORM_WAKE_MARGIN)
+            for slot in range(low, high):
+                idx = self.moving[slot]
+                spec = self.behaviours[idx]
+                base_x, base_y = self.base[idx]
+                swing = math.sin(spec["omega"] * now + spec["phase"])
+                rect = self.rects[idx]
+                dx = base_x + int(round(spec["amp_x"] * swing)) - rect.x
+                dy = base_y + int(round(spec["amp_y"] * swing)) - rect.y
+                if not dx and not dy:
+                    continue
+                self._move(idx, rect.x + dx, rect.y + dy)
+                if idx == self.riding:
+                    player.x += dx
+                    player.bottom = rect.top
+                elif rect.colliderect(player):
+                    # Shove rather than swallow: push the courier out along the platform's motion.
+                    if dx > 0:
+                        player.left = rect.right
+                    elif dx < 0:
+                        player.right = rect.left
+                    elif dy < 0:
+                        player.bottom = rect.top
+                    else:
+                        player.top = rect.bottom
+        if self.riding is not None and self.behaviours.get(self.riding, {}).get("kind") == "crumbling":
+            if self.riding not in self.crumble_at:
+                self.crumble_at[self.riding] = now + CRUMBLE_DELAY_MS
+                self.respawn_at[self.riding] = now + CRUMBLE_DELAY_MS + CRUMBLE_RESPAWN_MS
+        return self.solids_near(player, now)
+
+    def solids_near(self, rect, now, reach=32):
+        solids = self.solids
+        solids.clear()
+        for idx in self.candidates(rect.left - reach, rect.right + reach):
+            plat = self.rects[idx]
+            spec = self.behaviours.get(idx)
+            if spec is not None:
+                if not self.is_solid(idx, now):
+                    continue
+                # Platforms that phase or respawn back in around the courier stay open until it leaves.
+                if spec["kind"] != "moving" and plat.colliderect(rect):
+                    continue
+            solids.append(plat)
+        return solids
+
+    def draw(self, surface, camera_x, color, now):
+        width = surface.get_width()
+        draw_rect = self.draw_rect
+        if self.accent[0] != color:
+            self.accent = (color, tuple(min(255, channel + 60) for channel in color))
+        accent = self.accent[1]
+        for idx in self.candidates(camera_x, camera_x + width):
+            plat = self.rects[idx]
+            draw_rect.update(plat.x - camera_x, plat.y, plat.width, plat.height)
+            spec = self.behaviours.get(idx)
+            if spec is None:
+                pygame.draw.rect(surface, color, draw_rect)
+                continue
+            kind = spec["kind"]
+            if not self.is_solid(idx, now):
+                pygame.draw.rect(surface, color, draw_rect, 1)
+            elif kind == "crumbling" and idx in self.crumble_at:
+                draw_rect.x += (now // 40) % 3 - 1
+                pygame.draw.rect(surface, color, draw_rect)
+            else:
+                pygame.draw.rect(surface, color, draw_rect)
+                draw_rect.height = 3
+                pygame.draw.rect(surface, accent, draw_rect)
@@ -0,0 +1,93 @@
+
+import pygame
+
+from surfaceRegistry import surfaceRegistry
+
+# "scaled" hands the logical canvas to SDL's renderer (pygame.SCALED), which stretches it on the GPU;
+# "window" keeps a software canvas and does one transform.scale into a resizable window per frame.
+PRESENT_MODES = ("scaled", "window")
+PRESENT_BAR_COLOR = (0, 0, 0)
+
+
+def fit_rect(canvas_size, window_size):
+    # Largest aspect-preserving rect for the canvas, centred in the window; a whole multiple wins when it
+    # gives up less than a tenth of the size, since it keeps pixel art crisp.
+    canvas_w, canvas_h = canvas_size
+    window_w, window_h = window_size
+    scale = min(window_w / canvas_w, window_h / canvas_h)
+    whole = int(scale)
+    if whole >= 1 and whole >= scale * 0.9:
+        scale = whole
+    width = max(1, int(canvas_w * scale))
+    height = max(1, int(canvas_h * scale))
+    return pygame.Rect((window_w - width) // 2, (window_h - height) // 2, width, height)
+
+
+class Presenter:
+    # The game always draws into self.canvas at the logical size; only present() knows about the window.
+    def __init__(self, size, mode="scaled", fullscreen=False, window_size=None):
+        self.size = tuple(size)
+        self.mode = mode if mode in PRESENT_MODES else PRESENT_MODES[0]
+        self.fullscreen = fullscreen
+        self.window_size = tuple(window_size or size)
+        self.canvas = None
+        self.window = None
+        self.open()
+
+    def open(self):
+        if self.mode == "scaled":
+            flags = pygame.SCALED | (pygame.FULLSCREEN if self.fullscreen else pygame.RESIZABLE)
+            # SDL picks the window's starting multiple of the canvas here, so window_size only shapes "window".
+            self.window = self.canvas = pygame.display.set_mode(self.size, flags)
+            return self.canvas
+        if self.fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.window = pygame.display.set_mode(self.window_size, pygame.RESIZABLE)
+        if self.canvas is None or self.canvas is self.window:
+            self.canvas = surfaceRegistry.track(pygame.Surface(self.size).convert(), "canvas")
+        self._layout()
+        return self.canvas
+
+    def _layout(self):
+        window_rect = self.window.get_rect()
+        self.target = fit_rect(self.size, window_rect.size)
+        self.scaled = None
+        if self.target.size != self.size:
+            self.scaled = surfaceRegistry.track(pygame.Surface(self.target.size).convert(), "canvas")
+        # Letterbox bars are refilled each present; they are thin strips, never the whole window.
+        self.bars = [
+            rect
+            for rect in (
+                pygame.Rect(0, 0, window_rect.width, self.target.top),
+                pygame.Rect(0, self.target.bottom, window_rect.width, window_rect.height - self.target.bottom),
+                pygame.Rect(0, self.target.top, self.target.left, self.target.height),
+                pygame.Rect(self.target.right, self.target.top, window_rect.width - self.target.right, self.target.height),
+            )
+            if rect.width > 0 and rect.height > 0
+        ]
+
+    def resized(self, size):
+        if self.mode == "window" and not self.fullscreen:
+            self.window_size = size
+            self.window = pygame.display.get_surface()
+            self._layout()
+
+    def toggle_fullscreen(self):
+        self.fullscreen = not self.fullscreen
+        if self.mode == "scaled":
+            pygame.display.toggle_fullscreen()
+            return self.canvas
+        return self.open()
+
+    def present(self):
+        if self.mode == "window":
+            window = self.window
+            for bar in self.bars:
+                window.fill(PRESENT_BAR_COLOR, bar)
+            if self.scaled is None:
+                window.blit(self.canvas, self.target)
+            else:
+                pygame.transform.scale(self.canvas, self.target.size, self.scaled)
+                window.blit(self.scaled, self.target)
+        pygame.display.flip()
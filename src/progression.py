@@ -0,0 +1,46 @@
+from bisect import bisect_right
+
+
+class ProgressionTracker:
+    def __init__(self, ranks, milestones):
+        self.ranks = sorted(ranks, key=lambda rank: rank["deliveries"])
+        self.rank_thresholds = [rank["deliveries"] for rank in self.ranks]
+        self.milestones = sorted(milestones, key=lambda milestone: milestone["deliveries"])
+        self.milestone_thresholds = [milestone["deliveries"] for milestone in self.milestones]
+        self.next_milestone_index = 0
+        self._status_deliveries = None
+        self._status = None
+
+    def rank_for(self, deliveries):
+        idx = bisect_right(self.rank_thresholds, deliveries) - 1
+        current = self.ranks[max(0, idx)]
+        next_rank = self.ranks[idx + 1] if idx + 1 < len(self.ranks) else None
+        return current, next_rank
+
+    def status(self, deliveries):
+        # Rank lookups happen every frame; only recompute when the delivery count moves.
+        if deliveries != self._status_deliveries:
+            current, next_rank = self.rank_for(deliveries)
+            self._status = {
+                "rank": current,
+                "next_rank": next_rank,
+                "next_delta": max(0, next_rank["deliveries"] - deliveries) if next_rank else 0,
+            }
+            self._status_deliveries = deliveries
+        return self._status
+
+    def next_milestone(self):
+        if self.next_milestone_index < len(self.milestones):
+            return self.milestones[self.next_milestone_index]
+        return None
+
+    def advance(self, deliveries):
+        start = self.next_milestone_index
+        end = bisect_right(self.milestone_thresholds, deliveries, lo=start)
+        self.next_milestone_index = end
+        return self.milestones[start:end]
+
+    def reset(self):
+        self.next_milestone_index = 0
+        self._status_deliveries = None
+        self._status = None
@@ -0,0 +1,74 @@
+from particles import PARTICLE_CAP
+from worldGen import BACKDROP_ACCENT_COUNT
+
+FRAME_BUDGET_MS = 1000 / 60
+# Lowest to highest; the governor starts at the top and only steps one tier at a time.
+QUALITY_TIERS = (
+    {"name": "low", "orb_fraction": 0.35, "accents": 3, "particle_cap": PARTICLE_CAP // 4, "text_aa": False, "glow": False, "beacon_rings": False},
+    {"name": "medium", "orb_fraction": 0.65, "accents": 6, "particle_cap": PARTICLE_CAP // 2, "text_aa": True, "glow": True, "beacon_rings": False},
+    {"name": "high", "orb_fraction": 1.0, "accents": BACKDROP_ACCENT_COUNT, "particle_cap": PARTICLE_CAP, "text_aa": True, "glow": True, "beacon_rings": True},
+)
+QUALITY_WINDOW = 30
+# Step down once the rolling frame time is this far over budget; step up only when the frame's
+# own work (excluding the tick's sleep) leaves this much of the budget free.
+QUALITY_DOWN_RATIO = 1.1
+QUALITY_UP_RATIO = 0.6
+# Frames a condition must hold before acting, and frames to sit still after any change, so a
+# single hitch or a tier that lands right at the edge doesn't flip back and forth.
+QUALITY_DOWN_HOLD = 20
+QUALITY_UP_HOLD = 180
+QUALITY_COOLDOWN = 120
+
+
+class QualityGovernor:
+    # Fed clock.get_time() (full frame, tick sleep included) to spot missed budgets and
+    # clock.get_rawtime() (work only) to spot headroom, each averaged over a ring of recent frames.
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, tier=len(QUALITY_TIERS) - 1):
+        self.budget_ms = budget_ms
+        self.tier = tier
+        self.frame_times = [budget_ms] * QUALITY_WINDOW
+        self.work_times = [budget_ms] * QUALITY_WINDOW
+        self.cursor = 0
+        self.frame_total = budget_ms * QUALITY_WINDOW
+        self.work_total = budget_ms * QUALITY_WINDOW
+        self.over = 0
+        self.under = 0
+        self.cooldown = QUALITY_COOLDOWN
+
+    @property
+    def settings(self):
+        return QUALITY_TIERS[self.tier]
+
+    @property
+    def frame_ms(self):
+        return self.frame_total / QUALITY_WINDOW
+
+    @property
+    def work_ms(self):
+        return self.work_total / QUALITY_WINDOW
+
+    def note(self, frame_ms, work_ms):
+        # Returns True when the tier changed this frame.
+        slot = self.cursor
+        self.frame_total += frame_ms - self.frame_times[slot]
+        self.work_total += work_ms - self.work_times[slot]
+        self.frame_times[slot] = frame_ms
+        self.work_times[slot] = work_ms
+        self.cursor = (slot + 1) % QUALITY_WINDOW
+        if self.cooldown:
+            self.cooldown -= 1
+            return False
+        self.over = self.over + 1 if self.frame_ms > self.budget_ms * QUALITY_DOWN_RATIO else 0
+        self.under = self.under + 1 if self.work_ms < self.budget_ms * QUALITY_UP_RATIO else 0
+        if self.over >= QUALITY_DOWN_HOLD and self.tier > 0:
+            return self._shift(-1)
+        if self.under >= QUALITY_UP_HOLD and self.tier < len(QUALITY_TIERS) - 1:
+            return self._shift(1)
+        return False
+
+    def _shift(self, step):
+        self.tier += step
+        self.over = 0
+        self.under = 0
+        self.cooldown = QUALITY_COOLDOWN
+        return True
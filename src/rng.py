@@ -0,0 +1,82 @@
+import time
+
+# xoshiro128** seeded through splitmix32. Everything is done in 32-bit unsigned
+# arithmetic so index.html can produce the exact same sequence for a given seed.
+MASK32 = 0xFFFFFFFF
+TWO_POW_32 = 4294967296.0
+
+
+def _rotl(value, shift):
+    return ((value << shift) | (value >> (32 - shift))) & MASK32
+
+
+def splitmix32(state):
+    state = (state + 0x9E3779B9) & MASK32
+    z = state
+    z = ((z ^ (z >> 16)) * 0x85EBCA6B) & MASK32
+    z = ((z ^ (z >> 13)) * 0xC2B2AE35) & MASK32
+    return state, z ^ (z >> 16)
+
+
+def fnv1a32(text):
+    value = 0x811C9DC5
+    for byte in text.encode("utf-8"):
+        value = ((value ^ byte) * 0x01000193) & MASK32
+    return value
+
+
+def derive_seed(seed, label):
+    _, mixed = splitmix32((int(seed) ^ fnv1a32(label)) & MASK32)
+    return mixed
+
+
+def time_seed():
+    return int(time.time() * 1000) & MASK32
+
+
+class Rng:
+    def __init__(self, seed):
+        self.seed = int(seed) & MASK32
+        state = self.seed
+        words = []
+        for _ in range(4):
+            state, word = splitmix32(state)
+            words.append(word)
+        if not any(words):
+            words[0] = 1
+        self.s0, self.s1, self.s2, self.s3 = words
+
+    def next_u32(self):
+        s0, s1, s2, s3 = self.s0, self.s1, self.s2, self.s3
+        result = (_rotl((s1 * 5) & MASK32, 7) * 9) & MASK32
+        t = (s1 << 9) & MASK32
+        s2 ^= s0
+        s3 ^= s1
+        s1 ^= s2
+        s0 ^= s3
+        s2 ^= t
+        self.s0, self.s1, self.s2, self.s3 = s0, s1, s2, _rotl(s3, 11)
+        return result
+
+    def random(self):
+        return self.next_u32() / TWO_POW_32
+
+    def uniform(self, low, high):
+        return low + (high - low) * self.random()
+
+    def randint(self, low, high):
+        return low + int(self.random() * (high - low + 1))
+
+    def randrange(self, stop):
+        return int(self.random() * stop)
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    def shuffle(self, seq):
+        for i in range(len(seq) - 1, 0, -1):
+            j = int(self.random() * (i + 1))
+            seq[i], seq[j] = seq[j], seq[i]
+
+    def stream(self, label):
+        return Rng(derive_seed(self.seed, label))
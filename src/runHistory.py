@@ -0,0 +1,259 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+HISTORY_SCHEMA_VERSION = 1
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "saves", "run_history.sqlite3")
+HISTORY_BATCH_SIZE = 64
+# After the first queued record arrives, wait this long for more so bursts share one transaction.
+HISTORY_BATCH_WINDOW_S = 0.25
+TREND_WINDOW = 5
+OUTCOME_CLEARED = "cleared"
+OUTCOME_FAILED = "failed"
+
+RUN_COLUMNS = (
+    "recorded_at",
+    "seed",
+    "theme_key",
+    "archetype",
+    "contract_name",
+    "difficulty",
+    "gravity",
+    "jump",
+    "gap_min",
+    "gap_max",
+    "width_min",
+    "width_max",
+    "lives",
+    "lives_used",
+    "beacons",
+    "beacon_total",
+    "time_ms",
+    "outcome",
+)
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    seed INTEGER,
+    theme_key TEXT,
+    archetype TEXT,
+    contract_name TEXT,
+    difficulty REAL,
+    gravity REAL,
+    jump REAL,
+    gap_min INTEGER,
+    gap_max INTEGER,
+    width_min INTEGER,
+    width_max INTEGER,
+    lives INTEGER,
+    lives_used INTEGER,
+    beacons INTEGER,
+    beacon_total INTEGER,
+    time_ms INTEGER,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_theme_time ON runs (theme_key, outcome, time_ms);
+CREATE INDEX IF NOT EXISTS runs_archetype_time ON runs (archetype, outcome, time_ms);
+CREATE INDEX IF NOT EXISTS runs_theme_recent ON runs (theme_key, recorded_at);
+PRAGMA user_version = {HISTORY_SCHEMA_VERSION};
+"""
+
+
+def run_record(contract, outcome, time_ms, beacons, beacon_total, lives_used):
+    return {
+        "recorded_at": time.time(),
+        "seed": contract.get("seed"),
+        "theme_key": contract.get("theme_key"),
+        "archetype": contract.get("archetype"),
+        "contract_name": contract.get("name"),
+        "difficulty": contract.get("difficulty"),
+        "gravity": contract.get("gravity"),
+        "jump": contract.get("jump"),
+        "gap_min": contract.get("gap_min"),
+        "gap_max": contract.get("gap_max"),
+        "width_min": contract.get("width_min"),
+        "width_max": contract.get("width_max"),
+        "lives": contract.get("lives"),
+        "lives_used": lives_used,
+        "beacons": beacons,
+        "beacon_total": beacon_total,
+        "time_ms": time_ms,
+        "outcome": outcome,
+    }
+
+
+def _clear_time_at(conn, column, key, fraction, total):
+    # Walks the (column, outcome, time_ms) index straight to the requested rank.
+    row = conn.execute(
+        f"SELECT time_ms FROM runs WHERE {column} = ? AND outcome = ? AND time_ms IS NOT NULL "
+        "ORDER BY time_ms LIMIT 1 OFFSET ?",
+        (key, OUTCOME_CLEARED, min(total - 1, int(fraction * total))),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _summary(conn, column, key):
+    attempts, clears = conn.execute(
+        f"SELECT COUNT(*), COUNT(CASE WHEN outcome = ? THEN 1 END) FROM runs WHERE {column} = ?",
+        (OUTCOME_CLEARED, key),
+    ).fetchone()
+    timed = conn.execute(
+        f"SELECT COUNT(*) FROM runs WHERE {column} = ? AND outcome = ? AND time_ms IS NOT NULL", (key, OUTCOME_CLEARED)
+    ).fetchone()[0]
+    summary = {"attempts": attempts, "clears": clears, "timed": timed, "p25": None, "p50": None, "p90": None, "trend_ms": None}
+    if timed:
+        for name, fraction in (("p25", 0.25), ("p50", 0.5), ("p90", 0.9)):
+            summary[name] = _clear_time_at(conn, column, key, fraction, timed)
+    return summary
+
+
+def _trend(conn, key):
+    # Mean of the latest TREND_WINDOW clear times minus the window before it; negative means getting faster.
+    times = [
+        row[0]
+        for row in conn.execute(
+            "SELECT time_ms FROM runs WHERE theme_key = ? AND outcome = ? AND time_ms IS NOT NULL "
+            "ORDER BY recorded_at DESC LIMIT ?",
+            (key, OUTCOME_CLEARED, TREND_WINDOW * 2),
+        )
+    ]
+    if len(times) < TREND_WINDOW * 2:
+        return None
+    recent, earlier = times[:TREND_WINDOW], times[TREND_WINDOW:]
+    return (sum(recent) - sum(earlier)) / TREND_WINDOW
+
+
+def theme_summary(conn, key):
+    summary = _summary(conn, "theme_key", key)
+    summary["trend_ms"] = _trend(conn, key)
+    return summary
+
+
+def archetype_summary(conn, key):
+    return _summary(conn, "archetype", key)
+
+
+def run_rank(conn, key, time_ms, recorded_at):
+    # Share of earlier timed clears in this dimension that were slower than time_ms. The run being ranked
+    # may already be logged, so only rows recorded before it count.
+    slower, total = conn.execute(
+        "SELECT COUNT(CASE WHEN time_ms > ? THEN 1 END), COUNT(*) FROM runs "
+        "WHERE theme_key = ? AND outcome = ? AND time_ms IS NOT NULL AND recorded_at < ?",
+        (time_ms, key, OUTCOME_CLEARED, recorded_at),
+    ).fetchone()
+    return {"slower": slower, "total": total}
+
+
+HISTORY_QUERIES = {"theme_summary": theme_summary, "archetype_summary": archetype_summary, "run_rank": run_rank}
+
+
+class RunHistory:
+    # SQLite run log owned by one background thread. The game thread only enqueues records and reads
+    # cached query results; a stale or missing result schedules a refresh and returns what it has.
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.Queue()
+        self.cache = {}
+        self.pending = set()
+        self.generation = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="run-history", daemon=True)
+        self.thread.start()
+
+    def record(self, record):
+        if self.error is None:
+            self.queue.put(("insert", record))
+
+    def query(self, name, *args):
+        key = (name, args)
+        cached = self.cache.get(key)
+        if self.error is None and (cached is None or cached[0] < self.generation) and key not in self.pending:
+            self.pending.add(key)
+            self.queue.put(("query", key))
+        return cached[1] if cached else None
+
+    def flush(self, timeout=5.0):
+        if self.error is not None or not self.thread.is_alive():
+            return False
+        done = threading.Event()
+        self.queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        if self.thread.is_alive():
+            self.queue.put(("close", None))
+            self.thread.join(timeout)
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except Exception as exc:
+            self.error = f"{type(exc).__name__}: {exc}"
+            self._release_waiters()
+            return
+        insert = f"INSERT INTO runs ({', '.join(RUN_COLUMNS)}) VALUES ({', '.join('?' for _ in RUN_COLUMNS)})"
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            if batch[0][0] == "insert":
+                deadline = time.monotonic() + HISTORY_BATCH_WINDOW_S
+                while len(batch) < HISTORY_BATCH_SIZE:
+                    try:
+                        batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                    except queue.Empty:
+                        break
+            else:
+                while len(batch) < HISTORY_BATCH_SIZE:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+            try:
+                rows = [tuple(payload[column] for column in RUN_COLUMNS) for command, payload in batch if command == "insert"]
+                if rows:
+                    with conn:
+                        conn.executemany(insert, rows)
+                    self.generation += 1
+                for command, payload in batch:
+                    if command == "query":
+                        name, args = payload
+                        self.cache[payload] = (self.generation, HISTORY_QUERIES[name](conn, *args))
+                        self.pending.discard(payload)
+                    elif command == "flush":
+                        payload.set()
+                    elif command == "close":
+                        running = False
+            except Exception as exc:
+                # Any failure ends the thread, so record it and drop what is waiting: query() and record()
+                # stop queueing once error is set, and nothing left pending would ever be answered.
+                self.error = f"{type(exc).__name__}: {exc}"
+                self.pending.clear()
+                for command, payload in batch:
+                    if command == "flush":
+                        payload.set()
+                running = False
+        conn.close()
+        self._release_waiters()
+
+    def _release_waiters(self):
+        # Flushes queued behind a failure would otherwise block their callers for the full timeout.
+        while True:
+            try:
+                command, payload = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if command == "flush":
+                payload.set()
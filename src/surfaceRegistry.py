@@ -0,0 +1,116 @@
+import weakref
+from collections import OrderedDict
+
+SURFACE_MB = 1024 * 1024
+# Soft ceilings on live pixel memory per category. Cacheable categories are LRU caches held to their
+# budget by eviction; the rest are owned by the game and only reported when they run over.
+SURFACE_BUDGETS_MB = {
+    "canvas": 40.0,
+    "backdrop": 4.0,
+    "gradients": 12.0,
+    "orbs": 1.0,
+    "sprites": 4.0,
+    "text": 2.0,
+    "toasts": 0.5,
+    "hazards": 0.5,
+    "particles": 0.5,
+    "ghost": 0.1,
+}
+SURFACE_CACHEABLE = ("gradients", "text")
+
+
+def parse_budgets(text):
+    # "text=4,gradients=16" in MB; categories left out keep their default.
+    budgets = {}
+    for part in filter(None, (piece.strip() for piece in text.split(","))):
+        category, _, amount = part.partition("=")
+        category = category.strip()
+        if category not in SURFACE_BUDGETS_MB:
+            raise ValueError(f"surface_budgets: unknown category {category!r}; expected one of {', '.join(SURFACE_BUDGETS_MB)}")
+        try:
+            budgets[category] = float(amount)
+        except ValueError:
+            raise ValueError(f"surface_budgets: expected {category}=MB, got {part!r}") from None
+    return budgets
+
+
+def surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+
+class SurfaceRegistry:
+    # Live bytes are counted up on track() and back down by a weakref finalizer when pygame frees the
+    # surface, so the totals reflect what is actually alive, not what was ever allocated.
+    def __init__(self, budgets=None):
+        self.budgets = {}
+        self.live = dict.fromkeys(SURFACE_BUDGETS_MB, 0)
+        self.counts = dict.fromkeys(SURFACE_BUDGETS_MB, 0)
+        self.peak = 0
+        self.caches = {category: OrderedDict() for category in SURFACE_CACHEABLE}
+        self.cache_bytes = dict.fromkeys(SURFACE_CACHEABLE, 0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.set_budgets(budgets or {})
+
+    def set_budgets(self, budgets_mb):
+        merged = dict(SURFACE_BUDGETS_MB, **budgets_mb)
+        self.budgets = {category: int(mb * SURFACE_MB) for category, mb in merged.items()}
+        for category in SURFACE_CACHEABLE:
+            self._evict(category)
+
+    def track(self, surface, category):
+        # Subsurfaces share their parent's pixels, so only the parent is counted.
+        if surface.get_parent() is None:
+            size = surface_bytes(surface)
+            self.live[category] += size
+            self.counts[category] += 1
+            self.peak = max(self.peak, self.total_bytes())
+            weakref.finalize(surface, self._release, category, size)
+        return surface
+
+    def _release(self, category, size):
+        self.live[category] -= size
+        self.counts[category] -= 1
+
+    def cached(self, category, key, factory, *args):
+        cache = self.caches[category]
+        surface = cache.get(key)
+        if surface is not None:
+            cache.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = cache[key] = self.track(factory(*args), category)
+        self.cache_bytes[category] += surface_bytes(surface)
+        self._evict(category)
+        return surface
+
+    def _evict(self, category):
+        # The newest entry always stays, even when it alone is over budget.
+        cache = self.caches[category]
+        while self.cache_bytes[category] > self.budgets[category] and len(cache) > 1:
+            _, surface = cache.popitem(last=False)
+            self.cache_bytes[category] -= surface_bytes(surface)
+            self.evictions += 1
+
+    def clear(self, category):
+        self.caches[category].clear()
+        self.cache_bytes[category] = 0
+
+    def total_bytes(self):
+        return sum(self.live.values())
+
+    def over_budget(self):
+        return [category for category, size in self.live.items() if size > self.budgets[category]]
+
+    def summary(self):
+        text = f"surfaces {self.total_bytes() / SURFACE_MB:.1f} MB"
+        for category in SURFACE_CACHEABLE:
+            text += f"  {category} {self.live[category] / SURFACE_MB:.1f}/{self.budgets[category] / SURFACE_MB:.0f}"
+        text += f"  evicted {self.evictions}"
+        over = self.over_budget()
+        return f"{text}  OVER {','.join(over)}" if over else text
+
+
+surfaceRegistry = SurfaceRegistry()
@@ -0,0 +1,121 @@
+import glob
+import json
+import os
+import threading
+import time
+
+TELEMETRY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "saves", "telemetry")
+# Power of two so the write slot is a mask, not a modulo; a few seconds of worst-case events.
+TELEMETRY_RING_SIZE = 4096
+TELEMETRY_FLUSH_S = 0.5
+TELEMETRY_KEEP_SESSIONS = 20
+_now_ns = time.perf_counter_ns
+# A frame counts as a budget miss once it runs this far past the frame cap's interval.
+FRAME_MISS_RATIO = 1.25
+
+EVENT_SESSION = "session"
+EVENT_CONTRACT_ACCEPTED = "contract_accepted"
+EVENT_LEVEL_BUILT = "level_built"
+EVENT_DEATH = "death"
+EVENT_BEACON = "beacon"
+EVENT_WIN = "win"
+EVENT_PURCHASE = "purchase"
+EVENT_STATE_CHANGE = "state_change"
+EVENT_FRAME_MISS = "frame_miss"
+# emit() takes positional values in this order; names are only attached on the writer thread.
+EVENT_FIELDS = {
+    EVENT_SESSION: ("started_at", "preset", "fps", "quality"),
+    EVENT_CONTRACT_ACCEPTED: ("contract", "seed", "theme_key", "archetype", "difficulty"),
+    EVENT_LEVEL_BUILT: ("seed", "build_ms", "platforms", "beacons", "hazards"),
+    EVENT_DEATH: ("cause", "lives_left", "level_ms"),
+    EVENT_BEACON: ("collected", "total", "level_ms"),
+    EVENT_WIN: ("contract", "theme_key", "time_ms", "beacons", "payment"),
+    EVENT_PURCHASE: ("item", "cost", "money_left"),
+    EVENT_STATE_CHANGE: ("from", "to"),
+    EVENT_FRAME_MISS: ("frame_ms", "work_ms", "state"),
+}
+
+
+class Telemetry:
+    # emit() only stores a tuple in a preallocated ring and bumps a counter; a background thread turns
+    # everything between its cursor and the head into JSONL every TELEMETRY_FLUSH_S. When the game laps
+    # the writer, the oldest events are overwritten and counted as dropped instead of blocking.
+    def __init__(self, directory=TELEMETRY_DIR, enabled=True, ring_size=TELEMETRY_RING_SIZE):
+        if ring_size < 1:
+            raise ValueError(f"telemetry ring size must be positive, got {ring_size}")
+        # Slots are picked with a mask, so round up to the next power of two.
+        ring_size = 1 << (int(ring_size) - 1).bit_length()
+        self.ring = [None] * ring_size
+        self.mask = ring_size - 1
+        self.head = 0
+        self.tail = 0
+        self.written = 0
+        self.dropped = 0
+        self.error = None
+        self.origin_ns = time.perf_counter_ns()
+        self.path = None
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = None
+        if not enabled:
+            return
+        self.path = os.path.join(directory, time.strftime("session-%Y%m%d-%H%M%S.jsonl"))
+        self.thread = threading.Thread(target=self._run, args=(directory,), name="telemetry", daemon=True)
+        self.thread.start()
+
+    def emit(self, kind, *values):
+        head = self.head
+        self.ring[head & self.mask] = (_now_ns(), kind, values)
+        self.head = head + 1
+
+    def _drain(self):
+        head = self.head
+        start = max(self.tail, head - len(self.ring))
+        events = [self.ring[index & self.mask] for index in range(start, head)]
+        # Anything the game overwrote while we copied is no longer the event we meant to read.
+        overwritten = max(0, self.head - len(self.ring) - start)
+        self.dropped += start - self.tail + min(overwritten, len(events))
+        self.tail = head
+        return events[overwritten:]
+
+    def _format(self, event):
+        stamp_ns, kind, values = event
+        record = {"t_ms": round((stamp_ns - self.origin_ns) / 1e6, 3), "event": kind}
+        fields = EVENT_FIELDS.get(kind, ())
+        if len(fields) == len(values):
+            record.update(zip(fields, values))
+        else:
+            record["values"] = list(values)
+        return json.dumps(record, separators=(",", ":"), default=str)
+
+    def _run(self, directory):
+        try:
+            os.makedirs(directory, exist_ok=True)
+            sessions = sorted(glob.glob(os.path.join(directory, "session-*.jsonl")))
+            for stale in sessions[: max(0, len(sessions) - TELEMETRY_KEEP_SESSIONS + 1)]:
+                os.remove(stale)
+            handle = open(self.path, "a", encoding="utf-8")
+        except OSError as exc:
+            self.error = str(exc)
+            return
+        with handle:
+            while True:
+                self.wake.wait(TELEMETRY_FLUSH_S)
+                self.wake.clear()
+                events = self._drain()
+                if events:
+                    try:
+                        handle.write("".join(self._format(event) + "\n" for event in events))
+                        handle.flush()
+                    except OSError as exc:
+                        self.error = str(exc)
+                        return
+                    self.written += len(events)
+                if self.stopping:
+                    return
+
+    def close(self, timeout=2.0):
+        if self.thread is not None and self.thread.is_alive():
+            self.stopping = True
+            self.wake.set()
+            self.thread.join(timeout)
@@ -0,0 +1,139 @@
+import colorsys
+from collections import OrderedDict
+from functools import lru_cache
+
+import pygame
+
+from rng import Rng
+from surfaceRegistry import surfaceRegistry
+
+THEME_CACHE_SIZE = 256
+PALETTE_CACHE_SIZE = 256
+DEFAULT_HAZARD = ("ACID", (80, 200, 80))
+
+NAME_ONSETS = ["Ka", "Vel", "Zor", "Ith", "Mor", "Lun", "Sae", "Tor", "Quil", "Nex", "Ari", "Omb", "Cyr", "Hal", "Xan", "Ves"]
+NAME_CODAS = ["a", "is", "on", "ex", "ia", "ur", "eth", "ane", "ix", "ora", "el", "und"]
+NAME_LANDFORMS = ["Shelf", "Wastes", "Cascades", "Verge", "Grotto", "Belt", "Reach", "Expanse", "Hollows", "Spires", "Drift", "Basin", "Rift", "Steppe"]
+LORE_SUBJECTS = ["Drifting ore barges", "Hollow lighthouses", "Crystal reefs", "Rusted sky-rails", "Sleeping leviathans", "Folded cities", "Glass dunes", "Orbiting monoliths"]
+LORE_VERBS = ["hum beneath", "circle above", "fracture across", "glow along", "sink through", "whisper around"]
+LORE_SCENES = ["the courier lanes", "every landing pad", "a tilted horizon", "the old relay towers", "storm-lit canyons", "the delivery gates"]
+HAZARD_ADJECTIVES = ["Static", "Molten", "Spectral", "Caustic", "Frozen", "Gravitic", "Prismatic", "Umbral"]
+HAZARD_NOUNS = ["Bloom", "Tide", "Mire", "Surge", "Haze", "Slurry", "Current", "Fog"]
+
+
+def mix_colors(color_a, color_b, t):
+    return tuple(int(color_a[i] + (color_b[i] - color_a[i]) * t) for i in range(3))
+
+
+def create_vertical_gradient(width, height, top_color, bottom_color, top_alpha=255, bottom_alpha=255):
+    height = max(1, int(height))
+    surface = pygame.Surface((int(width), height), pygame.SRCALPHA)
+    if height == 1:
+        color = (*top_color, int(top_alpha))
+        surface.fill(color)
+        return surface.convert_alpha()
+    for y in range(height):
+        t = y / (height - 1)
+        color = mix_colors(top_color, bottom_color, t)
+        alpha = int(top_alpha + (bottom_alpha - top_alpha) * t)
+        surface.fill((*color, alpha), rect=pygame.Rect(0, y, width, 1))
+    return surface.convert_alpha()
+
+
+def _hsv(h, s, v):
+    r, g, b = colorsys.hsv_to_rgb(h % 1.0, max(0.0, min(1.0, s)), max(0.0, min(1.0, v)))
+    return (int(r * 255), int(g * 255), int(b * 255))
+
+
+@lru_cache(maxsize=THEME_CACHE_SIZE)
+def _synthesized_items(seed):
+    # index.html's synthesizeTheme makes the same draws in the same order; keep the two in step.
+    # Cached as a tuple of items with tuple values, so nothing a caller holds can reach back into the cache.
+    rng = Rng(seed)
+    hue = rng.random()
+    hazard_hue = hue + rng.uniform(0.35, 0.65)
+    sky_top = _hsv(hue, rng.uniform(0.35, 0.6), rng.uniform(0.75, 1.0))
+    sky_bottom = _hsv(hue + rng.uniform(-0.08, 0.08), rng.uniform(0.55, 0.85), rng.uniform(0.08, 0.3))
+    hazard_color = _hsv(hazard_hue, rng.uniform(0.6, 0.9), rng.uniform(0.65, 0.9))
+    name = f"{rng.choice(NAME_ONSETS)}{rng.choice(NAME_CODAS)} {rng.choice(NAME_LANDFORMS)}"
+    description = f"{rng.choice(LORE_SUBJECTS)} {rng.choice(LORE_VERBS)} {rng.choice(LORE_SCENES)}."
+    theme = {
+        "key": f"synth_{seed:08x}",
+        "name": name,
+        "description": description,
+        "sky_top": sky_top,
+        "sky_bottom": sky_bottom,
+        "ceiling_color": mix_colors(sky_top, sky_bottom, 0.45),
+        "platform_color": mix_colors(sky_top, (255, 255, 255), 0.7),
+        "hazard_name": f"{rng.choice(HAZARD_ADJECTIVES)} {rng.choice(HAZARD_NOUNS)}",
+        "hazard_color": hazard_color,
+        "glow_color": mix_colors(hazard_color, (255, 255, 255), rng.uniform(0.25, 0.45)),
+        "orb_palette": tuple(
+            _hsv(hue + rng.uniform(-0.15, 0.15), rng.uniform(0.15, 0.45), rng.uniform(0.85, 1.0)) for _ in range(3)
+        ),
+        "orb_count": rng.randint(18, 36),
+        "seed": seed,
+    }
+    return tuple(theme.items())
+
+
+def synthesize_theme(seed):
+    # A fresh dict per call, shaped like the themes loaded from data/, which callers are free to edit.
+    theme = dict(_synthesized_items(seed))
+    theme["orb_palette"] = list(theme["orb_palette"])
+    return theme
+
+
+def _derive_level_palette(theme):
+    hazard_name, hazard_color = DEFAULT_HAZARD
+    sky_top = theme.get("sky_top", (80, 80, 140))
+    hazard_color = theme.get("hazard_color", hazard_color)
+    return {
+        "sky_top": sky_top,
+        "sky_bottom": theme.get("sky_bottom", (30, 30, 38)),
+        "ceiling": theme.get("ceiling_color", sky_top),
+        "platform": theme.get("platform_color", (210, 210, 230)),
+        "hazard_name": theme.get("hazard_name", hazard_name),
+        "hazard_color": hazard_color,
+        "glow": theme.get("glow_color", hazard_color),
+        "orb_palette": tuple(theme["orb_palette"]) if theme.get("orb_palette") else None,
+        "orb_count": int(theme.get("orb_count", 26)),
+    }
+
+
+paletteCache = OrderedDict()
+
+
+def level_palette(theme):
+    key = theme.get("key")
+    if key is None:
+        return _derive_level_palette(theme)
+    palette = paletteCache.get(key)
+    if palette is None:
+        palette = _derive_level_palette(theme)
+        paletteCache[key] = palette
+        while len(paletteCache) > PALETTE_CACHE_SIZE:
+            paletteCache.popitem(last=False)
+    else:
+        paletteCache.move_to_end(key)
+    return palette
+
+
+class GradientCache:
+    # Entries live in the surface registry's "gradients" LRU, which is bounded by bytes rather than count:
+    # a full-screen gradient is about 1.9 MB, a glow band a fraction of that.
+    def __init__(self, registry=surfaceRegistry, category="gradients"):
+        self.registry = registry
+        self.category = category
+
+    def get(self, width, height, top_color, bottom_color, top_alpha=255, bottom_alpha=255):
+        key = (int(width), int(height), tuple(top_color), tuple(bottom_color), int(top_alpha), int(bottom_alpha))
+        return self.registry.cached(
+            self.category, key, create_vertical_gradient, width, height, top_color, bottom_color, top_alpha, bottom_alpha
+        )
+
+    def clear(self):
+        self.registry.clear(self.category)
+
+
+gradientCache = GradientCache()
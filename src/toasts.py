@@ -0,0 +1,75 @@
+from collections import deque
+
+import pygame
+
+from surfaceRegistry import surfaceRegistry
+
+PROGRESS_TOAST_DURATION_MS = 5200
+PROGRESS_TOAST_FADE_MS = 600
+PROGRESS_TOAST_LIMIT = 8
+PROGRESS_TOAST_VISIBLE = 3
+
+
+class ToastQueue:
+    def __init__(
+        self,
+        font,
+        text_color=(255, 235, 205),
+        panel_color=(30, 32, 52),
+        limit=PROGRESS_TOAST_LIMIT,
+        visible=PROGRESS_TOAST_VISIBLE,
+        duration_ms=PROGRESS_TOAST_DURATION_MS,
+        fade_ms=PROGRESS_TOAST_FADE_MS,
+    ):
+        self.font = font
+        self.text_color = text_color
+        self.panel_color = panel_color
+        self.visible = visible
+        self.duration_ms = duration_ms
+        self.fade_ms = max(1, fade_ms)
+        # Every toast lives for the same duration, so insertion order is expiry order
+        # and the oldest entry is always at the left end.
+        self.toasts = deque(maxlen=limit)
+
+    def __len__(self):
+        return len(self.toasts)
+
+    def __bool__(self):
+        return bool(self.toasts)
+
+    def render_panel(self, message):
+        text_surf = self.font.render(message, True, self.text_color)
+        panel = pygame.Surface((text_surf.get_width() + 14, text_surf.get_height() + 8), pygame.SRCALPHA)
+        pygame.draw.rect(panel, self.panel_color, panel.get_rect(), border_radius=8)
+        panel.blit(text_surf, (7, 4))
+        return surfaceRegistry.track(panel.convert_alpha(), "toasts")
+
+    def push(self, message, now):
+        self.toasts.append(
+            {
+                "text": message,
+                "expires": now + self.duration_ms,
+                "surface": self.render_panel(message),
+                "alpha": 255,
+            }
+        )
+
+    def expire(self, now):
+        toasts = self.toasts
+        while toasts and toasts[0]["expires"] <= now:
+            toasts.popleft()
+
+    def clear(self):
+        self.toasts.clear()
+
+    def draw(self, target, now, right, top, spacing=26):
+        toasts = self.toasts
+        for idx in range(min(self.visible, len(toasts))):
+            toast = toasts[idx]
+            surface = toast["surface"]
+            remaining = toast["expires"] - now
+            alpha = 255 if remaining >= self.fade_ms else max(0, int(255 * remaining / self.fade_ms))
+            if alpha != toast["alpha"]:
+                surface.set_alpha(alpha)
+                toast["alpha"] = alpha
+            target.blit(surface, (right + 7 - surface.get_width(), top - 4 + idx * spacing))
@@ -0,0 +1,180 @@
+import pygame
+
+from rng import Rng
+from surfaceRegistry import surfaceRegistry
+from themes import gradientCache, mix_colors
+
+LEVEL_BOUNDS = {
+    "floor_y": 520,
+    "hall_length": 4000,
+    "min_ceil_room": 60,
+    "min_floor_room": 80,
+    "platform_thickness": 18,
+    "door_clear_buffer": 320,
+    "door_width": 52,
+    "door_height": 150,
+}
+BEACON_MIN_COUNT = 2
+BEACON_MAX_COUNT = 4
+BACKDROP_ACCENT_COUNT = 10
+BACKDROP_ACCENT_ALPHA = 55
+BACKDROP_GLOW_HEIGHT = 180
+
+
+def jump_height(gravity, jump_strength):
+    return (jump_strength * jump_strength) / (2.0 * max(1e-6, abs(gravity)))
+
+
+def contract_tuning(contract):
+    return {
+        "jump_height": jump_height(contract["gravity"], contract["jump"]),
+        "gap_min": contract["gap_min"],
+        "gap_max": contract["gap_max"],
+        "width_min": contract["width_min"],
+        "width_max": contract["width_max"],
+        "vertical_bias": contract.get("vertical_bias", 1.0),
+        "horizontal_bias": contract.get("horizontal_bias", 1.0),
+    }
+
+
+def level_streams(seed):
+    # Layout and backdrop draw from separate streams so cosmetic changes never move platforms.
+    root = Rng(seed)
+    return root.stream("layout"), root.stream("backdrop")
+
+
+def _corridor_sky_top(rng, jump_height, bounds):
+    floor_y = bounds["floor_y"]
+    min_corridor = bounds["min_ceil_room"] + bounds["min_floor_room"] + 180
+    base_corridor = min_corridor + int(jump_height * 0.6)
+    variation = max(24, int(jump_height * 0.35))
+    corridor_height = base_corridor + rng.randint(-variation, variation)
+    corridor_height = max(min_corridor, min(corridor_height, floor_y - 80))
+    return max(40, floor_y - corridor_height)
+
+
+def _place_platforms(rng, tuning, bounds, sky_top):
+    floor_y = bounds["floor_y"]
+    thickness = bounds["platform_thickness"]
+    jump_height = tuning["jump_height"]
+    gap_min, gap_max = tuning["gap_min"], tuning["gap_max"]
+    width_min, width_max = tuning["width_min"], tuning["width_max"]
+    vertical_step = max(28, int(jump_height * 0.6 * tuning.get("vertical_bias", 1.0)))
+    horizontal_step = max(gap_min, min(gap_max, int(jump_height * 1.2 * tuning.get("horizontal_bias", 1.0))))
+    start_y = floor_y - bounds["min_floor_room"] - 40
+    min_platform_y = max(100, sky_top + bounds["min_ceil_room"])
+    max_platform_y = floor_y - bounds["min_floor_room"]
+    door_start = bounds["hall_length"] - bounds["door_clear_buffer"]
+    start_platform = pygame.Rect(60, start_y, 220, thickness)
+    platforms = [start_platform]
+    current_x = start_platform.right + rng.randint(gap_min, horizontal_step)
+    current_y = start_platform.y
+    while current_x < door_start - width_min - gap_min:
+        width = rng.randint(width_min, width_max)
+        current_y += rng.randint(-vertical_step, vertical_step)
+        current_y = max(min_platform_y, min(current_y, max_platform_y))
+        platforms.append(pygame.Rect(current_x, current_y, width, thickness))
+        current_x += width + rng.randint(gap_min, horizontal_step)
+    end_width = max(200, width_max)
+    end_x = max(door_start - end_width - 40, current_x - 80)
+    end_y = max(min_platform_y, min(current_y, max_platform_y))
+    platforms.append(pygame.Rect(end_x, end_y, end_width, thickness))
+    return platforms
+
+
+def _place_beacons(rng, platforms):
+    candidates = list(platforms[1:-1])
+    rng.shuffle(candidates)
+    beacons = []
+    for plat in candidates[: min(len(candidates), rng.randint(BEACON_MIN_COUNT, BEACON_MAX_COUNT))]:
+        if plat.width <= 40:
+            continue
+        spawn_x = rng.randint(plat.left + 20, plat.right - 20)
+        spawn_y = plat.top - 18
+        rect = pygame.Rect(spawn_x - 8, spawn_y - 8, 16, 16)
+        beacons.append(
+            {
+                "rect": rect,
+                # Pickup area, a little more forgiving than the drawn orb.
+                "hit_rect": rect.inflate(6, 6),
+                "pulse": rng.uniform(0.2, 1.0),
+                "collected": False,
+            }
+        )
+    return beacons
+
+
+def _place_door(end_platform, bounds, sky_top):
+    door_width, door_height = bounds["door_width"], bounds["door_height"]
+    door_left = max(end_platform.centerx - door_width // 2, end_platform.left + 10)
+    if door_left > end_platform.right - door_width - 10:
+        door_left = end_platform.right - door_width - 10
+    door_top_desired = end_platform.top - door_height
+    min_door_top = max(80, sky_top + 20)
+    door_top = door_top_desired if door_top_desired > min_door_top else min_door_top
+    return pygame.Rect(door_left, door_top, door_width, max(60, end_platform.top - door_top))
+
+
+def generate_layout(seed, tuning, bounds):
+    rng, _ = level_streams(seed)
+    sky_top = _corridor_sky_top(rng, tuning["jump_height"], bounds)
+    platforms = _place_platforms(rng, tuning, bounds, sky_top)
+    return {
+        "seed": seed,
+        "sky_top": sky_top,
+        "platforms": platforms,
+        "start": platforms[0],
+        "end": platforms[-1],
+        "door": _place_door(platforms[-1], bounds, sky_top),
+        "beacons": _place_beacons(rng, platforms),
+    }
+
+
+def build_backdrop(seed, palette, sky_top, screen_size, bounds, accent_count=BACKDROP_ACCENT_COUNT, orb_scale=1.0, orb_min=12):
+    _, rng = level_streams(seed)
+    screen_width, screen_height = screen_size
+    floor_y = bounds["floor_y"]
+    sky_top_color = palette["sky_top"]
+    glow_color = palette["glow"]
+    orb_palette = palette["orb_palette"]
+    # The base gradients come from a shared LRU so revisited palettes skip the per-row fill.
+    background = surfaceRegistry.track(
+        gradientCache.get(screen_width, screen_height, sky_top_color, palette["sky_bottom"]).copy(), "backdrop"
+    )
+    # Every accent is rolled even when fewer are painted, so the orbs come out the same at any detail level.
+    for index in range(BACKDROP_ACCENT_COUNT):
+        height = rng.randint(80, 220)
+        width = rng.randint(60, 160)
+        x = rng.randint(0, screen_width)
+        y = rng.randint(int(sky_top * 0.6), floor_y - 220)
+        accent_color = mix_colors(sky_top_color, glow_color, rng.uniform(0.2, 0.8))
+        if index >= accent_count:
+            continue
+        pygame.draw.rect(
+            background,
+            (*accent_color, BACKDROP_ACCENT_ALPHA),
+            pygame.Rect(x, y, width, height),
+            border_radius=18,
+        )
+    glow = gradientCache.get(screen_width, BACKDROP_GLOW_HEIGHT, sky_top_color, glow_color, 0, 170)
+    orbs = []
+    for _ in range(max(orb_min, int(palette["orb_count"] * orb_scale))):
+        orb_x = rng.randint(0, bounds["hall_length"])
+        orb_y = rng.randint(int(max(20, sky_top * 0.6)), int(floor_y * 0.65))
+        radius = rng.randint(6, 18)
+        tint_amount = rng.uniform(0.25, 0.75)
+        base_color = rng.choice(orb_palette) if orb_palette else sky_top_color
+        orb_color = mix_colors(base_color, glow_color, tint_amount)
+        orb_alpha = int(rng.uniform(120, 210))
+        orb_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(orb_surface, (*orb_color, orb_alpha), (radius, radius), radius)
+        orbs.append(
+            {
+                "x": orb_x,
+                "y": orb_y,
+                "radius": radius,
+                "parallax": rng.uniform(0.18, 0.42),
+                "surface": surfaceRegistry.track(orb_surface.convert_alpha(), "orbs"),
+            }
+        )
+    return background, glow, orbs
@@ -0,0 +1,47 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The game modules import each other by bare name, the way `python src/main.py` finds them.
+sys.path.insert(0, os.path.join(BASE_DIR, "src"))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def headless_display():
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.quit()
+
+
+@pytest.fixture(scope="session")
+def content_tables():
+    import content
+
+    return content.load_content(os.path.join(BASE_DIR, "data"), os.path.join(BASE_DIR, ".cache"))
+
+
+@pytest.fixture(scope="session")
+def contract_level(content_tables):
+    # The level the game builds for archetype `seed % len(archetypes)` rolled with `seed`:
+    # (contract, layout, hazards, platform behaviours).
+    from contracts import build_contract_from_archetype
+    from hazards import HazardField, populate_hazards
+    from platforms import plan_platform_behaviours
+    from worldGen import LEVEL_BOUNDS, contract_tuning, generate_layout
+
+    def build(seed):
+        archetypes = content_tables["archetypes"]
+        contract = build_contract_from_archetype(archetypes[seed % len(archetypes)], seed, content_tables["themes"])
+        layout = generate_layout(contract["seed"], contract_tuning(contract), LEVEL_BOUNDS)
+        hazards = HazardField()
+        populate_hazards(hazards, layout, contract.get("hazard_kind"), contract.get("difficulty_raw", 1.0), LEVEL_BOUNDS)
+        return contract, layout, hazards, plan_platform_behaviours(layout, contract.get("platform_mix"), LEVEL_BOUNDS)
+
+    return build
@@ -0,0 +1,53 @@
+import os
+
+import pygame
+import pytest
+
+from assetBundle import BundleError, AssetBundle, load_bundle
+
+
+def _write_assets(directory):
+    sprites = directory / "sprites"
+    sprites.mkdir(parents=True)
+    image = pygame.Surface((5, 3), pygame.SRCALPHA)
+    image.fill((10, 20, 30, 255))
+    image.set_at((4, 2), (200, 100, 50, 128))
+    pygame.image.save(image, str(sprites / "tile.png"))
+    (directory / "notes.txt").write_bytes(b"courier")
+
+
+def test_bundle_round_trips_images_and_files(tmp_path):
+    assets = tmp_path / "assets"
+    _write_assets(assets)
+    bundle = load_bundle(str(assets), str(tmp_path / "cache"))
+    assert sorted(bundle.names()) == ["notes.txt", "sprites/tile.png"]
+    surface = bundle.surface("sprites/tile.png")
+    assert surface.get_size() == (5, 3)
+    assert tuple(surface.get_at((0, 0))) == (10, 20, 30, 255)
+    assert tuple(surface.get_at((4, 2))) == (200, 100, 50, 128)
+    assert bytes(bundle.data("notes.txt")) == b"courier"
+    with pytest.raises(BundleError):
+        bundle.surface("notes.txt")
+    # Surfaces point into the mapping, so they have to go before the bundle closes.
+    del surface
+    bundle.close()
+
+
+def test_changed_tree_replaces_the_stale_bundle(tmp_path):
+    assets = tmp_path / "assets"
+    cache = tmp_path / "cache"
+    _write_assets(assets)
+    first = load_bundle(str(assets), str(cache))
+    first.close()
+    (assets / "extra.txt").write_bytes(b"new")
+    second = load_bundle(str(assets), str(cache))
+    assert "extra.txt" in second
+    assert os.listdir(cache) == [os.path.basename(second.path)]
+    second.close()
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "bogus.pak"
+    path.write_bytes(b"not a bundle at all, just bytes")
+    with pytest.raises(BundleError):
+        AssetBundle(str(path))
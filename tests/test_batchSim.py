@@ -0,0 +1,137 @@
+import math
+
+import numpy as np
+import pygame
+import pytest
+
+from batchSim import BatchCourierSim
+from hazards import HAZARD_RESPAWN_GRACE_MS
+from physics import ACTION_JUMP, ACTION_LEFT, ACTION_RIGHT, ACTION_SPRINT, FRAME_MS, new_body_state, spawn_rect, step_body
+from platforms import PLATFORM_VIEW_HALF, PlatformSet
+from worldGen import LEVEL_BOUNDS
+
+
+def _scalar_reference(layout, gravity, jump_strength, wall_jump, action_rows, hazards=None, behaviours=None):
+    # Replays each courier through PlatformSet.update, physics.step_body and HazardField.touching, resetting on
+    # death like the game does. Every courier gets its own copy of the platforms, since riding one moves it.
+    count = action_rows.shape[1]
+    rects = [spawn_rect(layout["start"]) for _ in range(count)]
+    states = [new_body_state() for _ in range(count)]
+    platform_sets = [
+        PlatformSet([plat.copy() for plat in layout["platforms"]], behaviours) if behaviours else None for _ in range(count)
+    ]
+    grace_until = [HAZARD_RESPAWN_GRACE_MS] * count
+    trace = []
+    hazard_deaths = 0
+    for frame, actions in enumerate(action_rows, start=1):
+        now = int(frame * FRAME_MS)
+        for idx in range(count):
+            action = int(actions[idx])
+            rect, platform_set = rects[idx], platform_sets[idx]
+            solids = layout["platforms"]
+            if platform_set is not None:
+                view_left, view_right = rect.left - PLATFORM_VIEW_HALF, rect.right + PLATFORM_VIEW_HALF
+                solids = platform_set.update(now, view_left, view_right, rect, states[idx]["vel_y"] + gravity)
+            alive = step_body(
+                rect,
+                states[idx],
+                solids,
+                LEVEL_BOUNDS["floor_y"],
+                now,
+                bool(action & ACTION_LEFT),
+                bool(action & ACTION_RIGHT),
+                bool(action & ACTION_SPRINT),
+                bool(action & ACTION_JUMP),
+                gravity,
+                jump_strength,
+                wall_jump,
+            )
+            if alive and hazards is not None and hazards.count and now >= grace_until[idx]:
+                alive = not hazards.touching(rects[idx], now / 1000.0)
+                hazard_deaths += not alive
+            if not alive:
+                grace_until[idx] = now + HAZARD_RESPAWN_GRACE_MS
+                rects[idx] = spawn_rect(layout["start"])
+                states[idx] = new_body_state(now)
+        trace.append(
+            (
+                [r.x for r in rects],
+                [r.y for r in rects],
+                [s["vel_y"] for s in states],
+                [s["on_ground"] for s in states],
+                [s["wall_dir"] for s in states],
+            )
+        )
+    return trace, hazard_deaths
+
+
+def _random_actions(seed, frames, count, jump_rate=0.5):
+    # Biased towards running right and jumping so couriers actually reach platforms and walls; a lower
+    # jump_rate keeps them on the pads for longer.
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, 16, size=(frames, count))
+    actions |= np.where(rng.random((frames, count)) < 0.6, ACTION_RIGHT, 0)
+    if jump_rate < 0.5:
+        actions &= np.where(rng.random((frames, count)) < jump_rate * 2, ~0, ~ACTION_JUMP)
+    return actions
+
+
+def _platform_strip():
+    # Generated levels put few dynamic pads within reach of random inputs, so this adds a row of them
+    # packed against the spawn: a crumbling pad touching it, phasing pads, and shuttles that close the gaps.
+    top = LEVEL_BOUNDS["floor_y"] - 120
+    platforms = [
+        pygame.Rect(40, top, 140, 18),
+        pygame.Rect(190, top, 120, 18),
+        pygame.Rect(320, top, 90, 18),
+        pygame.Rect(420, top, 110, 18),
+        pygame.Rect(570, top, 120, 18),
+        pygame.Rect(730, top, 120, 18),
+        pygame.Rect(860, top, 90, 18),
+        pygame.Rect(960, top, 120, 18),
+        pygame.Rect(1090, top, 140, 18),
+    ]
+    behaviours = {
+        1: {"kind": "crumbling"},
+        2: {"kind": "phasing", "period": 700, "solid_ms": 420, "offset": 0},
+        3: {"kind": "moving", "amp_x": 0, "amp_y": 24, "omega": math.tau / 1300, "phase": 0.0},
+        4: {"kind": "moving", "amp_x": 30, "amp_y": 0, "omega": math.tau / 1100, "phase": 1.0},
+        5: {"kind": "crumbling"},
+        6: {"kind": "phasing", "period": 900, "solid_ms": 500, "offset": 300},
+        7: {"kind": "crumbling"},
+    }
+    layout = {"platforms": platforms, "start": platforms[0], "door": pygame.Rect(1170, top - 60, 40, 60)}
+    return layout, behaviours
+
+
+def _replay(seed, contract, layout, hazards, behaviours, wall_jump, jump_rate, frames=600, count=24):
+    actions = _random_actions(seed, frames, count, jump_rate)
+    trace, hazard_deaths = _scalar_reference(
+        layout, contract["gravity"], contract["jump"], wall_jump, actions, hazards=hazards, behaviours=behaviours
+    )
+    sim = BatchCourierSim(layout, contract["gravity"], contract["jump"], count, wall_jump, hazards=hazards, behaviours=behaviours)
+    for frame, expected in enumerate(trace, start=1):
+        sim.step(actions[frame - 1])
+        got = (sim.x.tolist(), sim.y.tolist(), sim.vel_y.tolist(), sim.on_ground.tolist(), sim.wall_dir.tolist())
+        if got != tuple(expected):
+            fields = ("x", "y", "vel_y", "on_ground", "wall_dir")
+            bad = [name for name, a, b in zip(fields, got, expected) if a != b]
+            pytest.fail(f"seed {seed} wall_jump={wall_jump}: {', '.join(bad)} diverged at frame {frame}")
+    return hazard_deaths
+
+
+def test_generated_levels_match_the_scalar_step(contract_level):
+    hazard_deaths = 0
+    for seed in range(1, 9):
+        contract, layout, hazards, behaviours = contract_level(seed)
+        for wall_jump in (False, True):
+            hazard_deaths += _replay(seed, contract, layout, hazards, behaviours, wall_jump, 0.5)
+    # A run where no courier ever reached a hazard would leave the hazard deaths unchecked.
+    assert hazard_deaths > 0
+
+
+@pytest.mark.parametrize("wall_jump", (False, True))
+def test_dynamic_pads_match_platform_set(contract_level, wall_jump):
+    contract = contract_level(1)[0]
+    layout, behaviours = _platform_strip()
+    _replay(9, contract, layout, None, behaviours, wall_jump, 0.1)
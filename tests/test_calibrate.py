@@ -0,0 +1,65 @@
+from collections import defaultdict
+
+from calibrate import fit_table
+from contracts import calibrated_difficulty, index_calibration
+
+
+def _by_archetype(rows):
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row["archetype"]].append(row)
+    return grouped
+
+
+def test_shipped_table_ranks_archetypes_by_clear_rate(content_tables):
+    # The archetype players clear least often has to pay and label as the hardest, and so on down.
+    clear_rates = {}
+    difficulties = {}
+    for key, rows in _by_archetype(content_tables["calibration"]).items():
+        samples = sum(row["samples"] for row in rows)
+        clear_rates[key] = sum(row["clear_rate"] * row["samples"] for row in rows) / samples
+        difficulties[key] = sum(row["difficulty"] * row["samples"] for row in rows) / samples
+    assert sorted(clear_rates, key=lambda key: -clear_rates[key]) == sorted(difficulties, key=difficulties.get)
+
+
+def test_shipped_table_separates_tiers(content_tables):
+    difficulties = [row["difficulty"] for row in content_tables["calibration"]]
+    assert max(difficulties) - min(difficulties) >= 0.5
+    for rows in _by_archetype(content_tables["calibration"]).values():
+        assert len(rows) >= 2
+
+
+def test_lookup_never_drops_as_the_score_rises(content_tables):
+    table = index_calibration(content_tables["calibration"])
+    for key, points in table.items():
+        scores = [points[0][0] - 0.2 + step * 0.01 for step in range(int((points[-1][0] - points[0][0]) * 100) + 40)]
+        looked_up = [calibrated_difficulty(table, key, score, None) for score in scores]
+        assert looked_up == sorted(looked_up), key
+
+
+def test_hand_edited_dip_is_carried_forward():
+    table = index_calibration(
+        [
+            {"archetype": "a", "score": 1.0, "difficulty": 0.6},
+            {"archetype": "a", "score": 0.5, "difficulty": 0.4},
+            {"archetype": "a", "score": 1.5, "difficulty": 0.5},
+        ]
+    )
+    assert table["a"] == [(0.5, 0.4), (1.0, 0.6), (1.5, 0.6)]
+    assert calibrated_difficulty(table, "a", 1.25, None) == 0.6
+    assert calibrated_difficulty(table, "b", 1.25, 0.9) == 0.9
+
+
+def test_fit_pools_bins_that_would_rate_harder_rolls_easier():
+    # Four contracts of 100 runs each: the second-hardest clears least, so it pools with its neighbour.
+    outcomes = {0.5: 90, 1.0: 40, 1.5: 60, 2.0: 20}
+    samples = [
+        ("a", score, [(True, 10.0)] * clears + [(False, None)] * (100 - clears)) for score, clears in outcomes.items()
+    ]
+    rows = fit_table(samples)
+    assert [row["score"] for row in rows] == [0.5, 1.0, 1.5, 2.0]
+    assert [row["clear_rate"] for row in rows] == [0.9, 0.4, 0.6, 0.2]
+    difficulties = [row["difficulty"] for row in rows]
+    assert difficulties == sorted(difficulties)
+    assert difficulties[1] == difficulties[2]
+    assert difficulties[0] < difficulties[1] < difficulties[3]
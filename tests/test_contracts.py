@@ -0,0 +1,24 @@
+import json
+
+from contracts import GOLDEN_PATH, LAYOUT_GOLDEN_PATH, golden_boards, golden_layouts, index_calibration
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def test_builders_reproduce_golden_boards(content_tables):
+    boards = golden_boards(
+        content_tables["archetypes"], content_tables["themes"], index_calibration(content_tables["calibration"])
+    )
+    assert boards == _load(GOLDEN_PATH)
+
+
+def test_layouts_reproduce_golden_fixture():
+    golden = _load(LAYOUT_GOLDEN_PATH)
+    # Every golden board contract is laid out, and the fixture spans more than one platform count.
+    board_seeds = [contract["seed"] for board in _load(GOLDEN_PATH)["boards"] for contract in board["contracts"]]
+    assert [record["contract"]["seed"] for record in golden["layouts"]] == board_seeds
+    assert len({len(record["platforms"]) for record in golden["layouts"]}) > 1
+    assert golden_layouts(record["contract"] for record in golden["layouts"]) == golden
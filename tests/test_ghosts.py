@@ -0,0 +1,62 @@
+import math
+
+from ghosts import GHOST_SAMPLE_MS, GhostPlayer, GhostRecorder, GhostStore, ghost_time_ms
+from physics import FRAME_MS
+
+
+def _synthetic_path(frames):
+    # Run right with periodic jumps and one respawn, roughly what a courier's trace looks like.
+    x, y = 120.0, 400.0
+    for frame in range(frames):
+        if frame == frames // 2:
+            x, y = 120.0, 400.0
+        x += 5 + (frame // 90) % 3
+        y = 400.0 - abs(math.sin(frame / 24.0)) * 110
+        yield frame * FRAME_MS, int(x), int(y)
+
+
+def _record(seconds, seed=1):
+    path = list(_synthetic_path(int(seconds * 1000 / FRAME_MS)))
+    recorder = GhostRecorder()
+    for level_ms, x, y in path:
+        recorder.sample(level_ms, x, y)
+    return path, recorder, recorder.encode(seed, path[-1][0])
+
+
+def test_round_trip_replays_every_sample():
+    path, _, data = _record(60)
+    player = GhostPlayer()
+    assert player.load(data)
+    expected = {}
+    next_ms = 0
+    for level_ms, x, y in path:
+        while level_ms >= next_ms:
+            expected[next_ms] = (x, y)
+            next_ms += GHOST_SAMPLE_MS
+    for tick, position in expected.items():
+        player.advance(tick)
+        assert player.rect.topleft == position, f"sample at {tick} ms"
+
+
+def test_a_minute_fits_in_a_few_kilobytes():
+    path, recorder, data = _record(60)
+    assert recorder.samples == int(path[-1][0] // GHOST_SAMPLE_MS) + 1
+    assert len(data) < 6 * 1024
+    assert ghost_time_ms(data) == int(path[-1][0])
+
+
+def test_corrupt_recordings_are_rejected():
+    _, _, data = _record(5)
+    player = GhostPlayer()
+    assert not player.load(b"")
+    assert not player.load(b"XXXX" + data[4:])
+    assert ghost_time_ms(data[:8]) is None
+
+
+def test_store_keeps_only_faster_clears(tmp_path):
+    store = GhostStore(str(tmp_path))
+    _, fast, _ = _record(5)
+    _, slow, _ = _record(8)
+    assert store.offer(7, 5000, fast)
+    assert not store.offer(7, 8000, slow)
+    assert GhostStore(str(tmp_path)).get(7) is not None
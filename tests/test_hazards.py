@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+import pygame
+
+from hazards import HAZARD_POOL_SIZE, HazardField
+
+
+def _field():
+    field = HazardField()
+    field.spawn("drone", 200, 300, 12, amp_x=60, omega=2.0)
+    field.spawn("vent", 420, 360, 10, amp_y=40, omega=3.0, phase=1.0)
+    field.spawn("storm", 640, 280, 14, amp_x=30, amp_y=30, omega=1.5, orbit=True)
+    field.spawn("rain", 860, 0, 8, fall=200.0, top=40.0, span=480.0)
+    return field
+
+
+def test_touching_agrees_with_update_and_hits():
+    field = _field()
+    rect = pygame.Rect(0, 0, 30, 30)
+    for step in range(240):
+        seconds = step / 60
+        field.update(seconds, -100, 1100)
+        for x in range(150, 900, 35):
+            for y in range(250, 400, 25):
+                rect.topleft = (x, y)
+                assert field.touching(rect, seconds) == field.hits(rect), (x, y, seconds)
+
+
+def test_first_hit_reports_the_first_touching_step():
+    field = _field()
+    seconds = np.arange(120) / 60
+    lefts = np.full(120, 185.0)
+    tops = np.full(120, 285.0)
+    step = int(field.first_hit(lefts, tops, 30, 30, seconds))
+    rect = pygame.Rect(185, 285, 30, 30)
+    touched = [field.touching(rect, t) for t in seconds]
+    assert step == touched.index(True)
+    lefts[:] = np.inf
+    assert int(field.first_hit(lefts, tops, 30, 30, seconds)) == -1
+
+
+def test_closest_is_sorted_and_bounded():
+    field = _field()
+    found = field.closest(420, 360, 0.0, 240, 3)
+    assert 1 <= len(found) <= 3
+    distances = [math.hypot(dx, dy) for dx, dy, _ in found]
+    assert distances == sorted(distances)
+    assert all(distance <= 240 for distance in distances)
+
+
+def test_pool_recycles_slots_and_grows_when_full():
+    field = HazardField(capacity=4)
+    slots = [field.spawn("drone", 100 * idx, 300, 8) for idx in range(4)]
+    field.despawn(slots[1])
+    assert field.spawn("vent", 50, 300, 8) == slots[1]
+    field.spawn("dust", 500, 300, 8)
+    assert field.capacity == 8
+    assert field.count == 5
+    field.clear()
+    assert field.count == 0
+    assert HazardField().capacity == HAZARD_POOL_SIZE
@@ -0,0 +1,78 @@
+import numpy as np
+
+from mupsEnv import ACTION_COUNT, OBS_HAZARD_REACH, OBS_HAZARD_START, OBS_HAZARDS, OBS_SIZE, MupsEnv, SubprocVecEnv
+from physics import ACTION_RIGHT, FRAME_MS
+
+
+def _actions(count, seed=7):
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, ACTION_COUNT, size=count)
+    return (actions | np.where(rng.random(count) < 0.7, ACTION_RIGHT, 0)).tolist()
+
+
+def _rollout(seed, actions):
+    env = MupsEnv()
+    observations = [env.reset(seed).copy()]
+    rewards = []
+    for action in actions:
+        obs, reward, done, _ = env.step(action)
+        observations.append(obs.copy())
+        rewards.append(reward)
+        if done:
+            break
+    return np.array(observations), rewards
+
+
+def test_same_seed_and_actions_replay_identically():
+    actions = _actions(600)
+    first_obs, first_rewards = _rollout(3, actions)
+    second_obs, second_rewards = _rollout(3, actions)
+    assert first_obs.shape[1] == OBS_SIZE
+    assert np.array_equal(first_obs, second_obs)
+    assert first_rewards == second_rewards
+
+
+def test_observation_lists_nearby_hazards():
+    env = MupsEnv()
+    seed = next(seed for seed in range(1, 40) if env.reset(seed) is not None and env.hazards.count)
+    slot = int(np.flatnonzero(env.hazards.active)[0])
+    env.rect.center = (int(env.hazards.anchor_x[slot]) + 60, int(env.hazards.anchor_y[slot]))
+    obs = env.step(0)[0]
+    seconds = int(env.frame * FRAME_MS) / 1000.0
+    nearest = env.hazards.closest(env.rect.centerx, env.rect.centery, seconds, OBS_HAZARD_REACH, OBS_HAZARDS)
+    assert nearest, f"seed {seed}"
+    expected = np.zeros(OBS_HAZARDS * 3)
+    expected[: len(nearest) * 3] = np.ravel(nearest) / 1000.0
+    assert np.allclose(obs[OBS_HAZARD_START:], expected)
+
+
+def test_floor_death_respawns_and_costs_a_life():
+    env = MupsEnv()
+    env.reset(5)
+    start = env.rect.copy()
+    lives = env.lives
+    env.rect.bottom = env.floor_y
+    _, reward, done, info = env.step(0)
+    assert reward < 0
+    assert info["deaths"] == 1
+    assert env.lives == lives - 1
+    assert env.rect == start
+    assert done == (lives == 1)
+    env.lives = 1
+    env.rect.bottom = env.floor_y
+    assert env.step(0)[2]
+
+
+def test_vector_env_matches_single_envs():
+    actions = _actions(90)
+    vec = SubprocVecEnv(2, workers=2)
+    try:
+        observations = vec.reset([11, 12])
+        for action in actions:
+            observations, _, dones, _ = vec.step([action, action])
+            assert not dones.any()
+    finally:
+        vec.close()
+    for column, seed in enumerate((11, 12)):
+        expected, _ = _rollout(seed, actions)
+        assert np.array_equal(observations[column], expected[-1])
@@ -0,0 +1,106 @@
+import numpy as np
+import pygame
+
+from particles import (
+    BEACON_COLOR,
+    PARTICLE_FADE_STEPS,
+    PARTICLE_RADII,
+    SLOT_BEACON,
+    SLOT_DUST,
+    SLOT_GLOW,
+    SLOT_HAZARD,
+    ParticleSystem,
+)
+
+
+def _emit(system, count, slot=SLOT_GLOW, x=100.0):
+    return system.emit(x, 100.0, count, slot, 0, 10.0, 0.5, 1.0)
+
+
+def _cell_color(system, slot, size=0, fade=0):
+    area = system.areas[(slot * len(PARTICLE_RADII) + size) * PARTICLE_FADE_STEPS + fade]
+    return tuple(system.atlas.get_at(area.center))[:3]
+
+
+def test_emit_wraps_around_the_ring():
+    system = ParticleSystem(capacity=8)
+    assert _emit(system, 5, x=1.0) == 5
+    assert _emit(system, 5, x=2.0) == 5
+    assert system.head == 2
+    # The second burst filled slots 5-7, then wrapped onto 0 and 1.
+    assert system.x.tolist() == [2.0, 2.0, 1.0, 1.0, 1.0, 2.0, 2.0, 2.0]
+    assert (system.life > 0).all()
+
+
+def test_cap_evicts_the_oldest_particles():
+    system = ParticleSystem(capacity=8)
+    _emit(system, 6, x=1.0)
+    system.update(100)
+    old_life = system.life[:6].copy()
+    _emit(system, 4, x=2.0)
+    # Only the two oldest slots were overwritten; the newer survivors keep their age.
+    assert system.x.tolist()[:2] == [2.0, 2.0]
+    assert np.array_equal(system.life[2:6], old_life[2:6])
+    assert int((system.life > 0).sum()) == 8
+
+
+def test_burst_larger_than_the_ring_is_clamped():
+    system = ParticleSystem(capacity=8)
+    assert _emit(system, 20) == 8
+    assert system.head == 0
+
+
+def test_set_limit_shrinks_the_ring_in_place():
+    system = ParticleSystem(capacity=8)
+    _emit(system, 7)
+    x = system.x
+    system.set_limit(4)
+    assert system.x is x
+    assert (system.life[4:] == 0).all()
+    assert system.head == 3
+    _emit(system, 3)
+    assert system.head == 2
+    assert (system.life[4:] == 0).all()
+
+
+def test_throttle_stops_spawning_on_long_frames():
+    system = ParticleSystem(capacity=64)
+    for _ in range(200):
+        system.note_frame(40.0)
+    assert _emit(system, 10) == 0
+
+
+def test_set_palette_retints_the_atlas():
+    system = ParticleSystem()
+    system.set_palette((10, 200, 30), (40, 50, 250))
+    assert _cell_color(system, SLOT_HAZARD) == (10, 200, 30)
+    assert _cell_color(system, SLOT_GLOW) == (40, 50, 250)
+    assert _cell_color(system, SLOT_BEACON) == BEACON_COLOR
+    dust = _cell_color(system, SLOT_DUST)
+    system.set_palette((250, 20, 20), (40, 50, 250))
+    assert _cell_color(system, SLOT_HAZARD) == (250, 20, 20)
+    assert _cell_color(system, SLOT_DUST) != dust
+    assert _cell_color(system, SLOT_BEACON) == BEACON_COLOR
+
+
+def test_draw_uses_the_current_palette():
+    system = ParticleSystem(capacity=4)
+    system.set_palette((0, 255, 0), (0, 0, 255))
+    system.emit(50.0, 50.0, 1, SLOT_HAZARD, len(PARTICLE_RADII) - 1, 0.0, 0.0, 1.0)
+    surface = pygame.Surface((100, 100))
+    assert system.draw(surface, 0) == 1
+    assert tuple(surface.get_at((50, 50)))[:3] == (0, 255, 0)
+    system.set_palette((255, 0, 0), (0, 0, 255))
+    surface.fill((0, 0, 0))
+    system.draw(surface, 0)
+    assert tuple(surface.get_at((50, 50)))[:3] == (255, 0, 0)
+
+
+def test_draw_skips_dead_and_offscreen_particles():
+    system = ParticleSystem(capacity=8)
+    _emit(system, 2, x=50.0)
+    _emit(system, 2, x=5000.0)
+    surface = pygame.Surface((200, 200))
+    assert system.draw(surface, 0) == 2
+    system.update(2000)
+    assert system.draw(surface, 0) == 0
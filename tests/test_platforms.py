@@ -0,0 +1,44 @@
+import math
+
+import pygame
+import pytest
+
+from physics import COYOTE_TIME_MS, FRAME_MS, new_body_state, spawn_rect, step_body
+from platforms import CRUMBLE_DELAY_MS, CRUMBLE_RESPAWN_MS, PlatformSet
+
+
+def _shuttle_level(amp_x, amp_y):
+    platforms = [pygame.Rect(0, 400, 200, 18), pygame.Rect(400, 360, 140, 18), pygame.Rect(800, 400, 200, 18)]
+    behaviours = {1: {"kind": "moving", "amp_x": amp_x, "amp_y": amp_y, "omega": math.tau / 3000, "phase": 0.0}}
+    return platforms, PlatformSet(platforms, behaviours)
+
+
+@pytest.mark.parametrize("amp_x, amp_y", ((40, 0), (0, 30)))
+def test_idle_rider_stays_on_a_shuttle_and_can_jump_off(amp_x, amp_y):
+    platforms, level = _shuttle_level(amp_x, amp_y)
+    rect = spawn_rect(platforms[1])
+    state = new_body_state()
+    offset = rect.x - platforms[1].x
+    frames = 900
+    for frame in range(1, frames + 1):
+        now = int(frame * FRAME_MS)
+        solids = level.update(now, 0, 1000, rect, state["vel_y"])
+        jump = frame == frames
+        assert step_body(rect, state, solids, 520, now, False, False, False, jump, 0.6, 12.0, False), f"fell off at frame {frame}"
+        if jump:
+            assert state["vel_y"] < 0, "could not jump off the shuttle"
+        else:
+            assert now - state["last_grounded_ms"] <= COYOTE_TIME_MS, f"left the ground at frame {frame}"
+            assert rect.bottom == platforms[1].top, f"floated at frame {frame}"
+            assert rect.x - platforms[1].x == offset, f"slid at frame {frame}"
+
+
+def test_crumbling_pad_drops_out_and_respawns():
+    platforms = [pygame.Rect(0, 400, 200, 18), pygame.Rect(300, 400, 120, 18)]
+    level = PlatformSet(platforms, {1: {"kind": "crumbling"}})
+    rider = spawn_rect(platforms[1])
+    assert platforms[1] in level.update(0, 0, 1000, rider, 1.0)
+    away = pygame.Rect(340, 320, 30, 30)
+    assert platforms[1] in level.update(CRUMBLE_DELAY_MS - 1, 0, 1000, away, 1.0)
+    assert platforms[1] not in level.update(CRUMBLE_DELAY_MS + 1, 0, 1000, away, 1.0)
+    assert platforms[1] in level.update(CRUMBLE_DELAY_MS + CRUMBLE_RESPAWN_MS + 1, 0, 1000, away, 1.0)
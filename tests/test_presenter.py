@@ -0,0 +1,24 @@
+import pygame
+
+from presenter import Presenter, fit_rect
+
+
+def test_fit_rect_prefers_whole_multiples():
+    assert fit_rect((800, 600), (1600, 1200)) == pygame.Rect(0, 0, 1600, 1200)
+    # 2560x1440 fits 2.4x; 2x gives up more than a tenth, so it stays fractional and centred.
+    target = fit_rect((800, 600), (2560, 1440))
+    assert target.size == (1920, 1440)
+    assert target.centerx == 1280
+    assert fit_rect((800, 600), (1700, 1300)).size == (1600, 1200)
+
+
+def test_window_mode_letterboxes_the_canvas():
+    presenter = Presenter((800, 600), "window", window_size=(1000, 600))
+    assert presenter.canvas.get_size() == (800, 600)
+    assert presenter.target == pygame.Rect(100, 0, 800, 600)
+    assert sorted(bar.width for bar in presenter.bars) == [100, 100]
+    presenter.canvas.fill((200, 10, 10))
+    presenter.present()
+    window = pygame.display.get_surface()
+    assert tuple(window.get_at((500, 300)))[:3] == (200, 10, 10)
+    assert tuple(window.get_at((50, 300)))[:3] == (0, 0, 0)
@@ -0,0 +1,36 @@
+from quality import FRAME_BUDGET_MS, QUALITY_TIERS, QualityGovernor
+
+
+def _replay(profile):
+    # profile: [(frames, work_ms_at_high, scale_per_tier_down), ...] replayed through a 60 fps tick.
+    governor = QualityGovernor()
+    trace = []
+    frame_index = 0
+    for frames, work_ms, saving in profile:
+        for _ in range(frames):
+            work = work_ms * (1.0 - saving * (len(QUALITY_TIERS) - 1 - governor.tier))
+            if governor.note(max(FRAME_BUDGET_MS, work), work):
+                trace.append((frame_index, governor.settings["name"]))
+            frame_index += 1
+    return governor, trace
+
+
+def test_load_spike_steps_down_then_recovers():
+    governor, trace = _replay([(600, 8.0, 0.25), (900, 24.0, 0.25), (1200, 8.0, 0.25)])
+    assert [name for _, name in trace] == ["medium", "high"]
+    # Down within the hold after the spike starts, back up only after the sustained headroom.
+    assert 600 < trace[0][0] < 700
+    assert trace[1][0] > 1500
+    assert governor.settings["name"] == "high"
+
+
+def test_single_hitch_keeps_the_tier():
+    _, trace = _replay([(300, 8.0, 0.25), (1, 40.0, 0.25), (600, 8.0, 0.25)])
+    assert trace == []
+
+
+def test_sustained_overload_walks_down_one_tier_at_a_time():
+    governor, trace = _replay([(200, 8.0, 0.25), (2000, 60.0, 0.1)])
+    assert [name for _, name in trace] == ["medium", "low"]
+    assert trace[1][0] - trace[0][0] > 100
+    assert governor.tier == 0
@@ -0,0 +1,25 @@
+from rng import Rng, derive_seed
+
+
+def test_reference_vectors():
+    # index.html's port must produce these same words.
+    rng = Rng(1)
+    assert [rng.next_u32() for _ in range(4)] == [2442144158, 3238099751, 3819917871, 2104621829]
+    rng = Rng(12345).stream("layout")
+    assert [rng.next_u32() for _ in range(4)] == [1259010631, 3131025571, 492733021, 2665364852]
+
+
+def test_streams_are_independent_of_draw_order():
+    parent = Rng(99)
+    first = [parent.stream("hazards").next_u32() for _ in range(3)]
+    parent.next_u32()
+    assert parent.stream("hazards").next_u32() == first[0]
+    assert derive_seed(99, "hazards") != derive_seed(99, "layout")
+
+
+def test_bounded_draws_stay_in_range():
+    rng = Rng(7)
+    for _ in range(2000):
+        assert 0 <= rng.randrange(5) < 5
+        assert 3 <= rng.randint(3, 6) <= 6
+        assert 0.0 <= rng.random() < 1.0
@@ -0,0 +1,39 @@
+import json
+
+from telemetry import EVENT_BEACON, EVENT_DEATH, Telemetry
+
+
+def _lines(telemetry):
+    with open(telemetry.path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+def test_every_event_reaches_the_file(tmp_path):
+    telemetry = Telemetry(str(tmp_path))
+    for index in range(3000):
+        telemetry.emit(EVENT_BEACON, index, 3000, 0)
+        if index % 500 == 0:
+            telemetry.wake.set()
+    telemetry.close()
+    records = _lines(telemetry)
+    assert telemetry.error is None
+    assert len(records) + telemetry.dropped == 3000
+    assert [record["collected"] for record in records] == list(range(telemetry.dropped, 3000))
+
+
+def test_lapped_writer_counts_drops_instead_of_blocking(tmp_path):
+    telemetry = Telemetry(str(tmp_path), ring_size=8)
+    telemetry.wake.clear()
+    for index in range(20):
+        telemetry.emit(EVENT_DEATH, index, 0, "floor")
+    telemetry.close()
+    assert telemetry.written + telemetry.dropped == 20
+    assert telemetry.dropped >= 12
+
+
+def test_disabled_telemetry_writes_nothing(tmp_path):
+    telemetry = Telemetry(str(tmp_path), enabled=False)
+    telemetry.emit(EVENT_BEACON, 1, 1, 0)
+    telemetry.close()
+    assert telemetry.path is None
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,29 @@
+from themes import level_palette, synthesize_theme
+
+
+def test_synthesized_themes_are_independent_copies():
+    first = synthesize_theme(1234)
+    reference = synthesize_theme(1234)
+    first["name"] = "Edited"
+    first["orb_palette"].append((0, 0, 0))
+    first.pop("hazard_color")
+    again = synthesize_theme(1234)
+    assert again == reference
+    assert again is not first
+    assert again["orb_palette"] is not first["orb_palette"]
+
+
+def test_synthesized_theme_is_stable_per_seed():
+    theme = synthesize_theme(42)
+    assert theme["key"] == "synth_0000002a"
+    assert theme == synthesize_theme(42)
+    assert theme != synthesize_theme(43)
+    assert isinstance(theme["orb_palette"], list) and len(theme["orb_palette"]) == 3
+
+
+def test_cached_palette_survives_theme_edits():
+    theme = synthesize_theme(777)
+    palette = level_palette(theme)
+    expected = list(palette["orb_palette"])
+    theme["orb_palette"].clear()
+    assert list(level_palette(synthesize_theme(777))["orb_palette"]) == expected
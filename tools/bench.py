@@ -0,0 +1,310 @@
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src"))
+
+import numpy as np
+import pygame
+
+# Timings for the runtime modules, one subcommand each: python tools/bench.py <name> [options].
+# Correctness lives in tests/; nothing here asserts.
+
+
+def _level(seed):
+    import content
+    from contracts import build_contract_from_archetype
+    from hazards import HazardField, populate_hazards
+    from platforms import plan_platform_behaviours
+    from worldGen import LEVEL_BOUNDS, contract_tuning, generate_layout
+
+    tables = content.load_content(os.path.join(BASE_DIR, "data"), os.path.join(BASE_DIR, ".cache"))
+    archetypes = tables["archetypes"]
+    contract = build_contract_from_archetype(archetypes[seed % len(archetypes)], seed, tables["themes"])
+    layout = generate_layout(contract["seed"], contract_tuning(contract), LEVEL_BOUNDS)
+    hazards = HazardField()
+    populate_hazards(hazards, layout, contract.get("hazard_kind"), contract.get("difficulty_raw", 1.0), LEVEL_BOUNDS)
+    return contract, layout, hazards, plan_platform_behaviours(layout, contract.get("platform_mix"), LEVEL_BOUNDS)
+
+
+def _random_actions(seed, shape):
+    # Biased towards running right so agents actually reach the level's platforms and hazards.
+    from physics import ACTION_RIGHT
+
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, 16, size=shape)
+    return actions | np.where(rng.random(shape) < 0.6, ACTION_RIGHT, 0)
+
+
+def bench_particles(args):
+    from particles import PARTICLE_CAP, ParticleSystem
+
+    system = ParticleSystem(seed=1)
+    surface = pygame.Surface((960, 540))
+    started = time.perf_counter()
+    drawn = 0
+    for frame in range(args.frames):
+        for _ in range(args.bursts):
+            system.beacon_burst(480 + (frame % 40) * 4, 300)
+        system.ambient_embers(1000 / 60, 0, 960, 520)
+        system.update(1000 / 60)
+        drawn = system.draw(surface, 0)
+    per_frame = (time.perf_counter() - started) / args.frames * 1000
+    print(f"particles: cap {PARTICLE_CAP}, {drawn} drawn on the last frame, {per_frame:.3f} ms/frame")
+
+
+def bench_hazards(args):
+    from hazards import HAZARD_KINDS, HAZARD_PROFILES, HAZARD_VIEW_MARGIN, HazardField
+    from rng import Rng
+
+    field = HazardField()
+    rng = Rng(1)
+    for idx in range(args.hazards):
+        kind = HAZARD_KINDS[idx % len(HAZARD_KINDS)]
+        profile = HAZARD_PROFILES[kind]
+        field.spawn(
+            kind,
+            rng.uniform(0, 4000),
+            rng.uniform(100, 420),
+            8,
+            rng.uniform(*profile["amp_x"]),
+            rng.uniform(*profile["amp_y"]),
+            1.2,
+            rng.uniform(0, math.tau),
+            profile["orbit"],
+            rng.uniform(*profile["fall"]),
+            40.0,
+            480.0,
+        )
+    screen_width = 960
+    player = pygame.Rect(0, 300, 30, 30)
+    surface = pygame.Surface((screen_width, 540))
+    started = time.perf_counter()
+    for frame in range(args.frames):
+        camera_x = (frame * 6) % (4000 - screen_width)
+        player.centerx = camera_x + screen_width // 2
+        field.update(frame / 60, camera_x - HAZARD_VIEW_MARGIN, camera_x + screen_width + HAZARD_VIEW_MARGIN)
+        field.hits(player)
+        field.draw(surface, camera_x)
+    per_frame = (time.perf_counter() - started) / args.frames * 1000
+    print(f"hazards: {args.hazards} active (pool {field.capacity}), {per_frame:.3f} ms/frame for update + hits + draw")
+
+
+def bench_platforms(args):
+    from platforms import PlatformSet
+
+    screen_width = 960
+    for count in args.moving:
+        platforms = [pygame.Rect(60 + i * 200, 380 + (i % 5) * 10, 120, 18) for i in range(count + 2)]
+        behaviours = {
+            idx: {"kind": "moving", "amp_x": 30, "amp_y": 0, "omega": math.tau / 3000, "phase": idx * 0.7}
+            for idx in range(1, count + 1)
+        }
+        level = PlatformSet(platforms, behaviours)
+        player = pygame.Rect(0, 300, 30, 30)
+        hall = platforms[-1].right
+        started = time.perf_counter()
+        for frame in range(args.frames):
+            camera_x = (frame * 6) % max(1, hall - screen_width)
+            player.centerx = camera_x + screen_width // 2
+            level.update(int(frame * 1000 / 60), camera_x, camera_x + screen_width, player, -1.0)
+        per_frame = (time.perf_counter() - started) / args.frames * 1000
+        print(f"platforms: {count:>6} moving, {per_frame:.3f} ms/frame for update + solids")
+
+
+def bench_batchsim(args):
+    from batchSim import BatchCourierSim
+
+    contract, layout, hazards, behaviours = _level(1)
+    sim = BatchCourierSim(
+        layout,
+        contract["gravity"],
+        contract["jump"],
+        args.agents,
+        contract.get("wall_jump", False),
+        hazards=hazards,
+        behaviours=behaviours,
+    )
+    actions = _random_actions(1, (args.frames, args.agents))
+    started = time.perf_counter()
+    for row in actions:
+        sim.step(row)
+    rate = args.agents * args.frames / (time.perf_counter() - started)
+    print(f"batchSim: {args.agents} couriers x {args.frames} frames, {rate:,.0f} courier-steps/s")
+
+
+def bench_mupsenv(args):
+    from mupsEnv import MupsEnv, SubprocVecEnv
+
+    actions = _random_actions(7, args.steps).tolist()
+    env = MupsEnv()
+    env.reset(1)
+    seed = 1
+    started = time.perf_counter()
+    for action in actions:
+        if env.step(action)[2]:
+            seed += 1
+            env.reset(seed)
+    print(f"MupsEnv: {args.steps / (time.perf_counter() - started):,.0f} steps/s on one core")
+    if args.envs <= 0:
+        return
+    vec = SubprocVecEnv(args.envs, args.workers)
+    vec.reset(range(args.envs))
+    rounds = max(1, args.steps // args.envs)
+    started = time.perf_counter()
+    for idx in range(rounds):
+        vec.step([actions[(idx * args.envs + offset) % args.steps] for offset in range(args.envs)])
+    rate = rounds * args.envs / (time.perf_counter() - started)
+    vec.close()
+    print(f"SubprocVecEnv {args.envs} envs: {rate:,.0f} steps/s")
+
+
+def bench_presenter(args):
+    from presenter import Presenter
+
+    window_size = tuple(int(part) for part in args.window.lower().split("x"))
+    presenter = Presenter((800, 600), args.mode)
+    if args.mode == "window":
+        pygame.display.set_mode(window_size, pygame.RESIZABLE)
+        presenter.resized(window_size)
+    canvas = presenter.canvas
+    started = time.perf_counter()
+    for frame in range(args.frames):
+        canvas.fill((frame % 255, 40, 60))
+        presenter.present()
+    per_frame = (time.perf_counter() - started) / args.frames * 1000
+    target = getattr(presenter, "target", canvas.get_rect())
+    print(f"presenter: {args.mode} 800x600 -> {target.width}x{target.height}, {per_frame:.3f} ms/frame")
+
+
+def bench_assets(args):
+    from assetBundle import IMAGE_EXTENSIONS, _asset_files, load_bundle
+
+    assets_dir = os.path.join(BASE_DIR, "assets")
+    cache_dir = os.path.join(BASE_DIR, ".cache")
+    started = time.perf_counter()
+    decoded = [pygame.image.load(path) for name, path in _asset_files(assets_dir) if name.lower().endswith(IMAGE_EXTENSIONS)]
+    decode_ms = (time.perf_counter() - started) * 1000
+    # The first load packs the bundle if the tree changed, so only the second one is timed.
+    bundle = load_bundle(assets_dir, cache_dir)
+    if bundle is None:
+        print(f"assets: nothing to pack in {assets_dir}")
+        return
+    bundle.close()
+    started = time.perf_counter()
+    bundle = load_bundle(assets_dir, cache_dir)
+    mapped = [bundle.surface(name) for name in bundle.names() if bundle.entries[name]["kind"] == "image"]
+    mapped_ms = (time.perf_counter() - started) * 1000
+    mapped.clear()
+    size_kb = os.path.getsize(bundle.path) / 1024
+    bundle.close()
+    print(f"assets: {len(decoded)} images, decode {decode_ms:.2f} ms, mapped bundle {mapped_ms:.2f} ms ({size_kb:.1f} KB)")
+
+
+def bench_audio(args):
+    from audio import SFX_PRIORITIES, AudioSystem
+
+    started = time.perf_counter()
+    audio = AudioSystem(os.path.join(BASE_DIR, "assets"), os.path.join(BASE_DIR, ".cache"))
+    construct_ms = (time.perf_counter() - started) * 1000
+    if not audio.enabled:
+        print(f"audio: mixer unavailable ({audio.error})")
+        return
+    audio.ready.wait(30)
+    ready_ms = (time.perf_counter() - started) * 1000
+    audio.play_music("courier")
+    names = list(SFX_PRIORITIES)
+    for frame in range(args.effects):
+        audio.play(names[frame % len(names)])
+        time.sleep(0.002)
+    print(f"audio: constructor {construct_ms:.1f} ms, preload ready after {ready_ms:.0f} ms in the background")
+    print(audio.summary())
+    audio.close()
+
+
+def bench_telemetry(args):
+    from telemetry import EVENT_BEACON, Telemetry
+
+    with tempfile.TemporaryDirectory() as directory:
+        telemetry = Telemetry(directory)
+        emit = telemetry.emit
+        per_frame = max(1, args.events // args.frames)
+        fastest_ns = None
+        for frame in range(args.frames):
+            started = time.perf_counter_ns()
+            for index in range(per_frame):
+                emit(EVENT_BEACON, index, per_frame, frame)
+            elapsed = (time.perf_counter_ns() - started) / per_frame
+            fastest_ns = elapsed if fastest_ns is None else min(fastest_ns, elapsed)
+            time.sleep(1 / 60)
+        telemetry.close()
+    print(f"telemetry: {telemetry.head} events over {args.frames} frames, {fastest_ns:.0f} ns per emit at best")
+    print(f"telemetry: {telemetry.written} written, {telemetry.dropped} dropped, error {telemetry.error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the game's runtime modules headless.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("particles", help="the particle ring buffer at its cap")
+    command.add_argument("--frames", type=int, default=600)
+    command.add_argument("--bursts", type=int, default=4, help="beacon bursts spawned per frame")
+    command.set_defaults(run=bench_particles)
+
+    command = commands.add_parser("hazards", help="the hazard pool's update, collision and draw per frame")
+    command.add_argument("--hazards", type=int, default=800)
+    command.add_argument("--frames", type=int, default=600)
+    command.set_defaults(run=bench_hazards)
+
+    command = commands.add_parser("platforms", help="PlatformSet.update as the moving-platform count grows")
+    command.add_argument("--frames", type=int, default=600)
+    command.add_argument("--moving", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    command.set_defaults(run=bench_platforms)
+
+    command = commands.add_parser("batchsim", help="BatchCourierSim throughput on a generated level")
+    command.add_argument("--agents", type=int, default=4096)
+    command.add_argument("--frames", type=int, default=600)
+    command.set_defaults(run=bench_batchsim)
+
+    command = commands.add_parser("mupsenv", help="MupsEnv steps per second, optionally a SubprocVecEnv too")
+    command.add_argument("--steps", type=int, default=200_000)
+    command.add_argument("--envs", type=int, default=0, help="also time a SubprocVecEnv with this many envs")
+    command.add_argument("--workers", type=int, default=None, help="worker processes for --envs (default: CPU count)")
+    command.set_defaults(run=bench_mupsenv)
+
+    command = commands.add_parser("presenter", help="presenting the 800x600 canvas into a window")
+    command.add_argument("--mode", choices=("scaled", "window"), default="window")
+    command.add_argument("--window", default="2560x1440", help="WIDTHxHEIGHT of the window for the window mode")
+    command.add_argument("--frames", type=int, default=300)
+    command.set_defaults(run=bench_presenter)
+
+    command = commands.add_parser("assets", help="cold image loads from PNG against the mapped bundle")
+    command.set_defaults(run=bench_assets)
+
+    command = commands.add_parser("audio", help="preload the audio pool and fire a burst of effects through it")
+    command.add_argument("--effects", type=int, default=200, help="effects fired one per simulated frame")
+    command.set_defaults(run=bench_audio)
+
+    command = commands.add_parser("telemetry", help="emit() on the hot path, with the writer thread running")
+    command.add_argument("--events", type=int, default=6_000)
+    command.add_argument("--frames", type=int, default=300, help="simulated 60 fps frames to spread the events over")
+    command.set_defaults(run=bench_telemetry)
+
+    args = parser.parse_args()
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    # Surfaces made with convert() and the presenter's window need a display mode first.
+    pygame.display.set_mode((1, 1))
+    try:
+        args.run(args)
+    finally:
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
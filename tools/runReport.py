@@ -0,0 +1,31 @@
+import argparse
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from runHistory import HISTORY_PATH, archetype_summary, theme_summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print run-history summaries from the local database.")
+    parser.add_argument("--db", default=HISTORY_PATH)
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"no run history at {args.db}")
+        return
+    conn = sqlite3.connect(args.db)
+    for column, label, summarize in (("theme_key", "dimension", theme_summary), ("archetype", "archetype", archetype_summary)):
+        keys = [row[0] for row in conn.execute(f"SELECT DISTINCT {column} FROM runs WHERE {column} IS NOT NULL ORDER BY {column}")]
+        for key in keys:
+            summary = summarize(conn, key)
+            times = "  ".join(
+                f"{name} {summary[name] / 1000:.1f}s" for name in ("p25", "p50", "p90") if summary[name] is not None
+            )
+            print(f"{label:<10}{key:<24}{summary['clears']:>4}/{summary['attempts']:<4} {times}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()